@@ -0,0 +1,56 @@
+"""Measures how long it takes to build, serialize and restore the graph data of a large text passage, comparing the
+generated OpenAPI models to the slotted graph model."""
+import os
+import time
+from typing import Callable, List
+
+import conllu
+import rapidjson
+from conllu import TokenList
+
+from mcserver import Config
+from mcserver.app.models import AnnisResponse, GraphData, GraphLink, GraphNode, LinkMC, NodeMC
+from mcserver.app.services import AnnotationService, FileService, NetworkService
+
+token_count: int = 5000
+repetitions: int = 10
+
+
+def measure(function: Callable[[], object]) -> float:
+    """Determines the best duration of a function in milliseconds."""
+    durations: List[float] = []
+    for i in range(repetitions):
+        start: float = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations) * 1000
+
+
+annotations: List[TokenList] = conllu.parse(
+    FileService.get_file_content(os.path.join(Config.TREEBANKS_PROIEL_PATH, "caes-gal.conllu")))
+tokens: List[dict] = [tok for sent in annotations for tok in sent if isinstance(tok["id"], int)][:token_count]
+graph_data_raw: dict = dict(directed=True, graph={}, multigraph=True, links=[], nodes=[dict(
+    id=f"salt:/urn:custom:latinLit:proiel.caes-gal.lat/doc1#sent1tok{i + 1}",
+    **{"annis::node_name": f"urn:custom:latinLit:proiel.caes-gal.lat/doc1#sent1tok{i + 1}", "annis::node_type": "node",
+       "annis::tok": tok["form"], "annis::type": "node", "udep::lemma": tok["lemma"], "udep::upostag": tok["upostag"],
+       "udep::xpostag": tok["xpostag"], "udep::feats": str(tok["feats"])}) for i, tok in enumerate(tokens)])
+for i in range(1, len(tokens)):
+    graph_data_raw["links"].append({"annis::component_name": "", "annis::component_type": "Ordering",
+                                    "source": graph_data_raw["nodes"][i - 1]["id"],
+                                    "target": graph_data_raw["nodes"][i]["id"]})
+slotted: AnnisResponse = AnnisResponse(graph_data=AnnotationService.map_graph_data(graph_data_raw), solutions=[])
+serialized: dict = NetworkService.serialize_annis_response(slotted)
+generated: AnnisResponse = AnnisResponse.from_dict(serialized)
+print(f"{len(tokens)} tokens, best of {repetitions} runs")
+print("Step\tGenerated (ms)\tSlotted (ms)")
+print("Build\t{0:.1f}\t{1:.1f}".format(
+    measure(lambda: GraphData(links=[LinkMC(**x) for x in serialized["graph_data"]["links"]],
+                              nodes=[NodeMC(**x) for x in serialized["graph_data"]["nodes"]])),
+    measure(lambda: GraphData(links=[GraphLink(**x) for x in serialized["graph_data"]["links"]],
+                              nodes=[GraphNode(**x) for x in serialized["graph_data"]["nodes"]]))))
+print("Serialize\t{0:.1f}\t{1:.1f}".format(
+    measure(lambda: rapidjson.dumps(generated.to_dict())),
+    measure(lambda: rapidjson.dumps(NetworkService.serialize_annis_response(slotted)))))
+print("Restore\t{0:.1f}\t{1:.1f}".format(
+    measure(lambda: AnnisResponse.from_dict(serialized)),
+    measure(lambda: NetworkService.load_annis_response(serialized))))
@@ -0,0 +1,43 @@
+"""Measures how long it takes to import the bundled PROIEL treebanks into graphANNIS, split into building the graph
+update in Python and applying it in graphANNIS."""
+import os
+import shutil
+import time
+from tempfile import mkdtemp
+from typing import List
+
+import conllu
+from conllu import TokenList
+from graphannis.graph import GraphUpdate
+
+from mcserver import Config
+from mcserver.app.models import LockingCorpusStorageManager
+from mcserver.app.services import AnnotationService, FileService
+
+
+class TimedCorpusStorageManager(LockingCorpusStorageManager):
+    """Corpus storage manager that remembers how long the last update took."""
+    apply_duration: float = 0
+
+    def replace_corpus(self, corpus_name: str, update: GraphUpdate) -> None:
+        start_time: float = time.time()
+        super().replace_corpus(corpus_name, update)
+        self.apply_duration = time.time() - start_time
+
+
+file_names: List[str] = sorted(x for x in os.listdir(Config.TREEBANKS_PROIEL_PATH) if x.endswith(".conllu"))
+graph_database_dir: str = mkdtemp()
+cs: TimedCorpusStorageManager = TimedCorpusStorageManager(graph_database_dir)
+print("File\tTokens\tBuild (s)\tApply (s)\tTotal (s)")
+for file_name in file_names:
+    annotations: List[TokenList] = conllu.parse(
+        FileService.get_file_content(os.path.join(Config.TREEBANKS_PROIEL_PATH, file_name)))
+    for sent in annotations:
+        sent.metadata["urn"] = f"urn:custom:latinLit:{file_name}:{sent.tokens[0]['misc']['ref']}"
+    start: float = time.time()
+    AnnotationService.map_conll_to_graph(file_name, annotations, cs, file_name)
+    total: float = time.time() - start
+    token_count: int = sum(len(x) for x in annotations)
+    print(f"{file_name}\t{token_count}\t{total - cs.apply_duration:.2f}\t{cs.apply_duration:.2f}\t{total:.2f}")
+del cs
+shutil.rmtree(graph_database_dir)
@@ -0,0 +1,56 @@
+"""Measures how long it takes to deserialize and serialize typical request and response bodies, comparing the generic
+reflection of the OpenAPI models to the generated serializers (see serializer_generator.py)."""
+import time
+from typing import Callable, List
+
+from mcserver.app.models import AnnisResponse, NodeMC
+from openapi.openapi_server.models import ExerciseForm, MatchingExercise
+from openapi.openapi_server.models.base_model_ import Model
+from openapi.openapi_server.util import deserialize_model
+
+repetitions: int = 10
+
+
+def measure(function: Callable[[], object], count: int) -> float:
+    """Determines the best duration of a function in microseconds, divided by the number of objects it handles."""
+    durations: List[float] = []
+    for i in range(repetitions):
+        start: float = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations) * 1000 * 1000 / count
+
+
+exercise_form: dict = dict(correct_feedback="Gut", general_feedback="Fertig", incorrect_feedback="Falsch",
+                           instructions="Ordne zu", language="de", partially_correct_feedback="Fast",
+                           search_values='["upostag=noun"]', work_author="Caesar", work_title="De bello Gallico",
+                           type="matching", type_translation="Zuordnung",
+                           urn="urn:cts:latinLit:phi0448.phi001.perseus-lat2:1.1.1")
+matching_exercises: List[dict] = [dict(
+    exercise_form, conll="", eid=str(i), exercise_type="matching", last_access_time=1600000000.0 + i, solutions="[]",
+    text_complexity=54.5, exercise_type_translation="Zuordnung", matching_degree=0.5) for i in range(1000)]
+annis_response: dict = dict(exercise_id="", exercise_type="", frequency_analysis=None, uri="", solutions=[
+    dict(target=dict(content="Gallia", salt_id=f"doc1#sent1tok{i}", sentence_id=1, token_id=i),
+         value=dict(content="est", salt_id=f"doc1#sent1tok{i + 1}", sentence_id=1, token_id=i + 1)) for i in range(50)],
+                            graph_data=dict(directed=True, graph={}, multigraph=True, links=[dict(
+                                annis_component_name="dep", annis_component_type="Pointing", source=f"doc1#sent1tok{i}",
+                                target=f"doc1#sent1tok{i + 1}", udep_deprel="nsubj") for i in range(1000)], nodes=[
+                                NodeMC(annis_node_name=f"doc1#sent1tok{i}", annis_node_type="node", annis_tok="Gallia",
+                                       annis_type="node", id=f"doc1#sent1tok{i}", udep_lemma="Gallia",
+                                       udep_upostag="PROPN", udep_xpostag="Ne", udep_feats="Case=Nom").to_dict()
+                                for i in range(1000)]))
+exercises: List[MatchingExercise] = [MatchingExercise.from_dict(x) for x in matching_exercises]
+print(f"Best of {repetitions} runs")
+print("Body\tGeneric (µs per object)\tGenerated (µs per object)")
+print("ExerciseForm.from_dict\t{0:.1f}\t{1:.1f}".format(
+    measure(lambda: [deserialize_model(exercise_form, ExerciseForm) for i in range(1000)], 1000),
+    measure(lambda: [ExerciseForm.from_dict(exercise_form) for i in range(1000)], 1000)))
+print("MatchingExercise.from_dict\t{0:.1f}\t{1:.1f}".format(
+    measure(lambda: [deserialize_model(x, MatchingExercise) for x in matching_exercises], len(matching_exercises)),
+    measure(lambda: [MatchingExercise.from_dict(x) for x in matching_exercises], len(matching_exercises))))
+print("AnnisResponse.from_dict\t{0:.1f}\t{1:.1f}".format(
+    measure(lambda: deserialize_model(annis_response, AnnisResponse), 1),
+    measure(lambda: AnnisResponse.from_dict(annis_response), 1)))
+print("MatchingExercise.to_dict\t{0:.1f}\t{1:.1f}".format(
+    measure(lambda: [Model.to_dict(x) for x in exercises], len(exercises)),
+    measure(lambda: [x.to_dict() for x in exercises], len(exercises))))
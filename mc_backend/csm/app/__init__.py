@@ -1,18 +1,41 @@
-from typing import Type
+from typing import List, Type
 
+import click
 from flask import Flask
-from graphannis.cs import CorpusStorageManager
 
 from mcserver import Config
 from mcserver.app import init_app_common, init_logging
+from mcserver.app.models import LockingCorpusStorageManager
 
 
 def create_csm_app(cfg: Type[Config] = Config) -> Flask:
     """Creates a new Flask app that represents a Corpus Storage Manager."""
-
-    Config.CORPUS_STORAGE_MANAGER = CorpusStorageManager(Config.GRAPH_DATABASE_DIR)
+    from mcserver.app.services import ReplicaService
+    if Config.IS_CSM_READ_REPLICA:
+        ReplicaService.init_replica()
+    else:
+        Config.CORPUS_STORAGE_MANAGER = LockingCorpusStorageManager(Config.GRAPH_DATABASE_DIR)
+        if Config.CORPUS_STORAGE_MANAGER_READ_REPLICAS:
+            ReplicaService.init_writer()
     app_csm: Flask = init_app_common(cfg=cfg, is_csm=True)
     from csm.app.api import bp
     app_csm.register_blueprint(bp)
+    if Config.IS_CSM_READ_REPLICA:
+        # pick up changes from the writer before handling a request
+        app_csm.before_request(ReplicaService.sync)
     init_logging(app_csm, Config.LOG_PATH_CSM)
+    register_commands(app_csm)
     return app_csm
+
+
+def register_commands(app_csm: Flask) -> None:
+    """Adds management commands to the Flask CLI of the Corpus Storage Manager."""
+
+    @app_csm.cli.command("import-corpora")
+    @click.option("--workers", default=Config.PRE_IMPORT_WORKERS, help="Number of processes preparing annotations.")
+    def import_corpora(workers: int) -> None:
+        """Imports the custom corpora and any URNs from PRE_IMPORT_URNS into the graph database."""
+        from mcserver.app.services import CorpusService, CustomCorpusService
+        urns: List[str] = [x.corpus.source_urn for x in CustomCorpusService.custom_corpora] + Config.PRE_IMPORT_URNS
+        imported_urns: List[str] = CorpusService.import_corpora(urns, workers)
+        click.echo(f"Imported {len(imported_urns)} of {len(urns)} corpora into {Config.GRAPH_DATABASE_DIR}.")
@@ -7,7 +7,7 @@ from mcserver import Config
 bp = Blueprint("api", __name__)
 api = Api(bp)
 
-from . import frequencyAPI, textcomplexityAPI
+from . import countBatchAPI, findBatchAPI, frequencyAPI, importAPI, metricsAPI, textcomplexityAPI
 from csm.app.api.annisFindAPI import AnnisFindAPI
 from csm.app.api.corpusStorageManagerAPI import CorpusStorageManagerAPI
 from csm.app.api.subgraphAPI import SubgraphAPI
@@ -1,7 +1,11 @@
+import sys
+
 import flask
+from flask import Response
 from flask_restful import Resource
 from flask_restful.reqparse import RequestParser
 
+from mcserver import Config
 from mcserver.app.services import NetworkService, CorpusService
 
 
@@ -9,6 +13,11 @@ class AnnisFindAPI(Resource):
     def __init__(self):
         self.reqparse: RequestParser = NetworkService.base_request_parser.copy()
         self.reqparse.add_argument("aql", type=str, required=True, location="form", help="No AQL provided")
+        self.reqparse.add_argument("limit", type=int, required=False, location="form", help="No limit provided")
+        self.reqparse.add_argument("offset", type=int, required=False, default=0, location="form",
+                                   help="No offset provided")
+        self.reqparse.add_argument("stream", type=str, required=False, default="false", location="form",
+                                   help="No streaming mode provided")
         self.reqparse.add_argument("urn", type=str, required=True, default="", location="form", help="No URN provided")
         super(AnnisFindAPI, self).__init__()
 
@@ -18,4 +27,13 @@ class AnnisFindAPI(Resource):
         args: dict = flask.request.args
         urn: str = args["urn"]
         aql: str = args["aql"]
-        return NetworkService.make_json_response(CorpusService.find_matches(urn, aql, is_csm=True))
+        offset: int = int(args.get("offset", 0))
+        limit: int = int(args["limit"]) if "limit" in args else sys.maxsize
+        if args.get("stream", "").lower() == "true":
+            # one line per match, each containing the node IDs of that match
+            return NetworkService.make_ndjson_response(CorpusService.stream_matches(urn, aql, offset, limit))
+        response: Response = NetworkService.make_json_response(
+            CorpusService.find_matches(urn, aql, is_csm=True, offset=offset, limit=limit) if limit else [])
+        if "offset" in args or "limit" in args:
+            response.headers[Config.HEADER_TOTAL_COUNT] = CorpusService.count_matches(urn, aql, is_csm=True)
+        return response
@@ -8,7 +8,7 @@ from flask_restful import Resource, abort
 from flask_restful.reqparse import RequestParser
 
 from mcserver.app.models import ExerciseType, Phenomenon, AnnisResponse
-from mcserver.app.services import CorpusService, NetworkService
+from mcserver.app.services import AnnotationService, CorpusService, NetworkService
 
 
 class CorpusStorageManagerAPI(Resource):
@@ -25,6 +25,8 @@ class CorpusStorageManagerAPI(Resource):
                                    action="append")
         self.reqparse.add_argument("exercise_type", type=str, required=True, location="data",
                                    help="No exercise type provided")
+        self.reqparse.add_argument("parse", type=str, required=False, default="false",
+                                   help="No annotation depth provided")
         self.reqparse.add_argument("search_phenomena", type=str, required=False, location="data",
                                    help="No search phenomena provided")
         self.reqparse.add_argument("urn", type=str, required=False, help="No text identifier provided")
@@ -35,10 +37,11 @@ class CorpusStorageManagerAPI(Resource):
         # get request arguments
         args: Dict = flask.request.args
         cts_urn: str = args["urn"]
-        ar: AnnisResponse = CorpusService.get_corpus(cts_urn=cts_urn, is_csm=True)
+        need_parse: bool = args.get("parse", "").lower() == "true"
+        ar: AnnisResponse = CorpusService.get_corpus(cts_urn=cts_urn, is_csm=True, need_parse=need_parse)
         if not ar.graph_data.nodes:
             abort(404)
-        return NetworkService.make_json_response(ar.to_dict())
+        return NetworkService.make_response(NetworkService.serialize_annis_response(ar))
 
     def post(self):
         """Given the relevant corpus data, gives back search results as graph data."""
@@ -53,7 +56,9 @@ class CorpusStorageManagerAPI(Resource):
         exercise_type: ExerciseType = ExerciseType[args["exercise_type"]]
         search_phenomena: List[Phenomenon] = [Phenomenon().__getattribute__(x.upper()) for x in
                                               args["search_phenomena"]]
-        conll: List[TokenList] = CorpusService.get_annotations_from_string(annotations_or_urn)
+        # only parse the text for dependencies if the exercise actually searches for them
+        conll: List[TokenList] = CorpusService.get_annotations_from_string(
+            annotations_or_urn, AnnotationService.needs_parse(aqls))
         ret_val: dict = CorpusService.process_corpus_data(title, conll, aqls, exercise_type, search_phenomena)
         # serialize the results to json
-        return NetworkService.make_json_response(ret_val)
+        return NetworkService.make_response(ret_val)
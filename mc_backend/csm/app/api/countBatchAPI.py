@@ -0,0 +1,9 @@
+from typing import Dict
+from mcserver.app.services import NetworkService, CorpusService
+
+
+def post(count_data: dict):
+    """ Returns the number of matches from ANNIS for multiple AQL queries on a given CTS URN. """
+    counts_by_aql: Dict[str, int] = CorpusService.count_matches_batch(
+        count_data["urn"], count_data["aqls"], is_csm=True)
+    return NetworkService.make_json_response(counts_by_aql)
@@ -0,0 +1,9 @@
+from typing import Dict, List
+from mcserver.app.services import NetworkService, CorpusService
+
+
+def post(find_data: dict):
+    """ Returns matches from ANNIS for multiple AQL queries on a given CTS URN. """
+    node_ids_by_aql: Dict[str, List[str]] = CorpusService.find_matches_batch(
+        find_data["urn"], find_data["aqls"], is_csm=True)
+    return NetworkService.make_json_response(node_ids_by_aql)
@@ -0,0 +1,8 @@
+from flask import Response
+from mcserver.app.services import NetworkService, CorpusService
+
+
+def post(urn: str, parse: bool = False):
+    """ Imports a text into the graph database without sending it back, e.g. on behalf of a read replica. """
+    CorpusService.ensure_corpus(urn, parse)
+    return NetworkService.add_cors_headers(Response(status=204))
@@ -0,0 +1,9 @@
+from mcserver.app.services import NetworkService, CorpusService, GraphDatabaseService, AnnotationService
+
+
+def get():
+    """ Returns runtime metrics of the Corpus Storage Manager, e.g. for the graph data cache. """
+    return NetworkService.make_json_response(dict(graph_data_cache=CorpusService.graph_data_cache.serialize(),
+                                                  graph_flights=CorpusService.graph_flights.serialize(),
+                                                  graph_database=GraphDatabaseService.get_footprint(),
+                                                  udpipe_cache=AnnotationService.udpipe_cache.serialize()))
@@ -1,12 +1,14 @@
 import rapidjson as json
 from mcserver.app.models import AnnisResponse, TextComplexity
-from mcserver.app.services import NetworkService, CorpusService, TextComplexityService
+from mcserver.app.services import NetworkService, CorpusService, TextComplexityService, AnnotationService
 from openapi.openapi_server.models import TextComplexityForm
 
 
 def post(complexity_data: dict):
     tcf: TextComplexityForm = TextComplexityForm.from_dict(complexity_data)
-    ar: AnnisResponse = AnnisResponse.from_dict(json.loads(tcf.annis_response)) if tcf.annis_response \
-        else CorpusService.get_corpus(tcf.urn, is_csm=True)
+    # parse the text right away if the measure searches for dependencies, instead of tagging it first
+    ar: AnnisResponse = NetworkService.load_annis_response(json.loads(tcf.annis_response)) \
+        if tcf.annis_response else CorpusService.get_corpus(
+        tcf.urn, is_csm=True, need_parse=AnnotationService.needs_parse(TextComplexityService.get_aqls(tcf.measure)))
     tc: TextComplexity = TextComplexityService.text_complexity(tcf.measure, tcf.urn, True, ar.graph_data)
     return NetworkService.make_json_response(tc.to_dict())
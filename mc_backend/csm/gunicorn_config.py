@@ -1,8 +1,55 @@
 """Configuration for the gunicorn server"""
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import requests
+
 from mcserver import Config
 
-bind = "{0}:{1}".format(Config.HOST_IP_CSM, Config.CORPUS_STORAGE_MANAGER_PORT)
+bind = "{0}:{1}".format(Config.HOST_IP_CSM, Config.CORPUS_STORAGE_MANAGER_WRITER_PORT if Config.IS_CSM_WRITER else
+                        Config.CORPUS_STORAGE_MANAGER_PORT)
 debug = False
 reload = True
+threads = Config.CORPUS_STORAGE_MANAGER_THREADS
 timeout = 3600
-workers = 1
+workers = 1 if Config.IS_CSM_WRITER else max(Config.CORPUS_STORAGE_MANAGER_READ_REPLICAS, 1)
+writer: subprocess.Popen = None
+
+
+def has_read_replicas() -> bool:
+    """Checks whether the workers of this server are read replicas, i.e. a separate process writes to the database."""
+    return bool(Config.CORPUS_STORAGE_MANAGER_READ_REPLICAS) and not Config.IS_CSM_WRITER
+
+
+def on_exit(server) -> None:
+    """Stops the writer process together with the read replicas."""
+    if writer is not None:
+        writer.terminate()
+
+
+def on_starting(server) -> None:
+    """Starts a separate server for the writer process, which imports corpora on behalf of the read replicas."""
+    global writer
+    if has_read_replicas():
+        shutil.rmtree(Config.GRAPH_DATABASE_REPLICAS_DIR, ignore_errors=True)
+        writer = subprocess.Popen([sys.executable, "-m", "gunicorn"] + sys.argv[1:],
+                                  env=dict(os.environ, CSM_WRITER="Yes"))
+        # let the writer initialize the databases before the read replicas are started
+        url: str = f"{Config.INTERNET_PROTOCOL}{Config.HOST_IP_CSM}:{Config.CORPUS_STORAGE_MANAGER_WRITER_PORT}" + \
+                   Config.SERVER_URI_METRICS
+        while writer.poll() is None:
+            try:
+                requests.get(url)
+                return
+            except requests.ConnectionError:
+                time.sleep(1)
+        raise RuntimeError("The writer process of the Corpus Storage Manager could not be started.")
+
+
+def post_fork(server, worker) -> None:
+    """Turns the workers into read replicas of the graph database."""
+    if has_read_replicas():
+        Config.IS_CSM_READ_REPLICA = True
@@ -47,6 +47,9 @@ def create_app(cfg: Type[Config] = Config) -> Flask:
     # use local postgres database for migrations
     if len(sys.argv) > 2 and sys.argv[2] == Config.FLASK_MIGRATE:
         cfg.SQLALCHEMY_DATABASE_URI = Config.DATABASE_URL_LOCAL
+    if Config.IS_CSM_IN_PROCESS:
+        from mcserver.app.models import LockingCorpusStorageManager
+        Config.CORPUS_STORAGE_MANAGER = LockingCorpusStorageManager(Config.GRAPH_DATABASE_DIR)
     app: Flask = init_app_common(cfg=cfg)
     from mcserver.app.services import bp as services_bp
     app.register_blueprint(services_bp)
@@ -68,10 +71,14 @@ def full_init(app: Flask, cfg: Type[Config] = Config) -> None:
     from mcserver.app.services.corpusService import CorpusService
     CorpusService.init_corpora()
     from mcserver.app.services import ExerciseService
+    if Config.IS_CSM_READ_REPLICA:
+        # maintenance is left to the writer process
+        return
     ExerciseService.update_exercises(is_csm=True)
     if not cfg.TESTING:
         CorpusService.init_graphannis_logging()
         start_updater(app)
+        start_sweeper(app)
 
 
 def init_app_common(cfg: Type[Config] = Config, is_csm: bool = False) -> Flask:
@@ -93,13 +100,15 @@ def init_app_common(cfg: Type[Config] = Config, is_csm: bool = False) -> Flask:
     migrate.init_app(app, db)
     if is_csm or cfg.TESTING:
         db.create_all()
-    if is_csm:
+    # without a separate Corpus Storage Manager, the MC server needs to take care of its maintenance tasks
+    has_csm_duties: bool = is_csm or Config.IS_CSM_IN_PROCESS
+    if has_csm_duties:
         from mcserver.app.services.databaseService import DatabaseService
         DatabaseService.init_db_alembic()
     from mcserver.app.services.textService import TextService
     TextService.init_proper_nouns_list()
     TextService.init_stop_words_latin()
-    if is_csm:
+    if has_csm_duties:
         full_init(app, cfg)
     return app
 
@@ -129,6 +138,15 @@ def log_exception(sender_app: Flask, exception, **extra):
     sender_app.logger.info(f"ERROR for {flask.request.url}")
 
 
+def start_sweeper(app: Flask) -> Thread:
+    """ Starts a new Thread that keeps the graph database within its disk budget. """
+    from mcserver.app.services import GraphDatabaseService
+    t = Thread(target=GraphDatabaseService.init_sweeper, args=(app,))
+    t.daemon = True
+    t.start()
+    return t
+
+
 def start_updater(app: Flask) -> Thread:
     """ Starts a new Thread for to perform updates in the background. """
     from mcserver.app.services import CorpusService
@@ -5,5 +5,6 @@ from flask_restful import Api
 bp = Blueprint("api", __name__)
 api = Api(bp)
 
-from . import corpusAPI, corpusListAPI, exerciseAPI, exerciseListAPI, fileAPI, frequencyAPI, h5pAPI, kwicAPI, \
-    rawTextAPI, staticExercisesAPI, textcomplexityAPI, validReffAPI, vectorNetworkAPI, vocabularyAPI
+from . import corpusAPI, corpusListAPI, exerciseAPI, exerciseListAPI, exercisePreviewAPI, fileAPI, frequencyAPI, \
+    h5pAPI, jobAPI, kwicAPI, metricsAPI, rawTextAPI, staticExercisesAPI, textcomplexityAPI, validReffAPI, \
+    vectorNetworkAPI, vocabularyAPI
@@ -4,13 +4,14 @@ import connexion
 import rapidjson as json
 from typing import List, Dict, Union
 import requests
+from conllu import TokenList
 from connexion.lifecycle import ConnexionResponse
 from flask import Response
 from mcserver.app import db
 from mcserver.app.models import ExerciseType, Solution, ExerciseData, AnnisResponse, Phenomenon, TextComplexity, \
     TextComplexityMeasure, ResourceType, ExerciseMC, GraphData
 from mcserver.app.services import AnnotationService, CorpusService, NetworkService, TextComplexityService, \
-    DatabaseService, ExerciseService
+    DatabaseService, ExerciseService, JobService
 from mcserver.config import Config
 from mcserver.models_auto import Exercise, TExercise, UpdateInfo
 from openapi.openapi_server.models import ExerciseForm
@@ -27,11 +28,49 @@ def adjust_solutions(exercise_data: ExerciseData, exercise_type: str, solutions:
     return solutions
 
 
+def create_exercise(ef: ExerciseForm) -> Union[Response, ConnexionResponse]:
+    """Annotates the text, searches it and saves the resulting exercise to the database."""
+    exercise_type: ExerciseType = ExerciseType(ef.type)
+    search_values_list: List[str] = json.loads(ef.search_values)
+    aqls: List[str] = AnnotationService.map_search_values_to_aql(search_values_list=search_values_list,
+                                                                 exercise_type=exercise_type)
+    search_phenomena: List[Phenomenon] = [Phenomenon().__getattribute__(x.split("=")[0].upper()) for x in
+                                          search_values_list]
+    # if there is custom text instead of a URN, immediately annotate it
+    conll_string_or_urn: str = ef.urn if CorpusService.is_urn(ef.urn) else AnnotationService.get_udpipe(
+        CorpusService.get_raw_text(ef.urn, False), AnnotationService.needs_parse(aqls))
+    try:
+        # construct graph from CONLL data
+        response: dict = get_graph_data(title=ef.urn, conll_string_or_urn=conll_string_or_urn, aqls=aqls,
+                                        exercise_type=exercise_type, search_phenomena=search_phenomena)
+    except ValueError:
+        return connexion.problem(500, Config.ERROR_TITLE_INTERNAL_SERVER_ERROR,
+                                 Config.ERROR_MESSAGE_INTERNAL_SERVER_ERROR)
+    solutions_dict_list: List[Dict] = response["solutions"]
+    solutions: List[Solution] = [Solution.from_dict(x) for x in solutions_dict_list]
+    ar: AnnisResponse = make_new_exercise(
+        conll=response["conll"], correct_feedback=ef.correct_feedback, exercise_type=ef.type,
+        general_feedback=ef.general_feedback, graph_data_raw=response["graph_data_raw"],
+        incorrect_feedback=ef.incorrect_feedback, instructions=ef.instructions, language=ef.language,
+        partially_correct_feedback=ef.partially_correct_feedback, search_values=ef.search_values,
+        solutions=solutions, type_translation=ef.type_translation, urn=ef.urn, work_author=ef.work_author,
+        work_title=ef.work_title)
+    return NetworkService.make_json_response(NetworkService.serialize_annis_response(ar))
+
+
 def get(eid: str) -> Union[Response, ConnexionResponse]:
     exercise: TExercise = DatabaseService.query(Exercise, filter_by=dict(eid=eid), first=True)
     if not exercise:
         return connexion.problem(404, Config.ERROR_TITLE_NOT_FOUND, Config.ERROR_MESSAGE_EXERCISE_NOT_FOUND)
-    ar: AnnisResponse = CorpusService.get_corpus(cts_urn=exercise.urn, is_csm=False)
+    # exercises never change, and their text is always shown with dependencies, so it only changes if it is imported
+    # from a different source, e.g. with a new UDPipe model; this is known without looking at the graph
+    etag: str = NetworkService.make_etag(exercise.eid, *CorpusService.get_import_source(exercise.urn).values())
+    not_modified_response: Union[Response, None] = NetworkService.make_not_modified_response(etag)
+    if not_modified_response is not None:
+        exercise.last_access_time = datetime.utcnow().timestamp()
+        DatabaseService.commit()
+        return not_modified_response
+    ar: AnnisResponse = CorpusService.get_corpus(cts_urn=exercise.urn, is_csm=False, need_parse=True)
     if not ar.graph_data.nodes:
         return connexion.problem(404, Config.ERROR_TITLE_NOT_FOUND, Config.ERROR_MESSAGE_CORPUS_NOT_FOUND)
     exercise.last_access_time = datetime.utcnow().timestamp()
@@ -41,19 +80,23 @@ def get(eid: str) -> Union[Response, ConnexionResponse]:
     ar.uri = NetworkService.get_exercise_uri(exercise)
     ar.exercise_id = exercise.eid
     ar.exercise_type = exercise_type.value
-    return NetworkService.make_json_response(ar.to_dict())
+    return NetworkService.make_json_response(NetworkService.serialize_annis_response(ar), etag=etag)
 
 
 def get_graph_data(title: str, conll_string_or_urn: str, aqls: List[str], exercise_type: ExerciseType,
                    search_phenomena: List[Phenomenon]):
     """Sends annotated text data or a URN to the Corpus Storage Manager in order to get a graph."""
+    if Config.IS_CSM_IN_PROCESS:
+        conll: List[TokenList] = CorpusService.get_annotations_from_string(
+            conll_string_or_urn, AnnotationService.needs_parse(aqls))
+        return CorpusService.process_corpus_data(title, conll, aqls, exercise_type, search_phenomena)
     url: str = f"{Config.INTERNET_PROTOCOL}{Config.HOST_IP_CSM}:{Config.CORPUS_STORAGE_MANAGER_PORT}"
     data: str = json.dumps(
         dict(title=title, annotations=conll_string_or_urn, aqls=aqls, exercise_type=exercise_type.name,
              search_phenomena=search_phenomena))
-    response: requests.Response = requests.post(url, data=data)
+    response: requests.Response = NetworkService.csm_client.post(url, data=data, headers=NetworkService.msgpack_headers)
     try:
-        return json.loads(response.text)
+        return NetworkService.load_response(response)
     except ValueError:
         raise
 
@@ -113,32 +156,10 @@ def map_exercise_data_to_database(exercise_data: ExerciseData, exercise_type: st
     return new_exercise
 
 
-def post(exercise_data: dict) -> Union[Response, ConnexionResponse]:
+def post(exercise_data: dict, asynchronous: bool = False) -> Union[Response, ConnexionResponse]:
     ef: ExerciseForm = ExerciseForm.from_dict(exercise_data)
     ef.urn = ef.urn if ef.urn else ""
-    exercise_type: ExerciseType = ExerciseType(ef.type)
-    search_values_list: List[str] = json.loads(ef.search_values)
-    aqls: List[str] = AnnotationService.map_search_values_to_aql(search_values_list=search_values_list,
-                                                                 exercise_type=exercise_type)
-    search_phenomena: List[Phenomenon] = [Phenomenon().__getattribute__(x.split("=")[0].upper()) for x in
-                                          search_values_list]
-    # if there is custom text instead of a URN, immediately annotate it
-    conll_string_or_urn: str = ef.urn if CorpusService.is_urn(ef.urn) else AnnotationService.get_udpipe(
-        CorpusService.get_raw_text(ef.urn, False))
-    try:
-        # construct graph from CONLL data
-        response: dict = get_graph_data(title=ef.urn, conll_string_or_urn=conll_string_or_urn, aqls=aqls,
-                                        exercise_type=exercise_type, search_phenomena=search_phenomena)
-    except ValueError:
-        return connexion.problem(500, Config.ERROR_TITLE_INTERNAL_SERVER_ERROR,
-                                 Config.ERROR_MESSAGE_INTERNAL_SERVER_ERROR)
-    solutions_dict_list: List[Dict] = response["solutions"]
-    solutions: List[Solution] = [Solution.from_dict(x) for x in solutions_dict_list]
-    ar: AnnisResponse = make_new_exercise(
-        conll=response["conll"], correct_feedback=ef.correct_feedback, exercise_type=ef.type,
-        general_feedback=ef.general_feedback, graph_data_raw=response["graph_data_raw"],
-        incorrect_feedback=ef.incorrect_feedback, instructions=ef.instructions, language=ef.language,
-        partially_correct_feedback=ef.partially_correct_feedback, search_values=ef.search_values,
-        solutions=solutions, type_translation=ef.type_translation, urn=ef.urn, work_author=ef.work_author,
-        work_title=ef.work_title)
-    return NetworkService.make_json_response(ar.to_dict())
+    if asynchronous:
+        # annotating unknown texts may take a long time, so let the client poll for the result
+        return JobService.submit(create_exercise, ef)
+    return create_exercise(ef)
@@ -0,0 +1,26 @@
+from typing import Dict, List, Union
+
+import connexion
+import rapidjson as json
+from connexion.lifecycle import ConnexionResponse
+from flask import Response
+
+from mcserver import Config
+from mcserver.app.models import ExerciseType
+from mcserver.app.services import AnnotationService, CorpusService, NetworkService
+
+
+def get(urn: str, search_values: str, exercise_type: str) -> Union[Response, ConnexionResponse]:
+    """Counts the solutions that a new exercise would have, without actually creating it."""
+    if not CorpusService.is_urn(urn):
+        return connexion.problem(400, Config.ERROR_TITLE_BAD_REQUEST, Config.ERROR_MESSAGE_BAD_REQUEST)
+    try:
+        search_values_list: List[str] = json.loads(search_values)
+        aqls: List[str] = AnnotationService.map_search_values_to_aql(search_values_list=search_values_list,
+                                                                     exercise_type=ExerciseType(exercise_type))
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        # the search values need to be a JSON list of known phenomena and values, e.g. ["upostag=noun"]
+        return connexion.problem(400, Config.ERROR_TITLE_BAD_REQUEST, Config.ERROR_MESSAGE_BAD_REQUEST)
+    counts_by_aql: Dict[str, int] = CorpusService.count_matches_batch(urn, aqls)
+    # every match yields exactly one solution
+    return NetworkService.make_json_response(dict(solution_count=sum(counts_by_aql[x] for x in aqls)))
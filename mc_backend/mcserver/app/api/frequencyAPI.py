@@ -1,12 +1,14 @@
 import requests
 import rapidjson as json
 from mcserver import Config
-from mcserver.app.services import NetworkService
+from mcserver.app.services import CorpusService, NetworkService
 
 
 def get(urn: str):
     """ Returns results for a frequency query from ANNIS for a given CTS URN and AQL. """
+    if Config.IS_CSM_IN_PROCESS:
+        return NetworkService.make_json_response([x.to_dict() for x in CorpusService.get_frequency_analysis(urn, True)])
     url: str = f"{Config.INTERNET_PROTOCOL}{Config.HOST_IP_CSM}:{Config.CORPUS_STORAGE_MANAGER_PORT}" + \
                Config.SERVER_URI_FREQUENCY
-    response: requests.Response = requests.get(url, params=dict(urn=urn))
+    response: requests.Response = NetworkService.csm_client.get(url, params=dict(urn=urn))
     return NetworkService.make_json_response(json.loads(response.text))
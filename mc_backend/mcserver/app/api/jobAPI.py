@@ -0,0 +1,17 @@
+"""The job API. Add it to your REST API to provide users with the status and result of background jobs."""
+from typing import Union
+
+import connexion
+from connexion.lifecycle import ConnexionResponse
+from flask import Response
+
+from mcserver import Config
+from mcserver.app.services import NetworkService, JobService
+
+
+def get(job_id: str) -> Union[Response, ConnexionResponse]:
+    """The GET method for the job REST API. It provides the status and, if finished, the result of a job."""
+    job: dict = JobService.get_job(job_id)
+    if not job:
+        return connexion.problem(404, Config.ERROR_TITLE_NOT_FOUND, Config.ERROR_MESSAGE_JOB_NOT_FOUND)
+    return NetworkService.make_json_response(job)
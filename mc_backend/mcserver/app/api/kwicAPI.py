@@ -7,12 +7,11 @@ from sys import platform
 from tempfile import mkstemp
 from typing import List, Dict
 
-import requests
 from bs4 import BeautifulSoup, ResultSet, Tag
 from conllu import TokenList
 from flask import Response
 from mcserver.app.models import ExerciseType, ExerciseData, LinkMC, NodeMC
-from mcserver.app.services import AnnotationService, NetworkService
+from mcserver.app.services import AnnotationService, CorpusService, NetworkService
 from mcserver.config import Config
 from openapi.openapi_server.models import KwicForm
 
@@ -23,12 +22,8 @@ def post(kwic_data: dict) -> Response:
     kwic_form: KwicForm = KwicForm.from_dict(kwic_data)
     search_values_list: List[str] = json.loads(kwic_form.search_values)
     aqls: List[str] = AnnotationService.map_search_values_to_aql(search_values_list, ExerciseType.kwic)
-    url: str = f"{Config.INTERNET_PROTOCOL}{Config.HOST_IP_CSM}:{Config.CORPUS_STORAGE_MANAGER_PORT}{Config.SERVER_URI_CSM_SUBGRAPH}"
-    data: str = json.dumps(
-        dict(urn=kwic_data["urn"], aqls=aqls, ctx_left=str(kwic_form.ctx_left), ctx_right=str(kwic_form.ctx_right)))
-    response: requests.Response = requests.post(url, data=data)
-    response_content: List[dict] = json.loads(response.text)
-    exercise_data_list: List[ExerciseData] = [ExerciseData(json_dict=x) for x in response_content]
+    exercise_data_list: List[ExerciseData] = CorpusService.get_subgraphs(
+        kwic_data["urn"], aqls, kwic_form.ctx_left, kwic_form.ctx_right, is_csm=False)
     ret_val: str = ""
     for i in range(len(exercise_data_list)):
         ret_val += handle_exercise_data(exercise_data_list[i], kwic_form.ctx_left, kwic_form.ctx_right)
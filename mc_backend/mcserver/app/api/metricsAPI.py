@@ -0,0 +1,9 @@
+"""The metrics API. Add it to your REST API to monitor the MC server at runtime."""
+from flask import Response
+
+from mcserver.app.services import NetworkService
+
+
+def get() -> Response:
+    """ Returns runtime metrics of the MC server, e.g. for the connections to the Corpus Storage Manager. """
+    return NetworkService.make_json_response(dict(csm_client=NetworkService.csm_client.serialize()))
@@ -6,14 +6,24 @@ from flask import Response
 
 from mcserver import Config
 from mcserver.app.models import AnnisResponse, TextComplexityMeasure
-from mcserver.app.services import CorpusService, NetworkService, TextComplexityService
+from mcserver.app.services import AnnotationService, CorpusService, NetworkService, TextComplexityService, JobService
 
 
-def get(urn: str) -> Union[Response, ConnexionResponse]:
+def get(urn: str, asynchronous: bool = False) -> Union[Response, ConnexionResponse]:
     """Provides the raw text for a requested text passage."""
-    ar: AnnisResponse = CorpusService.get_corpus(cts_urn=urn, is_csm=False)
+    if asynchronous:
+        # passages that have not been requested before need to be annotated, which may take a long time
+        return JobService.submit(make_raw_text_response, urn)
+    return make_raw_text_response(urn)
+
+
+def make_raw_text_response(urn: str) -> Union[Response, ConnexionResponse]:
+    """Retrieves the raw text for a text passage, including its text complexity."""
+    # the overall text complexity includes measures that search for dependencies
+    ar: AnnisResponse = CorpusService.get_corpus(cts_urn=urn, is_csm=False, need_parse=AnnotationService.needs_parse(
+        TextComplexityService.get_aqls(TextComplexityMeasure.all.name)))
     if not ar.graph_data.nodes:
         return connexion.problem(404, Config.ERROR_TITLE_NOT_FOUND, Config.ERROR_MESSAGE_CORPUS_NOT_FOUND)
     ar.text_complexity = TextComplexityService.text_complexity(TextComplexityMeasure.all.name, urn, False,
                                                                ar.graph_data).to_dict()
-    return NetworkService.make_json_response(ar.to_dict())
+    return NetworkService.make_json_response(NetworkService.serialize_annis_response(ar))
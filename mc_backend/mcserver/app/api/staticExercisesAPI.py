@@ -1,11 +1,9 @@
 import json
-import os
 import re
 import string
 from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
 from io import BytesIO
-from tempfile import mkstemp
 from time import time
 from typing import Dict, List, Set, Match, Tuple, Union
 from zipfile import ZipFile
@@ -123,17 +121,11 @@ def update_exercises() -> Union[Response, ConnexionResponse]:
         return connexion.problem(
             503, Config.ERROR_TITLE_SERVICE_UNAVAILABLE, Config.ERROR_MESSAGE_SERVICE_UNAVAILABLE)
     relevant_strings_dict: Dict[str, Set[str]] = get_relevant_strings(response)
-    file_dict: Dict = {}
     lemma_set: Set[str] = set()
     for url in relevant_strings_dict:
-        for word in relevant_strings_dict[url]:
-            if word not in lemma_set:
-                lemma_set.add(word)
-                input_bytes = bytearray(word, encoding='utf-8', errors='strict')
-                file_handler, file_path = mkstemp()
-                os.write(file_handler, input_bytes)
-                file_dict[file_path] = file_handler
-    result_string: str = AnnotationService.get_udpipe("", False, file_dict)
+        lemma_set.update(relevant_strings_dict[url])
+    # separate paragraphs make sure that every word is annotated as a sentence of its own
+    result_string: str = AnnotationService.get_udpipe("\n\n".join(sorted(lemma_set)), False)
     search_results: List[Tuple[str, str]] = re.findall(r"1\t([a-zA-Z]*)\t([a-zA-Z]*)", result_string)
     search_results_dict: Dict[str, int] = {item[0]: i for (i, item) in enumerate(search_results)}
     for url in relevant_strings_dict:
@@ -1,9 +1,10 @@
 from mcserver.app.models import AnnisResponse, TextComplexity
-from mcserver.app.services import NetworkService, CorpusService, TextComplexityService
+from mcserver.app.services import AnnotationService, NetworkService, CorpusService, TextComplexityService
 
 
 def get(measure: str, urn: str):
     """Gives users measures of text complexity for a given text."""
-    ar: AnnisResponse = CorpusService.get_corpus(urn, is_csm=False)
+    ar: AnnisResponse = CorpusService.get_corpus(
+        urn, is_csm=False, need_parse=AnnotationService.needs_parse(TextComplexityService.get_aqls(measure)))
     tc: TextComplexity = TextComplexityService.text_complexity(measure, urn, False, ar.graph_data)
     return NetworkService.make_json_response(tc.to_dict())
@@ -87,7 +87,10 @@ def post(vocabulary_data: dict):
     # punctuation should count as a match because we don't want to count this as part of the vocabulary
     for char in string.punctuation:
         vocabulary_set.add(char)
-    ar: AnnisResponse = CorpusService.get_corpus(cts_urn=vf.query_urn, is_csm=False)
+    # the overall text complexity includes measures that search for dependencies
+    ar: AnnisResponse = CorpusService.get_corpus(
+        cts_urn=vf.query_urn, is_csm=False,
+        need_parse=AnnotationService.needs_parse(TextComplexityService.get_aqls(TextComplexityMeasure.all.name)))
     for node in ar.graph_data.nodes:
         if not is_match(target_lemma=node.udep_lemma, vocabulary_set=vocabulary_set):
             node.is_oov = True
@@ -95,4 +98,4 @@ def post(vocabulary_data: dict):
         solutions=[], uri="", exercise_id="", graph_data=ar.graph_data)
     ar.text_complexity = TextComplexityService.text_complexity(
         TextComplexityMeasure.all.name, vf.query_urn, False, ar.graph_data).to_dict()
-    return NetworkService.make_json_response(ar.to_dict())
+    return NetworkService.make_json_response(NetworkService.serialize_annis_response(ar))
@@ -1,12 +1,38 @@
 """Models for dealing with text data, both in the database and in the application itself."""
-from typing import Dict, List
+import hashlib
+import os
+import shutil
+import subprocess
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from operator import attrgetter
+from queue import Empty, Queue
+from sys import platform
+from tempfile import mkdtemp
+from threading import Condition, Lock
+from typing import Callable, Dict, Iterator, List, Tuple
+from urllib.parse import unquote, urlparse
 from enum import Enum
 import typing
+import requests
+from graphannis.cs import CorpusStorageManager
+from graphannis.graph import GraphUpdate
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from mcserver.config import Config
 from mcserver.models_auto import TExercise, Corpus, TCorpus, Exercise, TLearningResult, LearningResult
+from mcserver.serializers_auto import serializers
 from openapi.openapi_server.models import SolutionElement, Solution, Link, NodeMC, TextComplexity, AnnisResponse, \
     GraphData, StaticExercise, FileType, FrequencyItem, Phenomenon, Sentence
 
+try:
+    from ufal.udpipe import Model, Pipeline, ProcessingError
+except ImportError:
+    # without the UDPipe binding, annotations fall back to the bundled command line tool
+    Model = Pipeline = ProcessingError = None
+
 AnnisResponse = AnnisResponse
 FileType = FileType
 FrequencyItem = FrequencyItem
@@ -20,6 +46,17 @@ StaticExercise = StaticExercise
 TextComplexity = TextComplexity
 
 
+def install_serializers() -> None:
+    """Replaces the generic (de)serialization of the generated models, which works by reflection, with specialized
+    functions for each model, see serializer_generator.py."""
+    for model, (from_dict, to_dict) in serializers.items():
+        model.from_dict = classmethod(from_dict)
+        model.to_dict = to_dict
+
+
+install_serializers()
+
+
 def make_solution_element_from_salt_id(salt_id: str) -> SolutionElement:
     """Extracts necessary information from a SALT ID string to create a solution element."""
     salt_parts: List[str] = salt_id.split("#")[-1].split("tok")
@@ -94,6 +131,13 @@ class Feats(Enum):
     Case = "case"
 
 
+class JobStatus(Enum):
+    pending = 1
+    running = 2
+    finished = 3
+    failed = 4
+
+
 class Language(Enum):
     German = "de"
     English = "en"
@@ -106,6 +150,7 @@ class Lemma(Enum):
 class MimeType(Enum):
     docx = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
     json = "application/json"
+    msgpack = "application/x-msgpack"
     pdf = "application/pdf"
     xml = "text/xml"
     zip = "application/zip"
@@ -458,3 +503,590 @@ class CustomCorpus:
         self.corpus = corpus
         self.file_path = file_path
         self.text_parts: List[TextPart] = [] if text_parts is None else text_parts
+
+
+class GraphDataCache:
+    """Bounded LRU cache for the graph data of corpora, keyed by their disk URN.
+
+    The size of the cache is measured as the total number of nodes in all the cached graphs. If a new graph does not
+    fit, the least recently used graphs are evicted until it does."""
+
+    def __init__(self, max_size: int):
+        self.graphs: typing.OrderedDict[str, GraphData] = OrderedDict()
+        self.hits: int = 0
+        self.lock: Lock = Lock()
+        self.max_size: int = max_size
+        self.misses: int = 0
+        self.size: int = 0
+
+    def clear(self) -> None:
+        """Removes all graphs from the cache and resets the statistics."""
+        with self.lock:
+            self.graphs.clear()
+            self.hits = self.misses = self.size = 0
+
+    def get(self, disk_urn: str) -> typing.Optional[GraphData]:
+        """Retrieves the cached graph data for a corpus, if available, and marks it as recently used."""
+        with self.lock:
+            graph_data: GraphData = self.graphs.get(disk_urn)
+            if graph_data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.graphs.move_to_end(disk_urn)
+            return graph_data
+
+    def invalidate(self, disk_urn: str) -> None:
+        """Removes the graph data for a corpus from the cache, e.g. because the corpus was imported again."""
+        with self.lock:
+            graph_data: GraphData = self.graphs.pop(disk_urn, None)
+            if graph_data is not None:
+                self.size -= len(graph_data.nodes)
+
+    def put(self, disk_urn: str, graph_data: GraphData) -> None:
+        """Adds graph data for a corpus to the cache and evicts old entries if the cache grows too large."""
+        graph_size: int = len(graph_data.nodes)
+        if graph_size > self.max_size:
+            return
+        self.invalidate(disk_urn)
+        with self.lock:
+            while self.graphs and self.size + graph_size > self.max_size:
+                self.size -= len(self.graphs.popitem(last=False)[1].nodes)
+            self.graphs[disk_urn] = graph_data
+            self.size += graph_size
+
+    def serialize(self) -> dict:
+        """Provides statistics about the cache, e.g. for monitoring."""
+        with self.lock:
+            return dict(entries=len(self.graphs), hits=self.hits, max_size=self.max_size, misses=self.misses,
+                        size=self.size)
+
+
+class GraphLink(LinkMC):
+    """Link of a graph that keeps its attributes in slots, so large graphs can be built and serialized quickly.
+
+    The generated model builds its type information anew for every instance and serializes it by reflection, which is
+    too slow for thousands of links per passage."""
+    __slots__ = tuple(f"_{x}" for x in LinkMC().attribute_map)
+    attribute_map: Dict[str, str] = LinkMC().attribute_map
+    fields: Tuple[str, ...] = tuple(attribute_map)
+    openapi_types: Dict[str, type] = LinkMC().openapi_types
+    values: attrgetter = attrgetter(*__slots__)
+
+    def __init__(self, annis_component_name: str = None, annis_component_type: str = None, source: str = None,
+                 target: str = None, udep_deprel: str = None):
+        self._annis_component_name = annis_component_name
+        self._annis_component_type = annis_component_type
+        self._source = source
+        self._target = target
+        self._udep_deprel = udep_deprel
+
+    def __eq__(self, other):
+        return isinstance(other, LinkMC) and self.to_dict() == other.to_dict()
+
+    def to_dict(self) -> dict:
+        return dict(zip(GraphLink.fields, GraphLink.values(self)))
+
+
+class GraphNode(NodeMC):
+    """Node of a graph that keeps its attributes in slots, so large graphs can be built and serialized quickly."""
+    __slots__ = tuple(f"_{x}" for x in NodeMC().attribute_map)
+    attribute_map: Dict[str, str] = NodeMC().attribute_map
+    fields: Tuple[str, ...] = tuple(attribute_map)
+    openapi_types: Dict[str, type] = NodeMC().openapi_types
+    values: attrgetter = attrgetter(*__slots__)
+
+    def __init__(self, annis_node_name: str = None, annis_node_type: str = None, annis_tok: str = None,
+                 annis_type: str = None, id: str = None, is_oov: bool = None, udep_lemma: str = None,
+                 udep_upostag: str = None, udep_xpostag: str = None, udep_feats: str = None, solution: str = None,
+                 sentence_id: int = None, token_id: int = None, token_index: int = None):
+        self._annis_node_name = annis_node_name
+        self._annis_node_type = annis_node_type
+        self._annis_tok = annis_tok
+        self._annis_type = annis_type
+        self._id = id
+        self._is_oov = is_oov
+        self._udep_lemma = udep_lemma
+        self._udep_upostag = udep_upostag
+        self._udep_xpostag = udep_xpostag
+        self._udep_feats = udep_feats
+        self._solution = solution
+        self._sentence_id = sentence_id
+        self._token_id = token_id
+        self._token_index = token_index
+
+    def __eq__(self, other):
+        return isinstance(other, NodeMC) and self.to_dict() == other.to_dict()
+
+    def to_dict(self) -> dict:
+        return dict(zip(GraphNode.fields, GraphNode.values(self)))
+
+
+class HttpClient:
+    """Client for another service, e.g. the Corpus Storage Manager, that shares a pool of keep-alive connections
+    between all the threads of a process.
+
+    Failed requests are retried with an exponential backoff. If the service keeps failing, the circuit breaker opens
+    and requests fail immediately until the reset timeout has expired. Then, a single request may try again."""
+
+    # these status codes mean that the service is down or overloaded, not that the request itself was wrong
+    unavailable_status_codes: Tuple[int, ...] = (502, 503, 504)
+
+    def __init__(self, pool_size: int, timeout: Tuple[float, float], retries: int, backoff_factor: float,
+                 failure_threshold: int, reset_timeout: float):
+        self.backoff_factor: float = backoff_factor
+        self.endpoints: Dict[str, Dict[str, float]] = {}
+        self.failure_threshold: int = failure_threshold
+        self.failures: int = 0
+        self.flights: SingleFlight = SingleFlight()
+        self.lock: Lock = Lock()
+        self.opened_time: typing.Optional[float] = None
+        self.pid: int = 0
+        self.pool_size: int = pool_size
+        self.rejections: int = 0
+        self.reset_timeout: float = reset_timeout
+        self.retries: int = retries
+        self.session: typing.Optional[requests.Session] = None
+        self.timeout: Tuple[float, float] = timeout
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Sends a GET request to the service. Identical requests that are sent concurrently, e.g. by many clients
+        opening the same new text, share a single response."""
+        prepared_url: str = requests.Request("GET", url, params=kwargs.get("params")).prepare().url
+        key: tuple = (prepared_url, tuple(sorted(kwargs.get("headers", {}).items())))
+        return self.flights.do(key, lambda: self.request("GET", url, **kwargs))
+
+    def get_session(self) -> requests.Session:
+        """Provides the session for the current process, so connections are never shared after forking."""
+        with self.lock:
+            if self.session is None or self.pid != os.getpid():
+                retry: Retry = Retry(total=self.retries, backoff_factor=self.backoff_factor,
+                                     status_forcelist=self.unavailable_status_codes, raise_on_status=False)
+                adapter: HTTPAdapter = HTTPAdapter(pool_maxsize=self.pool_size, max_retries=retry)
+                self.session = requests.Session()
+                self.session.mount("http://", adapter)
+                self.session.mount("https://", adapter)
+                self.pid = os.getpid()
+            return self.session
+
+    def is_open(self) -> bool:
+        """Checks whether the circuit breaker rejects requests because the service has failed too often."""
+        with self.lock:
+            if self.opened_time is None:
+                return False
+            if time.time() - self.opened_time < self.reset_timeout:
+                self.rejections += 1
+                return True
+            # let this request try again, but keep rejecting the others until it has succeeded
+            self.opened_time = time.time()
+            return False
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Sends a POST request to the service."""
+        return self.request("POST", url, **kwargs)
+
+    def record(self, url: str, duration: float, is_error: bool, is_failure: bool) -> None:
+        """Updates the metrics for an endpoint and opens or closes the circuit breaker."""
+        with self.lock:
+            endpoint: Dict[str, float] = self.endpoints.setdefault(
+                urlparse(url).path, dict(calls=0, errors=0, max_time=0.0, total_time=0.0))
+            endpoint["calls"] += 1
+            endpoint["errors"] += int(is_error)
+            endpoint["max_time"] = max(endpoint["max_time"], duration)
+            endpoint["total_time"] += duration
+            if not is_failure:
+                self.failures = 0
+                self.opened_time = None
+                return
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_time = time.time()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Sends a request to the service, unless the circuit breaker is open."""
+        if self.is_open():
+            raise requests.exceptions.ConnectionError(Config.ERROR_MESSAGE_SERVICE_UNAVAILABLE)
+        kwargs.setdefault("timeout", self.timeout)
+        start_time: float = time.perf_counter()
+        try:
+            response: requests.Response = self.get_session().request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.record(url, time.perf_counter() - start_time, True, True)
+            raise
+        self.record(url, time.perf_counter() - start_time, response.status_code >= 500,
+                    response.status_code in self.unavailable_status_codes)
+        return response
+
+    def serialize(self) -> dict:
+        """Provides statistics about the requests for each endpoint, e.g. for monitoring."""
+        with self.lock:
+            endpoints: Dict[str, dict] = {k: dict(calls=v["calls"], errors=v["errors"], max_time=v["max_time"],
+                                                  mean_time=v["total_time"] / v["calls"]) for k, v in
+                                          self.endpoints.items()}
+            return dict(coalesced=self.flights.serialize()["coalesced"], endpoints=endpoints, failures=self.failures,
+                        is_open=self.opened_time is not None, pool_size=self.pool_size, rejections=self.rejections)
+
+
+class UdPipeCache:
+    """Bounded on-disk cache for UDPipe annotations, keyed by a hash of the raw text and the annotation settings.
+
+    Every annotation is stored as a CONLL-U file of its own, so multiple processes can share the cache. The
+    modification time of a file marks its last access. If the cache grows too large, the least recently used files are
+    evicted."""
+
+    def __init__(self, directory: str, max_size: int):
+        self.directory: str = directory
+        self.hits: int = 0
+        self.lock: Lock = Lock()
+        self.max_size: int = max_size
+        self.misses: int = 0
+        self.size: int = -1
+
+    def evict(self) -> None:
+        """Deletes the least recently used files until the cache fits its maximum size again."""
+        entries: List[Tuple[float, int, str]] = []
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.name.endswith(".conllu"):
+                    stat: os.stat_result = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            except FileNotFoundError:
+                # another process has already evicted the file
+                pass
+        self.size = sum(x[1] for x in entries)
+        for mtime, size, path in sorted(entries):
+            if self.size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.size -= size
+
+    def get(self, key: str) -> typing.Optional[str]:
+        """Retrieves a cached annotation, if available, and marks it as recently used."""
+        path: str = self.get_path(key)
+        try:
+            os.utime(path)
+            with open(path) as f:
+                content: str = f.read()
+        except FileNotFoundError:
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return content
+
+    def get_path(self, key: str) -> str:
+        """Determines the location of a cached annotation on disk."""
+        return os.path.join(self.directory, f"{key}.conllu")
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Hashes the raw text and all the settings that influence its annotation."""
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def put(self, key: str, content: str) -> None:
+        """Adds an annotation to the cache and evicts old entries if the cache grows too large."""
+        os.makedirs(self.directory, exist_ok=True)
+        path: str = self.get_path(key)
+        # write to a temporary file first, so other processes never read a partial annotation
+        tmp_path: str = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w+") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        with self.lock:
+            if self.size < 0:
+                self.evict()
+            else:
+                self.size += os.path.getsize(path)
+                if self.size > self.max_size:
+                    self.evict()
+
+    def serialize(self) -> dict:
+        """Provides statistics about the cache, e.g. for monitoring."""
+        with self.lock:
+            return dict(hits=self.hits, max_size=self.max_size, misses=self.misses, size=max(self.size, 0))
+
+
+class ReadWriteLock:
+    """Lock that is held either by any number of readers or by a single writer.
+
+    Waiting writers take precedence over new readers, so a steady stream of queries cannot starve an import."""
+
+    def __init__(self):
+        self.condition: Condition = Condition()
+        self.readers: int = 0
+        self.writers_waiting: int = 0
+        self.writing: bool = False
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """Holds the lock for reading, i.e. together with other readers."""
+        with self.condition:
+            while self.writing or self.writers_waiting:
+                self.condition.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers -= 1
+                self.condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Holds the lock exclusively."""
+        with self.condition:
+            self.writers_waiting += 1
+            while self.writing or self.readers:
+                self.condition.wait()
+            self.writers_waiting -= 1
+            self.writing = True
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+
+
+class CorpusLocks:
+    """Read/write locks for every corpus in a graph database and for the graph database as a whole."""
+
+    def __init__(self):
+        self.corpora: Dict[str, ReadWriteLock] = {}
+        self.database: ReadWriteLock = ReadWriteLock()
+        self.lock: Lock = Lock()
+
+    def get(self, corpus_name: str) -> ReadWriteLock:
+        """Retrieves the lock for a corpus, creating it if necessary."""
+        with self.lock:
+            return self.corpora.setdefault(corpus_name, ReadWriteLock())
+
+    @contextmanager
+    def read(self, corpus_name: str) -> Iterator[None]:
+        """Holds the lock for querying a corpus."""
+        with self.database.read(), self.get(corpus_name).read():
+            yield
+
+    @contextmanager
+    def write(self, corpus_name: str) -> Iterator[None]:
+        """Holds the lock for changing a corpus."""
+        with self.database.read(), self.get(corpus_name).write():
+            yield
+
+    def write_all(self):
+        """Holds the lock for the whole graph database, e.g. to reopen it."""
+        return self.database.write()
+
+
+class SingleFlight:
+    """Runs a function only once for concurrent calls with the same key, e.g. to build a corpus that many clients
+    request at the same time. The other callers wait for that call to finish and share its result or error."""
+
+    def __init__(self):
+        self.calls: Dict[typing.Hashable, Future] = {}
+        self.coalesced: int = 0
+        self.lock: Lock = Lock()
+
+    def do(self, key: typing.Hashable, function: Callable[[], typing.Any]) -> typing.Any:
+        """Calls the function, unless there already is a call for the same key. Then, waits for its result."""
+        with self.lock:
+            future: typing.Optional[Future] = self.calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                self.calls[key] = Future()
+        if future is not None:
+            return future.result()
+        try:
+            result: typing.Any = function()
+        except BaseException as e:
+            self.finish(key).set_exception(e)
+            raise
+        self.finish(key).set_result(result)
+        return result
+
+    def finish(self, key: typing.Hashable) -> Future:
+        """Lets later calls for the key start over, e.g. after the corpus has changed."""
+        with self.lock:
+            return self.calls.pop(key)
+
+    def serialize(self) -> dict:
+        """Provides statistics about the coalesced calls, e.g. for monitoring."""
+        with self.lock:
+            return dict(coalesced=self.coalesced, in_flight=len(self.calls))
+
+
+class LockingCorpusStorageManager(CorpusStorageManager):
+    """Corpus storage whose queries wait while a corpus is being changed, so they never find it missing or incomplete.
+
+    Callers that change a corpus have to hold its write lock, see CorpusLocks. Queries also mark a corpus as recently
+    used by updating the modification time of its directory, which is shared with other processes."""
+    # shared by all instances, so it protects the same data directory even after reopening the storage
+    locks: CorpusLocks = CorpusLocks()
+
+    def __init__(self, db_dir: str):
+        super().__init__(db_dir)
+        self.access_times: Dict[str, float] = {}
+        self.corpus_paths: Dict[str, str] = {}
+        self.db_dir: str = db_dir
+        # protects the access times and corpus paths, because queries run in multiple threads
+        self.touch_lock: Lock = Lock()
+
+    def count(self, corpus_name: str, *args, **kwargs) -> int:
+        with self.read(corpus_name):
+            return super().count(corpus_name, *args, **kwargs)
+
+    def count_extra(self, corpus_name: str, *args, **kwargs):
+        with self.read(corpus_name):
+            return super().count_extra(corpus_name, *args, **kwargs)
+
+    def find(self, corpus_name: str, *args, **kwargs):
+        with self.read(corpus_name):
+            return super().find(corpus_name, *args, **kwargs)
+
+    def frequency(self, corpus_name: str, *args, **kwargs):
+        with self.read(corpus_name):
+            return super().frequency(corpus_name, *args, **kwargs)
+
+    @contextmanager
+    def read(self, corpus_name: str) -> Iterator[None]:
+        """Holds the read lock of a corpus and marks it as recently used."""
+        self.touch(corpus_name)
+        with self.locks.read(corpus_name):
+            yield
+
+    def reload(self, prepare: Callable[[], None] = None) -> None:
+        """Closes and reopens the storage, e.g. to make sure that all changes have been written to disk."""
+        with self.locks.write_all():
+            self.__exit__(None, None, None)
+            if prepare:
+                prepare()
+            CorpusStorageManager.__init__(self, self.db_dir)
+            with self.touch_lock:
+                self.corpus_paths = {}
+
+    def replace_corpus(self, corpus_name: str, update: GraphUpdate) -> None:
+        """Replaces a corpus with new content, deleting any existing corpus with this name.
+
+        The update is applied in a separate staging directory first, so the previous version of the corpus is kept if
+        the update fails. The new corpus is moved to the data directory after it has been completely written to disk."""
+        staging_dir: str = mkdtemp(prefix="staging-", dir=os.path.dirname(os.path.abspath(self.db_dir)))
+        try:
+            # closing the storage waits until graphANNIS has finished writing the corpus in the background
+            with CorpusStorageManager(staging_dir) as staging_cs:
+                staging_cs.apply_update(corpus_name, update)
+            # graphANNIS encodes corpus names for its directories, so keep the name that it chose
+            with os.scandir(staging_dir) as entries:
+                staged_corpus: os.DirEntry = next(x for x in entries if x.is_dir())
+            corpus_path: str = os.path.join(self.db_dir, staged_corpus.name)
+            # the update is already prepared, so queries for this corpus only need to wait for the swap itself
+            with self.locks.write(corpus_name):
+                self.delete_corpus(corpus_name)
+                # graphANNIS does not always remove the directory of a deleted corpus
+                shutil.rmtree(corpus_path, ignore_errors=True)
+                os.rename(staged_corpus.path, corpus_path)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def subcorpus_graph(self, corpus_name: str, *args, **kwargs):
+        with self.read(corpus_name):
+            return super().subcorpus_graph(corpus_name, *args, **kwargs)
+
+    def subgraph(self, corpus_name: str, *args, **kwargs):
+        with self.read(corpus_name):
+            return super().subgraph(corpus_name, *args, **kwargs)
+
+    def touch(self, corpus_name: str) -> None:
+        """Updates the last access time of a corpus on disk, but not more often than necessary."""
+        now: float = time.time()
+        with self.touch_lock:
+            if now - self.access_times.get(corpus_name, 0) < Config.GRAPH_DATABASE_ACCESS_RESOLUTION:
+                return
+            self.access_times[corpus_name] = now
+            if corpus_name not in self.corpus_paths:
+                # graphANNIS encodes corpus names for its directories
+                self.corpus_paths = {unquote(x.name): x.path for x in os.scandir(self.db_dir) if x.is_dir()}
+            corpus_path: str = self.corpus_paths.get(corpus_name)
+        if corpus_path:
+            try:
+                os.utime(corpus_path)
+            except FileNotFoundError:
+                with self.touch_lock:
+                    self.corpus_paths.pop(corpus_name, None)
+
+
+class ReadReplicaCorpusStorageManager(LockingCorpusStorageManager):
+    """Read-only view on a graph database that is maintained by another (writing) process.
+
+    The corpora of the writer are linked into a separate data directory, because graphANNIS locks its data directory
+    for a single process."""
+
+    def __init__(self, db_dir: str, corpora: List[str]):
+        super().__init__(db_dir)
+        self.corpora: List[str] = corpora
+
+    def list(self) -> List[str]:
+        """Lists the corpora that have been published by the writer process."""
+        # graphANNIS ignores linked corpus directories when listing its corpora
+        return list(self.corpora)
+
+
+class UdPipePool:
+    """Pool of UDPipe pipelines that share a single model, so the model is loaded only once per process.
+
+    Each pipeline is used by one caller at a time. If all of them are busy, callers wait for the next free one until
+    the timeout expires."""
+
+    def __init__(self, model_path: str, size: int, timeout: float, model: Model = None):
+        self.lock: Lock = Lock()
+        self.model: Model = model
+        self.model_path: str = model_path
+        self.pipeline_count: int = 0
+        self.pipelines: Queue = Queue()
+        self.size: int = size
+        self.timeout: float = timeout
+
+    def acquire(self) -> Pipeline:
+        """Lends a pipeline to the caller, loading the model and creating the pipeline if necessary."""
+        with self.lock:
+            if self.model is None:
+                self.model = Model.load(self.model_path)
+                if self.model is None:
+                    raise FileNotFoundError(f"Cannot load UDPipe model from {self.model_path}")
+            if self.pipelines.empty() and self.pipeline_count < self.size:
+                self.pipeline_count += 1
+                return Pipeline(self.model, "tokenize", Pipeline.DEFAULT, Pipeline.DEFAULT, "conllu")
+        try:
+            return self.pipelines.get(timeout=self.timeout)
+        except Empty:
+            raise TimeoutError(f"No UDPipe pipeline became available within {self.timeout} seconds")
+
+    def process(self, text: str, need_parse: bool = True) -> str:
+        """Annotates raw text and returns the result in CONLL-U format."""
+        if Pipeline is None:
+            return self.process_binary(text, need_parse)
+        pipeline: Pipeline = self.acquire()
+        try:
+            pipeline.setParser(Pipeline.DEFAULT if need_parse else Pipeline.NONE)
+            error: ProcessingError = ProcessingError()
+            result_string: str = pipeline.process(text, error)
+            if error.occurred():
+                raise RuntimeError(error.message)
+            return result_string
+        finally:
+            self.pipelines.put(pipeline)
+
+    def process_binary(self, text: str, need_parse: bool = True) -> str:
+        """Annotates raw text using the bundled UDPipe binary, which loads the model again for every call."""
+        udpipe_path: str = Config.UDPIPE_PATH_OSX if platform == Config.PLATFORM_MACOS else (
+            Config.UDPIPE_PATH_WIN64 if platform == Config.PLATFORM_WINDOWS else Config.UDPIPE_PATH_LINUX)
+        args: List[str] = [udpipe_path, "--tokenize", "--tag"] + (["--parse"] if need_parse else []) + [self.model_path]
+        # suppress error messages because UdPipe tends to send non-error informational stuff via StdErr
+        result_bytes: bytes = subprocess.run(
+            args, input=text.encode("utf-8"), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True,
+            timeout=self.timeout).stdout
+        return result_bytes.decode("utf-8")
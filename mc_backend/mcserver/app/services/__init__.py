@@ -10,9 +10,12 @@ from mcserver.app.services.textService import TextService
 from mcserver.app.services.xmlService import XMLservice
 from mcserver.app.services.fileService import FileService
 from mcserver.app.services.networkService import NetworkService
+from mcserver.app.services.jobService import JobService
 from mcserver.app.services.annotationService import AnnotationService
 from mcserver.app.services.customCorpusService import CustomCorpusService
 from mcserver.app.services.frequencyService import FrequencyService
+from mcserver.app.services.graphDatabaseService import GraphDatabaseService
+from mcserver.app.services.replicaService import ReplicaService
 from mcserver.app.services.corpusService import CorpusService
 from mcserver.app.services.textComplexityService import TextComplexityService
 from mcserver.app.services.exerciseService import ExerciseService
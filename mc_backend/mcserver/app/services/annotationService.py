@@ -1,17 +1,21 @@
-import os
-import subprocess
-from sys import platform
-from tempfile import mkstemp
-from typing import Dict, List, Set, Tuple
+import re
+from collections import OrderedDict
+from functools import partial
+from multiprocessing import current_process
+from multiprocessing.pool import Pool
+from operator import attrgetter
+from typing import Dict, List, Optional, Set, Tuple
 
 import conllu
 from conllu import TokenList
-from graphannis.cs import CorpusStorageManager
+from graphannis.errors import NoSuchCorpus, GraphANNISException
 from graphannis.graph import GraphUpdate
 from networkx import MultiDiGraph, json_graph
 
 from mcserver.app.models import Phenomenon, Case, PartOfSpeech, Dependency, Solution, ExerciseType, NodeMC, \
-    ExerciseData, GraphData, LinkMC, TextPart
+    ExerciseData, GraphData, GraphLink, GraphNode, LinkMC, TextPart, LockingCorpusStorageManager, UdPipeCache, \
+    UdPipePool, SolutionElement, make_solution_element_from_salt_id
+from mcserver.app.services import TextService
 from mcserver.config import Config
 
 
@@ -19,6 +23,7 @@ class AnnotationService:
     """Service for adding annotations to raw texts."""
 
     excluded_annotations_set: Set[str] = {'form', 'id', 'head', Config.AQL_DEPREL}
+    graph_node_keys_excluded: Set[str] = {"annis::node_name", "annis::node_type"}
     phenomenon_map: Dict[Phenomenon, Dict[str, List[str]]] = {
         Phenomenon.FEATS: {
             Case.ablative.name: ["Abl"],
@@ -80,6 +85,24 @@ class AnnotationService:
             Dependency.vocative.name: ["vocative"]
         },
         Phenomenon.LEMMA: {}}
+    udpipe_cache: UdPipeCache = UdPipeCache(Config.UDPIPE_CACHE_DIRECTORY, Config.UDPIPE_CACHE_MAX_SIZE)
+    udpipe_pool: UdPipePool = UdPipePool(Config.UDPIPE_MODEL_PATH, Config.UDPIPE_POOL_SIZE, Config.UDPIPE_TIMEOUT)
+
+    @staticmethod
+    def add_annotation_depth(g: GraphUpdate, corpus_name: str, is_parsed: bool) -> None:
+        """ Records whether a corpus was fully parsed or only tagged, so it can be upgraded when necessary. """
+        namespace, name = Config.AQL_DEPTH.split(":")
+        g.add_node_label(corpus_name, namespace, name,
+                         Config.ANNOTATION_DEPTH_PARSE if is_parsed else Config.ANNOTATION_DEPTH_TAG)
+
+    @staticmethod
+    def add_token_indices(g: GraphUpdate, node_name: str, sentence_id: int, token_id: int, token_index: int) -> None:
+        """ Records the IDs of a token and its sentence, and its position in the text, so they never need to be
+        extracted from the node name or from the ordering links. """
+        for key, value in [(Config.AQL_SENTENCE_ID, sentence_id), (Config.AQL_TOKEN_ID, token_id),
+                           (Config.AQL_TOKEN_INDEX, token_index)]:
+            namespace, name = key.split(":")
+            g.add_node_label(node_name, namespace, name, str(value))
 
     @staticmethod
     def add_urn_to_sentences(text_list: List[Tuple[str, str]], annotations: List[TokenList]) -> None:
@@ -124,10 +147,22 @@ class AnnotationService:
         """ Modifies a URN so it can be used as a cross-platform file name. """
         return urn.replace(":", "_")
 
+    @staticmethod
+    def get_index(node: dict, key: str) -> Optional[int]:
+        """ Retrieves one of the indices that were recorded for a token when its text was imported, if available. """
+        value: str = node.get(key.replace(":", "::"))
+        return None if value is None else int(value)
+
     @staticmethod
     def get_sentence_id(node: NodeMC) -> int:
-        """ Retrieves the sentence ID for a given node from its node ID. """
-        return int(node.id.split("#")[-1].split("tok")[0].replace("sent", ""))
+        """ Retrieves the sentence ID for a given node. Graphs from older imports only have it in their node IDs. """
+        return AnnotationService.get_sentence_id_from_node_id(node.id) if node.sentence_id is None else \
+            node.sentence_id
+
+    @staticmethod
+    def get_sentence_id_from_node_id(node_id: str) -> int:
+        """ Retrieves the sentence ID from a node ID, e.g. 'salt:/urn:cts:.../doc1#sent12tok3'. """
+        return int(node_id.split("#")[-1].split("tok")[0].replace("sent", ""))
 
     @staticmethod
     def get_single_subgraph(disk_urn: str, node_ids: List[str], ctx_left: int = 5, ctx_right: int = 5,
@@ -141,39 +176,91 @@ class AnnotationService:
         return AnnotationService.map_graph_data(graph_data_raw)
 
     @staticmethod
-    def get_udpipe(text: str, need_parse: bool = True, file_dict: dict = None) -> str:
+    def get_udpipe(text: str, need_parse: bool = True) -> str:
         """Annotate a string of raw text and return the result as string."""
-        model_path = Config.UDPIPE_MODEL_PATH
-        udpipe_path = Config.UDPIPE_PATH_OSX if platform == Config.PLATFORM_MACOS else (
-            Config.UDPIPE_PATH_WIN64 if platform == Config.PLATFORM_WINDOWS else Config.UDPIPE_PATH_LINUX)
-        if file_dict is None:
-            file_dict: dict = {}
-            input_bytes = bytearray(text, encoding='utf-8', errors='strict')
-            file_handler, file_path = mkstemp()
-            os.write(file_handler, input_bytes)
-            file_dict[file_path] = file_handler
-        files_string = " ".join([filePath for filePath in file_dict])
-        # suppress error messages because UdPipe tends to send non-error informational stuff via StdErr
-        with open(os.devnull, "w") as dev_null:
-            result_bytes: bytes = subprocess.check_output(
-                "{0} --tokenize --tag{1} {2} {3}".format(udpipe_path, " --parse" if need_parse else "", model_path,
-                                                         files_string), shell=True, stderr=dev_null)
-        for path in file_dict:
-            os.close(file_dict[path])
-            os.remove(path)
-        result_string: str = result_bytes.decode('utf-8')
+        key: str = UdPipeCache.make_key(
+            Config.UDPIPE_MODEL_PATH, "tokenize", "tag", "parse" if need_parse else "", text)
+        result_string: str = AnnotationService.udpipe_cache.get(key)
+        if result_string is None:
+            result_string = AnnotationService.udpipe_pool.process(text, need_parse)
+            AnnotationService.udpipe_cache.put(key, result_string)
         return result_string
 
+    @staticmethod
+    def get_udpipe_by_unit(text_list: List[Tuple[str, str]], workers: int = 1, need_parse: bool = True) \
+            -> List[TokenList]:
+        """ Annotates a text unit by unit, so overlapping citation ranges can reuse the cached annotations. If multiple
+        workers are requested, long texts are annotated by multiple processes in parallel. Only bulk imports do that,
+        because web workers must not fork while other threads hold locks. """
+        texts: List[str] = [TextService.strip_whitespace(" ".join(x[1] for x in units)) for units in
+                            AnnotationService.group_text_units(text_list)]
+        texts = [x for x in texts if x]
+        # daemonic processes, e.g. in another process pool, cannot start a process pool of their own
+        if workers > 1 and len(texts) > 1 and sum(len(x) for x in texts) >= Config.UDPIPE_PARALLEL_MIN_LENGTH \
+                and not current_process().daemon:
+            with Pool(min(workers, len(texts)), AnnotationService.init_udpipe_worker) as pool:
+                conll_strings: List[str] = pool.map(partial(AnnotationService.get_udpipe, need_parse=need_parse), texts)
+        else:
+            conll_strings = [AnnotationService.get_udpipe(x, need_parse) for x in texts]
+        annotations: List[TokenList] = [y for x in conll_strings for y in AnnotationService.parse_conll_string(x)]
+        # every unit is annotated on its own, so the sentence numbers need to be adjusted for the whole text
+        for i in range(len(annotations)):
+            annotations[i].metadata["sent_id"] = str(i + 1)
+        return annotations
+
+    @staticmethod
+    def group_text_units(text_list: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        """ Groups citation units so that no sentence spans multiple groups, e.g. for verses. """
+        groups: List[List[Tuple[str, str]]] = [[]]
+        for unit in text_list:
+            groups[-1].append(unit)
+            if unit[1].rstrip(Config.SENTENCE_END_TRAILING_CHARACTERS)[-1:] in Config.SENTENCE_END_PUNCTUATION:
+                groups.append([])
+        return [x for x in groups if x]
+
+    @staticmethod
+    def handle_corpus_update(file_name: str, is_deleted: bool = False) -> None:
+        """ Makes sure that nobody uses outdated data after a corpus has been changed in the graph database. """
+        from mcserver.app.services import CorpusService, ReplicaService
+        CorpusService.graph_data_cache.invalidate(file_name)
+        if Config.CORPUS_STORAGE_MANAGER_READ_REPLICAS:
+            ReplicaService.publish(file_name, is_deleted)
+
     @staticmethod
     def has_urn_sentence_range(urn: str) -> bool:
         """ Checks whether a URN refers to specific sentences or a whole text passage. """
         return "@" in urn
 
     @staticmethod
-    def map_conll_to_graph(corpus_name: str, conll: List[TokenList], cs: CorpusStorageManager, file_name: str):
+    def init_udpipe_worker() -> None:
+        """ Prepares a forked process for annotation, because other threads may have held locks while forking. """
+        cache: UdPipeCache = AnnotationService.udpipe_cache
+        AnnotationService.udpipe_cache = UdPipeCache(cache.directory, cache.max_size)
+        pool: UdPipePool = AnnotationService.udpipe_pool
+        # the model may have been loaded before forking, so there is no need to load it again
+        AnnotationService.udpipe_pool = UdPipePool(pool.model_path, pool.size, pool.timeout, pool.model)
+
+    @staticmethod
+    def is_parsed(file_name: str) -> bool:
+        """ Checks whether a corpus in the graph database has dependency annotations or was only tagged. """
+        try:
+            # corpora without any recorded depth were imported when every text was parsed
+            return not Config.CORPUS_STORAGE_MANAGER.count(
+                corpus_name=file_name, query=f'{Config.AQL_DEPTH}="{Config.ANNOTATION_DEPTH_TAG}"')
+        except (NoSuchCorpus, GraphANNISException):
+            return False
+
+    @staticmethod
+    def make_solution_element(node: NodeMC) -> SolutionElement:
+        """ Creates a solution element for a node. Graphs from older imports only have its IDs in the node ID. """
+        if node.sentence_id is None or node.token_id is None:
+            return make_solution_element_from_salt_id(node.id)
+        return SolutionElement(content="", salt_id=node.id, sentence_id=node.sentence_id, token_id=node.token_id)
+
+    @staticmethod
+    def map_conll_to_graph(corpus_name: str, conll: List[TokenList], cs: LockingCorpusStorageManager, file_name: str,
+                           is_parsed: bool = True):
         """ Saves an annotated corpus in CONLL format to the ANNIS corpus storage. """
-        # delete any existing corpus with this name
-        cs.delete_corpus(file_name)
         # currently there is only one document because texts are their own corpus
         doc_name = 'doc1'
         with GraphUpdate() as g:
@@ -181,10 +268,12 @@ class AnnotationService:
             # create a corpus and document node
             # both nodes belong to the corpus graph, not the annotation graph
             g.add_node(node_name=corpus_name, node_type="corpus")
+            AnnotationService.add_annotation_depth(g, corpus_name, is_parsed)
             g.add_node(node_name=doc_path, node_type="corpus")
             # the document is part of the corpus
             g.add_edge(doc_path, corpus_name, 'annis', 'PartOf', '')
             tok_before = None
+            token_index: int = 0
             for tokenList in conll:
                 conllid_to_annisid = dict()
                 # create the sentence ID
@@ -197,6 +286,10 @@ class AnnotationService:
                     tok_id_final = sentence_node_name + "tok{0}".format(token_id)
                     conllid_to_annisid[tok['id']] = tok_id_final
                     AnnotationService.map_token(tok, tok_id_final, g)
+                    # multiword tokens have a range of IDs, e.g. (1, "-", 2)
+                    if isinstance(token_id, int):
+                        AnnotationService.add_token_indices(g, tok_id_final, sentence_id, token_id, token_index)
+                    token_index += 1
                     # a token belongs to its document
                     g.add_edge(tok_id_final, doc_path, 'annis', 'PartOf', '')
                     if tok_before is not None:
@@ -215,7 +308,8 @@ class AnnotationService:
                             if Config.AQL_DEPREL in tok:
                                 g.add_edge_label(tok_id_source, tok_id_target, '', 'Pointing', 'dep', 'udep',
                                                  Config.AQL_DEPREL, tok[Config.AQL_DEPREL])
-            cs.apply_update(file_name, g)
+            cs.replace_corpus(file_name, g)
+        AnnotationService.handle_corpus_update(file_name)
 
     @staticmethod
     def map_graph_data(graph_data_raw: dict) -> GraphData:
@@ -225,11 +319,11 @@ class AnnotationService:
                                           graph=graph_data_raw["graph"], multigraph=graph_data_raw["multigraph"])
         # map the link data to our data model and add it to the graph
         for link in graph_data_raw["links"]:
-            graph_data.links.append(LinkMC(annis_component_name=link["annis::component_name"],
-                                           annis_component_type=link["annis::component_type"],
-                                           source=link["source"],
-                                           target=link["target"],
-                                           udep_deprel=link.get(f"udep::deprel", None)))
+            graph_data.links.append(GraphLink(annis_component_name=link["annis::component_name"],
+                                              annis_component_type=link["annis::component_type"],
+                                              source=link["source"],
+                                              target=link["target"],
+                                              udep_deprel=link.get(f"udep::deprel", None)))
         # map the nodes to our data model
         for node in graph_data_raw["nodes"]:
             # ignore malformed nodes
@@ -240,13 +334,79 @@ class AnnotationService:
         return graph_data
 
     @staticmethod
-    def map_node(node: dict):
+    def map_graph_data_to_conll(graph_data: GraphData) -> List[TokenList]:
+        """ Exports the annotations of a graph in CONLL format, so they can be reused without parsing again. """
+        dep_links: Dict[str, LinkMC] = {x.target: x for x in graph_data.links if
+                                        x.annis_component_name == Config.GRAPHANNIS_DEPENDENCY_LINK}
+        # texts that were only tagged do not have any dependencies
+        is_parsed: bool = len(dep_links) > 0
+        sentences: Dict[int, List[NodeMC]] = OrderedDict()
+        for node in graph_data.nodes:
+            sentences.setdefault(AnnotationService.get_sentence_id(node), []).append(node)
+        conll: List[TokenList] = []
+        for sentence_id, nodes in sentences.items():
+            conll_ids: Dict[str, int] = {nodes[i].id: i + 1 for i in range(len(nodes))}
+            tokens: List[OrderedDict] = []
+            for node in nodes:
+                link: LinkMC = dep_links.get(node.id, None)
+                head: int = None if link is None else conll_ids.get(link.source, None)
+                deprel: str = None if link is None else link.udep_deprel
+                if is_parsed and link is None:
+                    # root dependencies are also node annotations, just like in parse_conll_string()
+                    head, deprel = 0, Dependency.root.name
+                tokens.append(OrderedDict([
+                    ("id", conll_ids[node.id]), ("form", node.annis_tok), ("lemma", node.udep_lemma),
+                    ("upostag", node.udep_upostag), ("xpostag", node.udep_xpostag),
+                    ("feats", conllu.parser.parse_dict_value(node.udep_feats) if node.udep_feats else None),
+                    ("head", head), (Config.AQL_DEPREL, deprel), ("deps", deprel if head == 0 else None),
+                    ("misc", None)]))
+            text: str = TextService.strip_whitespace(" ".join(x.annis_tok for x in nodes))
+            conll.append(TokenList(tokens, OrderedDict([("sent_id", str(sentence_id)), ("text", text)])))
+        return conll
+
+    @staticmethod
+    def map_graph_to_corpus(corpus_name: str, mdg: MultiDiGraph, cs: LockingCorpusStorageManager, file_name: str,
+                            is_parsed: bool = True):
+        """ Saves an already annotated graph as a new corpus, keeping its node names and annotations. """
+        doc_path: str = corpus_name + '/doc1'
+        with GraphUpdate() as g:
+            g.add_node(node_name=corpus_name, node_type="corpus")
+            AnnotationService.add_annotation_depth(g, corpus_name, is_parsed)
+            g.add_node(node_name=doc_path, node_type="corpus")
+            g.add_edge(doc_path, corpus_name, 'annis', 'PartOf', '')
+            for node_data in mdg.nodes.values():
+                node_name: str = node_data["annis::node_name"]
+                g.add_node(node_name)
+                for key, value in node_data.items():
+                    if key not in AnnotationService.graph_node_keys_excluded:
+                        namespace, name = key.split("::", 1)
+                        g.add_node_label(node_name, namespace, name, value)
+                g.add_edge(node_name, doc_path, 'annis', 'PartOf', '')
+            for source, target, edge_data in mdg.edges(data=True):
+                source_name: str = mdg.nodes[source]["annis::node_name"]
+                target_name: str = mdg.nodes[target]["annis::node_name"]
+                component_type: str = edge_data["annis::component_type"]
+                component_name: str = edge_data["annis::component_name"]
+                layer: str = 'annis' if component_type == 'Ordering' else ''
+                g.add_edge(source_name, target_name, layer, component_type, component_name)
+                deprel_key: str = f"udep::{Config.AQL_DEPREL}"
+                if deprel_key in edge_data:
+                    g.add_edge_label(source_name, target_name, layer, component_type, component_name, 'udep',
+                                     Config.AQL_DEPREL, edge_data[deprel_key])
+            cs.replace_corpus(file_name, g)
+        AnnotationService.handle_corpus_update(file_name)
+
+    @staticmethod
+    def map_node(node: dict) -> GraphNode:
         """ Maps a node dictionary to the native NodeMC class. """
-        return NodeMC(annis_node_name=node["annis::node_name"], annis_node_type=node["annis::node_type"],
-                      annis_tok=node.get("annis::tok", None), annis_type=node.get("annis::type", None),
-                      id=str(node.get("id", "")), udep_lemma=node.get("udep::lemma", None),
-                      udep_upostag=node.get("udep::upostag", None), udep_xpostag=node.get("udep::xpostag", None),
-                      udep_feats=node.get("udep::feats", None))
+        return GraphNode(annis_node_name=node["annis::node_name"], annis_node_type=node["annis::node_type"],
+                         annis_tok=node.get("annis::tok", None), annis_type=node.get("annis::type", None),
+                         id=str(node.get("id", "")), udep_lemma=node.get("udep::lemma", None),
+                         udep_upostag=node.get("udep::upostag", None), udep_xpostag=node.get("udep::xpostag", None),
+                         udep_feats=node.get("udep::feats", None),
+                         sentence_id=AnnotationService.get_index(node, Config.AQL_SENTENCE_ID),
+                         token_id=AnnotationService.get_index(node, Config.AQL_TOKEN_ID),
+                         token_index=AnnotationService.get_index(node, Config.AQL_TOKEN_INDEX))
 
     @staticmethod
     def map_search_values_to_aql(search_values_list: List[str], exercise_type: ExerciseType):
@@ -305,6 +465,11 @@ class AnnotationService:
             if isinstance(v, str) and k not in AnnotationService.excluded_annotations_set:
                 g.add_node_label(tok_id, 'udep', k, v)
 
+    @staticmethod
+    def needs_parse(aqls: List[str]) -> bool:
+        """ Checks whether any of the AQL queries searches for dependencies, which only a full parse provides. """
+        return any(re.search(r"\bdep(rel|s)?\b", x) for x in aqls)
+
     @staticmethod
     def parse_conll_string(conll: str):
         """Parses a CONLL string and adds dependency annotations for root words as additional node annotations.
@@ -324,6 +489,10 @@ class AnnotationService:
         # if there is nothing to sort, return the object as is
         if len(graph_data.nodes) == 0:
             return graph_data
+        # the position of each token was recorded when the text was imported, except for older imports
+        if all(x.token_index is not None for x in graph_data.nodes):
+            graph_data.nodes.sort(key=attrgetter("token_index"))
+            return graph_data
         # create a lookup dict so we can retrieve nodes faster
         node_id_to_index_dict: Dict[str, int] = {}
         for i in range(len(graph_data.nodes)):
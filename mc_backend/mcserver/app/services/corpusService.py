@@ -1,8 +1,11 @@
 import sys
+from copy import copy
+from concurrent.futures.thread import ThreadPoolExecutor
 from datetime import datetime
+from operator import attrgetter
 import rapidjson as json
 import os
-from typing import List, Union, Set, Tuple, Dict
+from typing import List, Union, Set, Tuple, Dict, Iterator, Callable
 import requests
 from MyCapytain.retrievers.cts5 import HttpCtsRetriever
 from conllu import TokenList
@@ -18,9 +21,10 @@ from requests import HTTPError
 from sqlalchemy.exc import OperationalError
 from mcserver.app import db
 from mcserver.app.models import CitationLevel, GraphData, Solution, ExerciseType, Phenomenon, AnnisResponse, CorpusMC, \
-    make_solution_element_from_salt_id, FrequencyItem, ResourceType
+    FrequencyItem, ResourceType, GraphDataCache, CustomCorpus, ExerciseData, SingleFlight, NodeMC, SolutionElement, \
+    make_solution_element_from_salt_id
 from mcserver.app.services import AnnotationService, XMLservice, TextService, FileService, FrequencyService, \
-    CustomCorpusService, DatabaseService
+    CustomCorpusService, DatabaseService, ReplicaService, NetworkService
 from mcserver.config import Config
 from mcserver.models_auto import Corpus, UpdateInfo
 
@@ -29,6 +33,9 @@ class CorpusService:
     """Service for handling corpora/texts. Performs CRUD-like operations on the database."""
 
     existing_corpora: List[Corpus] = []
+    graph_data_cache: GraphDataCache = GraphDataCache(Config.GRAPH_DATA_CACHE_MAX_SIZE)
+    # many clients may open a new text at the same time, but it should only be annotated and imported once
+    graph_flights: SingleFlight = SingleFlight()
 
     @staticmethod
     def add_citation_levels(corpus: Corpus, citation_levels: List[Union[CitationLevel, str]]):
@@ -54,6 +61,43 @@ class CorpusService:
         new_corpus.uri = "/{0}".format(new_corpus.cid)
         db.session.commit()
 
+    @staticmethod
+    def build_graph(cts_urn: str, need_parse: bool = False) -> MultiDiGraph:
+        """ Loads a graph from the graph database or builds it from scratch, see get_graph. """
+        if Config.IS_CSM_READ_REPLICA:
+            return ReplicaService.get_graph(cts_urn, need_parse)
+        cts_urn_disk: str = AnnotationService.get_disk_urn(cts_urn)
+        cts_urn_raw: str = cts_urn.split("@")[0] if AnnotationService.has_urn_sentence_range(cts_urn) else cts_urn
+        # need to adjust the URN so it can be used as a cross-platform file name
+        cts_urn_raw_disk: str = AnnotationService.get_disk_urn(cts_urn_raw)
+        annotations: List[TokenList]
+        mdg: MultiDiGraph
+        doc_id: str = cts_urn + '/doc1'
+        if CustomCorpusService.is_custom_corpus_proiel(cts_urn):
+            # treebanks always come with dependencies
+            mdg = CorpusService.load_graph(cts_urn_disk, doc_id)
+            if mdg is None:
+                annotations = CorpusService.get_graph_annotations(cts_urn)
+                AnnotationService.map_conll_to_graph(corpus_name=cts_urn, conll=annotations,
+                                                     cs=Config.CORPUS_STORAGE_MANAGER, file_name=cts_urn_disk)
+                mdg = Config.CORPUS_STORAGE_MANAGER.subcorpus_graph(corpus_name=cts_urn_disk, document_ids=[doc_id])
+            return mdg
+        mdg = CorpusService.load_graph(cts_urn_disk, doc_id, need_parse)
+        if mdg is not None:
+            return mdg
+        doc_id = cts_urn_raw + '/doc1'
+        mdg = CorpusService.load_graph(cts_urn_raw_disk, doc_id, need_parse)
+        if mdg is None:
+            annotations = CorpusService.get_graph_annotations(cts_urn_raw, need_parse=need_parse)
+            # each document gets its own corpus
+            AnnotationService.map_conll_to_graph(cts_urn_raw, annotations, Config.CORPUS_STORAGE_MANAGER,
+                                                 cts_urn_raw_disk, need_parse)
+            mdg = Config.CORPUS_STORAGE_MANAGER.subcorpus_graph(cts_urn_raw_disk, [doc_id])
+        if AnnotationService.has_urn_sentence_range(cts_urn):
+            return CorpusService.get_sentence_range(mdg=mdg, cts_urn=cts_urn, file_name=cts_urn_disk,
+                                                    is_parsed=AnnotationService.is_parsed(cts_urn_raw_disk))
+        return mdg
+
     @staticmethod
     def check_corpus_list_age(app: Flask) -> None:
         """ Checks whether the corpus list needs to be updated. If yes, it performs the update. """
@@ -73,65 +117,153 @@ class CorpusService:
                 app.logger.info("Corpus update completed.")
 
     @staticmethod
-    def find_matches(urn: str, aql: str, is_csm: bool = False) -> List[str]:
-        """ Finds matches for a given URN and AQL and returns the corresponding node IDs. """
-        if is_csm:
+    def count_matches(urn: str, aql: str, is_csm: bool = False) -> int:
+        """ Counts the matches for a given URN and AQL without retrieving them. """
+        if is_csm or Config.IS_CSM_IN_PROCESS:
             disk_urn: str = AnnotationService.get_disk_urn(urn)
-            result_list: List[List[str]]
+            need_parse: bool = AnnotationService.needs_parse([aql])
+            CorpusService.ensure_corpus(urn, need_parse)
             try:
-                result_list = Config.CORPUS_STORAGE_MANAGER.find(corpus_name=disk_urn, query=aql, limit=sys.maxsize,
-                                                                 order=ResultOrder.NotSorted)
+                return Config.CORPUS_STORAGE_MANAGER.count(corpus_name=disk_urn, query=aql)
             except NoSuchCorpus:
-                CorpusService.get_corpus(urn, True)
-                result_list = Config.CORPUS_STORAGE_MANAGER.find(corpus_name=disk_urn, query=aql, limit=sys.maxsize,
-                                                                 order=ResultOrder.NotSorted)
-            # extract the SALT ID for each match
-            return [y for x in node_name_from_match(result_list) for y in x]
+                # the corpus may have been evicted in the meantime
+                CorpusService.get_graph(urn, need_parse)
+                return Config.CORPUS_STORAGE_MANAGER.count(corpus_name=disk_urn, query=aql)
         else:
             url: str = Config.INTERNET_PROTOCOL + f"{Config.HOST_IP_CSM}:{Config.CORPUS_STORAGE_MANAGER_PORT}" + \
                        Config.SERVER_URI_ANNIS_FIND
-            response: requests.Response = requests.get(url, params=dict(urn=urn, aql=aql))
+            response: requests.Response = NetworkService.csm_client.get(url, params=dict(urn=urn, aql=aql, limit=0))
+            return int(response.headers[Config.HEADER_TOTAL_COUNT])
+
+    @staticmethod
+    def count_matches_batch(urn: str, aqls: List[str], is_csm: bool = False) -> Dict[str, int]:
+        """ Counts the matches for multiple AQL queries on the same URN without retrieving them. """
+        if is_csm or Config.IS_CSM_IN_PROCESS:
+            disk_urn: str = AnnotationService.get_disk_urn(urn)
+            return CorpusService.run_queries(
+                urn, aqls, lambda x: Config.CORPUS_STORAGE_MANAGER.count(corpus_name=disk_urn, query=x))
+        else:
+            url: str = Config.INTERNET_PROTOCOL + f"{Config.HOST_IP_CSM}:{Config.CORPUS_STORAGE_MANAGER_PORT}" + \
+                       Config.SERVER_URI_ANNIS_COUNT_BATCH
+            response: requests.Response = NetworkService.csm_client.post(url, json=dict(urn=urn, aqls=aqls))
             return json.loads(response.text)
 
     @staticmethod
-    def get_annotations_from_string(annotations_or_urn: str) -> List[TokenList]:
+    def ensure_corpus(urn: str, need_parse: bool = False) -> None:
+        """ Imports a corpus into the graph database if it is missing or lacks the dependency annotations that are
+        needed. """
+        disk_urn: str = AnnotationService.get_disk_urn(urn)
+        if disk_urn not in Config.CORPUS_STORAGE_MANAGER.list() or \
+                (need_parse and not AnnotationService.is_parsed(disk_urn)):
+            CorpusService.get_graph(urn, need_parse)
+
+    @staticmethod
+    def find_matches(urn: str, aql: str, is_csm: bool = False, offset: int = 0, limit: int = sys.maxsize) -> List[str]:
+        """ Finds matches for a given URN and AQL and returns the corresponding node IDs. Offset and limit refer to
+        matches, not to single node IDs, so queries with multiple nodes return more IDs than the limit. """
+        if is_csm or Config.IS_CSM_IN_PROCESS:
+            disk_urn: str = AnnotationService.get_disk_urn(urn)
+            need_parse: bool = AnnotationService.needs_parse([aql])
+            CorpusService.ensure_corpus(urn, need_parse)
+            try:
+                return CorpusService.find_node_ids(disk_urn, aql, offset, limit)
+            except NoSuchCorpus:
+                # the corpus may have been evicted in the meantime
+                CorpusService.get_graph(urn, need_parse)
+                return CorpusService.find_node_ids(disk_urn, aql, offset, limit)
+        else:
+            url: str = Config.INTERNET_PROTOCOL + f"{Config.HOST_IP_CSM}:{Config.CORPUS_STORAGE_MANAGER_PORT}" + \
+                       Config.SERVER_URI_ANNIS_FIND
+            params: dict = dict(urn=urn, aql=aql)
+            if offset or limit != sys.maxsize:
+                params.update(dict(offset=offset, limit=limit))
+            response: requests.Response = NetworkService.csm_client.get(url, params=params)
+            return json.loads(response.text)
+
+    @staticmethod
+    def find_matches_batch(urn: str, aqls: List[str], is_csm: bool = False) -> Dict[str, List[str]]:
+        """ Finds matches for multiple AQL queries on the same URN and returns the node IDs for each query. """
+        if is_csm or Config.IS_CSM_IN_PROCESS:
+            disk_urn: str = AnnotationService.get_disk_urn(urn)
+            return CorpusService.run_queries(urn, aqls, lambda x: CorpusService.find_node_ids(disk_urn, x))
+        else:
+            url: str = Config.INTERNET_PROTOCOL + f"{Config.HOST_IP_CSM}:{Config.CORPUS_STORAGE_MANAGER_PORT}" + \
+                       Config.SERVER_URI_ANNIS_FIND_BATCH
+            response: requests.Response = NetworkService.csm_client.post(url, json=dict(urn=urn, aqls=aqls))
+            return json.loads(response.text)
+
+    @staticmethod
+    def find_node_id_groups(disk_urn: str, aql: str, offset: int = 0, limit: int = sys.maxsize) -> List[List[str]]:
+        """ Searches an existing graphANNIS corpus and returns the node IDs for each match. """
+        # pages of results are only consistent if the matches are sorted
+        is_paginated: bool = offset > 0 or limit != sys.maxsize
+        result_list: List[List[str]] = Config.CORPUS_STORAGE_MANAGER.find(
+            corpus_name=disk_urn, query=aql, offset=offset, limit=limit,
+            order=ResultOrder.Normal if is_paginated else ResultOrder.NotSorted)
+        # extract the SALT ID for each match
+        return node_name_from_match(result_list)
+
+    @staticmethod
+    def find_node_ids(disk_urn: str, aql: str, offset: int = 0, limit: int = sys.maxsize) -> List[str]:
+        """ Searches an existing graphANNIS corpus and returns the node IDs for all matches. """
+        return [y for x in CorpusService.find_node_id_groups(disk_urn, aql, offset, limit) for y in x]
+
+    @staticmethod
+    def get_annotations_from_string(annotations_or_urn: str, need_parse: bool = True) -> List[TokenList]:
         """ Retrieves annotations from a string by either parsing it or looking up the relevant corpus by its URN. """
         conll: List[TokenList]
         if CustomCorpusService.is_custom_corpus_urn(annotations_or_urn):
             if CustomCorpusService.is_custom_corpus_proiel(annotations_or_urn):
                 conll = CustomCorpusService.get_treebank_annotations(annotations_or_urn)
             else:
-                conll = CustomCorpusService.get_custom_corpus_annotations(annotations_or_urn)
+                conll = CustomCorpusService.get_custom_corpus_annotations(annotations_or_urn, need_parse)
+        elif CorpusService.is_urn(annotations_or_urn):
+            # the text was already annotated when its graph was built, so there is no need to parse it again
+            ar: AnnisResponse = CorpusService.get_corpus(annotations_or_urn, is_csm=True, need_parse=need_parse)
+            conll = AnnotationService.map_graph_data_to_conll(ar.graph_data)
         else:
-            if CorpusService.is_urn(annotations_or_urn):
-                raw_text: str = CorpusService.get_raw_text(urn=annotations_or_urn, is_csm=True)
-                annotations_or_urn = AnnotationService.get_udpipe(raw_text)
             # parse CONLL and add root dependencies as separate node annotations
             conll = AnnotationService.parse_conll_string(annotations_or_urn)
         return conll
 
     @staticmethod
-    def get_corpus(cts_urn: str, is_csm: bool) -> AnnisResponse:
+    def get_corpus(cts_urn: str, is_csm: bool, need_parse: bool = False) -> AnnisResponse:
         """ Loads the text for a standard corpus from the CTS API or cache. """
         if is_csm:
-            # get graph data for further processing
-            graph_data_raw: dict = CorpusService.get_graph_data(cts_urn)
-            if not graph_data_raw:
-                return AnnisResponse(graph_data=GraphData(links=[], nodes=[]))
-            graph_data: GraphData = AnnotationService.map_graph_data(graph_data_raw)
+            # popular passages are requested over and over again, so try the cache first
+            disk_urn: str = AnnotationService.get_disk_urn(cts_urn)
+            # the cache always matches the graph database, so its data may only lack dependencies if the corpus does
+            graph_data: GraphData = None if need_parse and not AnnotationService.is_parsed(disk_urn) else \
+                CorpusService.graph_data_cache.get(disk_urn)
+            if graph_data is None:
+                # get graph data for further processing
+                graph_data_raw: dict = CorpusService.get_graph_data(cts_urn, need_parse)
+                if not graph_data_raw:
+                    return AnnisResponse(graph_data=GraphData(links=[], nodes=[]))
+                graph_data = AnnotationService.map_graph_data(graph_data_raw)
+                CorpusService.graph_data_cache.put(disk_urn, graph_data)
             ar: AnnisResponse = AnnisResponse(solutions=[], uri="", exercise_id="", graph_data=graph_data)
             return ar
+        elif Config.IS_CSM_IN_PROCESS:
+            ar: AnnisResponse = CorpusService.get_corpus(cts_urn, is_csm=True, need_parse=need_parse)
+            gd: GraphData = ar.graph_data
+            # callers may modify the graph, e.g. to mark unknown words, so they must not change the cached one
+            ar.graph_data = GraphData(directed=gd.directed, graph=gd.graph, links=[copy(x) for x in gd.links],
+                                      multigraph=gd.multigraph, nodes=[copy(x) for x in gd.nodes])
+            return ar
         else:
             # there is actually no text, only a URN, so we need to get it ourselves
             url: str = f"{Config.INTERNET_PROTOCOL}{Config.HOST_IP_CSM}:{Config.CORPUS_STORAGE_MANAGER_PORT}/"
-            response: requests.Response = requests.get(url, params=dict(urn=cts_urn))
-            return AnnisResponse.from_dict(json.loads(response.text))
+            response: requests.Response = NetworkService.csm_client.get(
+                url, params=dict(urn=cts_urn, parse=str(need_parse).lower()), headers=NetworkService.msgpack_headers)
+            return NetworkService.load_annis_response(NetworkService.load_response(response))
 
     @staticmethod
     def get_frequency_analysis(urn: str, is_csm: bool) -> List[FrequencyItem]:
         """ Collects frequency statistics for various combinations of linguistic annotations in a corpus. """
-        if is_csm:
-            ar: AnnisResponse = CorpusService.get_corpus(urn, is_csm)
+        if is_csm or Config.IS_CSM_IN_PROCESS:
+            # the dependency frequencies are based on the links of the graph
+            ar: AnnisResponse = CorpusService.get_corpus(urn, is_csm=True, need_parse=True)
             search_phenomena: List[List[Phenomenon]] = []
             for head_phenomenon in list(x for x in Phenomenon.__dict__.keys() if x.isupper()):
                 for base_phenomenon in list(x for x in Phenomenon.__dict__.keys() if x.isupper()):
@@ -151,88 +283,76 @@ class CorpusService:
         else:
             url: str = Config.INTERNET_PROTOCOL + f"{Config.HOST_IP_CSM}:{Config.CORPUS_STORAGE_MANAGER_PORT}" + \
                        Config.SERVER_URI_FREQUENCY
-            response: requests.Response = requests.get(url, params=dict(urn=urn))
+            response: requests.Response = NetworkService.csm_client.get(url, params=dict(urn=urn))
             return [FrequencyItem.from_dict(x) for x in json.loads(response.text)]
 
     @staticmethod
-    def get_graph(cts_urn: str) -> MultiDiGraph:
-        """ Retrieves a graph from the cache or, if not there, builds it from scratch. """
-        cts_urn_disk: str = AnnotationService.get_disk_urn(cts_urn)
-        cts_urn_raw: str = cts_urn.split("@")[0] if AnnotationService.has_urn_sentence_range(cts_urn) else cts_urn
-        # need to adjust the URN so it can be used as a cross-platform file name
-        cts_urn_raw_disk: str = AnnotationService.get_disk_urn(cts_urn_raw)
-        annotations: List[TokenList]
-        mdg: MultiDiGraph
-        doc_id: str = cts_urn + '/doc1'
+    def get_graph(cts_urn: str, need_parse: bool = False) -> MultiDiGraph:
+        """ Retrieves a graph from the cache or, if not there, builds it from scratch. New graphs are only parsed for
+        dependencies if necessary, because that takes much longer than tagging them. Concurrent calls for the same
+        graph wait for a single build and share its result. """
+        return CorpusService.graph_flights.do(
+            (cts_urn, need_parse), lambda: CorpusService.build_graph(cts_urn, need_parse))
+
+    @staticmethod
+    def get_graph_annotations(cts_urn: str, workers: int = 1, need_parse: bool = True) -> List[TokenList]:
+        """ Provides the annotations for a new graph, either from a treebank or by parsing the raw text. """
         if CustomCorpusService.is_custom_corpus_proiel(cts_urn):
-            try:
-                mdg = Config.CORPUS_STORAGE_MANAGER.subcorpus_graph(corpus_name=cts_urn_disk, document_ids=[doc_id])
-                return mdg
-            except (NoSuchCorpus, GraphANNISException):
-                annotations = CustomCorpusService.get_treebank_annotations(cts_urn)
-                AnnotationService.map_conll_to_graph(corpus_name=cts_urn, conll=annotations,
-                                                     cs=Config.CORPUS_STORAGE_MANAGER, file_name=cts_urn_disk)
-                mdg = Config.CORPUS_STORAGE_MANAGER.subcorpus_graph(corpus_name=cts_urn_disk, document_ids=[doc_id])
-                return mdg
-        try:
-            mdg = Config.CORPUS_STORAGE_MANAGER.subcorpus_graph(cts_urn_disk, [doc_id])
-            return mdg
-        except (NoSuchCorpus, GraphANNISException):
-            doc_id = cts_urn_raw + '/doc1'
-            try:
-                mdg = Config.CORPUS_STORAGE_MANAGER.subcorpus_graph(cts_urn_raw_disk, [doc_id])
-            except (NoSuchCorpus, GraphANNISException):
-                text_list: List[Tuple[str, str]] = CorpusService.load_text_list(cts_urn_raw=cts_urn_raw)
-                raw_text: str = TextService.strip_whitespace(" ".join([x[1] for x in text_list]))
-                annotations_conll: str = AnnotationService.get_udpipe(raw_text)
-                # parse CONLL and add root dependencies as separate node annotations
-                annotations = AnnotationService.parse_conll_string(annotations_conll)
-                AnnotationService.add_urn_to_sentences(text_list, annotations)
-                # each document gets its own corpus
-                AnnotationService.map_conll_to_graph(cts_urn_raw, annotations, Config.CORPUS_STORAGE_MANAGER,
-                                                     cts_urn_raw_disk)
-                mdg = Config.CORPUS_STORAGE_MANAGER.subcorpus_graph(cts_urn_raw_disk, [doc_id])
-        if AnnotationService.has_urn_sentence_range(cts_urn):
-            return CorpusService.get_sentence_range(mdg=mdg, cts_urn=cts_urn, file_name=cts_urn_disk)
-        return mdg
+            return CustomCorpusService.get_treebank_annotations(cts_urn)
+        text_list: List[Tuple[str, str]] = CorpusService.load_text_list(cts_urn_raw=cts_urn)
+        annotations: List[TokenList] = AnnotationService.get_udpipe_by_unit(text_list, workers, need_parse)
+        AnnotationService.add_urn_to_sentences(text_list, annotations)
+        return annotations
 
     @staticmethod
-    def get_graph_data(cts_urn: str) -> dict:
+    def get_graph_data(cts_urn: str, need_parse: bool = False) -> dict:
         """ Retrieves graph data for a graph. """
         if not cts_urn:
             return {}
-        mdg: MultiDiGraph = CorpusService.get_graph(cts_urn)
+        mdg: MultiDiGraph = CorpusService.get_graph(cts_urn, need_parse)
         return {} if not mdg else json_graph.node_link_data(mdg)
 
     @staticmethod
-    def get_matches(urn: str, aqls: List[str], search_phenomena: List[Phenomenon]) -> List[Solution]:
+    def get_matches(urn: str, aqls: List[str], search_phenomena: List[Phenomenon], mdg: MultiDiGraph) \
+            -> List[Solution]:
         """ Searches for results for a given AQL query and presents the matches as a list of SALT IDs. """
         # model matches as the basis for solutions so we can process them more easily later on
         matches: List[Solution] = []
+        sentence_key: str = Config.AQL_SENTENCE_ID.replace(":", "::")
+        token_key: str = Config.AQL_TOKEN_ID.replace(":", "::")
+
+        def make_solution_element(node_id: str) -> SolutionElement:
+            # the graph knows the sentence and token IDs of every match, unless it comes from an older import
+            node: dict = mdg.nodes[node_id]
+            if sentence_key not in node or token_key not in node:
+                return make_solution_element_from_salt_id(node_id)
+            return SolutionElement(content="", salt_id=node_id, sentence_id=int(node[sentence_key]),
+                                   token_id=int(node[token_key]))
+
+        node_ids_by_aql: Dict[str, List[str]] = CorpusService.find_matches_batch(urn, aqls, is_csm=True)
         for aql in aqls:
-            node_ids: List[str] = CorpusService.find_matches(urn, aql, is_csm=True)
+            node_ids: List[str] = node_ids_by_aql[aql]
             if len(search_phenomena) == 1:
                 # it's cloze or markWords; the solutions only have a target, no explicit value
                 if search_phenomena[0] == Phenomenon.DEPENDENCY:
                     node_ids = [node_ids[i] for i in range(len(node_ids)) if i % 2 != 0]
-                    matches += [Solution(target=make_solution_element_from_salt_id(x)) for x in node_ids]
+                    matches += [Solution(target=make_solution_element(x)) for x in node_ids]
                 else:
-                    matches += [Solution(target=make_solution_element_from_salt_id(x)) for x in node_ids]
+                    matches += [Solution(target=make_solution_element(x)) for x in node_ids]
             else:
                 # it's a matching exercise
                 if search_phenomena[0] == Phenomenon.DEPENDENCY:
                     for i in range(len(node_ids)):
                         if i % 3 == 0:
                             matches.append(Solution(
-                                target=make_solution_element_from_salt_id(node_ids[i + 1]),
-                                value=make_solution_element_from_salt_id(node_ids[i + 2])))
+                                target=make_solution_element(node_ids[i + 1]),
+                                value=make_solution_element(node_ids[i + 2])))
                 else:
                     for i in range(len(node_ids)):
                         if i % 2 == 0:
                             matches.append(
-                                Solution(target=make_solution_element_from_salt_id(node_ids[i]),
-                                         value=make_solution_element_from_salt_id(node_ids[i + 1])))
-        from operator import attrgetter
+                                Solution(target=make_solution_element(node_ids[i]),
+                                         value=make_solution_element(node_ids[i + 1])))
         matches.sort(key=attrgetter("target.sentence_id", "target.token_id"))
         return matches
 
@@ -245,27 +365,21 @@ class CorpusService:
         return TextService.strip_whitespace(text_raw)
 
     @staticmethod
-    def get_sentence_range(mdg: MultiDiGraph, cts_urn: str, file_name: str) -> MultiDiGraph:
+    def get_sentence_range(mdg: MultiDiGraph, cts_urn: str, file_name: str, is_parsed: bool = True) -> MultiDiGraph:
         """ Retrieves part of a larger graph, according to a URN with sentence IDs. """
         sentence_range: List[int] = list(map(lambda x: int(x), cts_urn.split("@")[1].split("-")))
-        graph_data_raw: dict = json_graph.node_link_data(mdg)
-        graph_data: GraphData = AnnotationService.map_graph_data(graph_data_raw)
-        substring: str = ""
-        node_urns: List[str] = []
-        for node in graph_data.nodes:
-            sentence_id: int = AnnotationService.get_sentence_id(node)
-            node_urns.append(node.id.split("/")[1])
-            substring += (" " + node.annis_tok) if sentence_range[0] <= sentence_id <= sentence_range[1] else ""
-        substring = TextService.strip_whitespace(substring)
-        # parse CONLL and add root dependencies as separate node annotations
-        annotations: List[TokenList] = AnnotationService.parse_conll_string(AnnotationService.get_udpipe(substring))
-        # add URNs for every sentence by relying on the graph data
-        tok_count: int = 0
-        for sent in annotations:
-            sent.metadata["urn"] = node_urns[tok_count]
-            tok_count += len(sent.tokens)
-        # each document gets its own corpus
-        AnnotationService.map_conll_to_graph(cts_urn, annotations, Config.CORPUS_STORAGE_MANAGER, file_name)
+        # slice the parent graph by sentence IDs, so the original annotations are kept and nothing is parsed again
+        sentence_key: str = Config.AQL_SENTENCE_ID.replace(":", "::")
+        node_ids: List[str] = []
+        for node_id, node in mdg.nodes(data=True):
+            # graphs from older imports only have the sentence ID in their node IDs
+            sentence_id: int = int(node[sentence_key]) if sentence_key in node else \
+                AnnotationService.get_sentence_id_from_node_id(node_id)
+            if sentence_range[0] <= sentence_id <= sentence_range[1]:
+                node_ids.append(node_id)
+        # the sentence range gets its own corpus so it can be searched like any other text
+        AnnotationService.map_graph_to_corpus(cts_urn, mdg.subgraph(node_ids), Config.CORPUS_STORAGE_MANAGER,
+                                              file_name, is_parsed)
         return Config.CORPUS_STORAGE_MANAGER.subcorpus_graph(file_name, [cts_urn + '/doc1'])
 
     @staticmethod
@@ -291,16 +405,90 @@ class CorpusService:
     def get_subgraph(urn: str, aql: str, ctx_left: int = 5, ctx_right: int = 5, is_csm: bool = False) -> AnnisResponse:
         """ Retrieves subgraph data for a given URN and node IDs. """
         disk_urn: str = AnnotationService.get_disk_urn(urn)
-        if is_csm:
-            node_ids: List[str] = CorpusService.find_matches(urn, aql, is_csm=is_csm)
-            gd: GraphData = AnnotationService.get_single_subgraph(disk_urn, node_ids, ctx_left, ctx_right, is_csm)
+        if is_csm or Config.IS_CSM_IN_PROCESS:
+            # the context of each match is shown with its dependencies, e.g. in the KWIC view
+            CorpusService.ensure_corpus(urn, need_parse=True)
+            node_ids: List[str] = CorpusService.find_matches(urn, aql, is_csm=True)
+            gd: GraphData = AnnotationService.get_single_subgraph(disk_urn, node_ids, ctx_left, ctx_right, is_csm=True)
             return AnnisResponse(solutions=[], uri="", exercise_id="", graph_data=gd)
         else:
             url: str = Config.INTERNET_PROTOCOL + f"{Config.HOST_IP_CSM}:{Config.CORPUS_STORAGE_MANAGER_PORT}" + \
                        Config.SERVER_URI_CSM_SUBGRAPH
-            response: requests.Response = requests.get(url, params=dict(urn=disk_urn, aqls=aql,
-                                                                        ctx_left=ctx_left, ctx_right=ctx_right))
-            return AnnisResponse.from_dict(json.loads(response.text))
+            response: requests.Response = NetworkService.csm_client.get(
+                url, params=dict(urn=disk_urn, aqls=aql, ctx_left=ctx_left, ctx_right=ctx_right),
+                headers=NetworkService.msgpack_headers)
+            return NetworkService.load_annis_response(NetworkService.load_response(response))
+
+    @staticmethod
+    def get_subgraphs(cts_urn: str, aqls: List[str], ctx_left: int, ctx_right: int, is_csm: bool) \
+            -> List[ExerciseData]:
+        """ Retrieves a separate subgraph for each match of the given AQL queries, e.g. for the KWIC view. """
+        if is_csm or Config.IS_CSM_IN_PROCESS:
+            disk_urn: str = AnnotationService.get_disk_urn(cts_urn)
+            exercise_data_list: List[ExerciseData] = []
+            # the context of each match is shown with its dependencies
+            CorpusService.ensure_corpus(cts_urn, need_parse=True)
+            node_ids_by_aql: Dict[str, List[str]] = CorpusService.find_matches_batch(cts_urn, aqls, is_csm=True)
+            for aql in aqls:
+                for node_id in node_ids_by_aql[aql]:
+                    gd: GraphData = AnnotationService.get_single_subgraph(
+                        disk_urn, [node_id], ctx_left, ctx_right, is_csm=True)
+                    node: NodeMC = next(x for x in gd.nodes if x.id == node_id)
+                    exercise_data_list.append(ExerciseData(
+                        graph=gd, uri="", solutions=[Solution(target=AnnotationService.make_solution_element(node))]))
+            return exercise_data_list
+        else:
+            url: str = Config.INTERNET_PROTOCOL + f"{Config.HOST_IP_CSM}:{Config.CORPUS_STORAGE_MANAGER_PORT}" + \
+                       Config.SERVER_URI_CSM_SUBGRAPH
+            data: str = json.dumps(dict(urn=cts_urn, aqls=aqls, ctx_left=str(ctx_left), ctx_right=str(ctx_right)))
+            response: requests.Response = NetworkService.csm_client.post(
+                url, data=data, headers=NetworkService.msgpack_headers)
+            return [ExerciseData(json_dict=x) for x in NetworkService.load_response(response)]
+
+    @staticmethod
+    def get_import_source(urn: str) -> dict:
+        """ Describes the sources that an imported graph depends on, so we can tell when it becomes outdated. """
+        custom_corpus: CustomCorpus = next(
+            (x for x in CustomCorpusService.custom_corpora if x.corpus.source_urn in urn), None)
+        is_treebank: bool = CustomCorpusService.is_custom_corpus_proiel(urn)
+        return dict(
+            source_modified_time=os.path.getmtime(custom_corpus.file_path) if custom_corpus else None,
+            udpipe_model=None if is_treebank else os.path.basename(Config.UDPIPE_MODEL_PATH),
+            version=Config.GRAPH_DATABASE_VERSION)
+
+    @staticmethod
+    def import_corpora(urns: List[str], workers: int) -> List[str]:
+        """ Imports corpora into the graph database in advance, skipping those that are already there and up to date.
+        The annotations for each corpus are prepared in parallel, but only one process may write to the graph
+        database. """
+        manifest: Dict[str, dict] = {}
+        if os.path.exists(Config.GRAPH_DATABASE_MANIFEST_PATH):
+            manifest = json.loads(FileService.get_file_content(Config.GRAPH_DATABASE_MANIFEST_PATH))
+        existing_corpora: Set[str] = set(Config.CORPUS_STORAGE_MANAGER.list())
+        stale_urns: List[str] = []
+        for urn in dict.fromkeys(urns):
+            disk_urn: str = AnnotationService.get_disk_urn(urn)
+            entry: dict = manifest.get(disk_urn, {})
+            if disk_urn not in existing_corpora or entry.get("source") != CorpusService.get_import_source(urn):
+                stale_urns.append(urn)
+        imported_urns: List[str] = []
+        for urn in stale_urns:
+            # split large corpora, e.g. whole books, between the workers instead of annotating each one serially
+            annotations: List[TokenList] = CorpusService.get_graph_annotations(urn, workers)
+            if not annotations:
+                continue
+            disk_urn: str = AnnotationService.get_disk_urn(urn)
+            AnnotationService.map_conll_to_graph(urn, annotations, Config.CORPUS_STORAGE_MANAGER, disk_urn)
+            manifest[disk_urn] = dict(urn=urn, source=CorpusService.get_import_source(urn),
+                                      import_time=datetime.utcnow().timestamp())
+            # save the progress after every corpus, so an interrupted import does not start from scratch
+            tmp_path: str = Config.GRAPH_DATABASE_MANIFEST_PATH + ".tmp"
+            with open(tmp_path, "w+") as f:
+                f.write(json.dumps(manifest))
+            # replace the manifest in a single step, so the sweeper never reads it only partially written
+            os.replace(tmp_path, Config.GRAPH_DATABASE_MANIFEST_PATH)
+            imported_urns.append(urn)
+        return imported_urns
 
     @staticmethod
     def init_corpora() -> None:
@@ -354,6 +542,17 @@ class CorpusService:
         """ Checks if the string represents a URN. """
         return maybe_urn.startswith("urn:")
 
+    @staticmethod
+    def load_graph(disk_urn: str, doc_id: str, need_parse: bool = False) -> Union[MultiDiGraph, None]:
+        """ Loads a graph from the graph database, unless it is missing or lacks the dependency annotations that are
+        needed. """
+        if need_parse and not AnnotationService.is_parsed(disk_urn):
+            return None
+        try:
+            return Config.CORPUS_STORAGE_MANAGER.subcorpus_graph(disk_urn, [doc_id])
+        except (NoSuchCorpus, GraphANNISException):
+            return None
+
     @staticmethod
     def load_text_list(cts_urn_raw: str) -> List[Tuple[str, str]]:
         """ Loads the text list for a new corpus. """
@@ -375,9 +574,9 @@ class CorpusService:
     def process_corpus_data(urn: str, annotations: List[TokenList], aqls: List[str],
                             exercise_type: ExerciseType, search_phenomena: List[Phenomenon]) -> dict:
         """Listens for calls to the corpus storage manager and processes data for incoming connections."""
-        G: graph = CorpusService.get_graph(urn)
+        G: graph = CorpusService.get_graph(urn, AnnotationService.needs_parse(aqls))
         # execute query and remember all matching nodes
-        solutions: List[Solution] = CorpusService.get_matches(urn, aqls, search_phenomena)
+        solutions: List[Solution] = CorpusService.get_matches(urn, aqls, search_phenomena, G)
         # remove the annotations for the matching tokens in the subgraph but remember their values
         if exercise_type in [ExerciseType.cloze, ExerciseType.markWords]:
             for match in solutions:
@@ -394,6 +593,36 @@ class CorpusService:
             text_conll += x.serialize()
         return dict(graph_data_raw=graph_data_raw, solutions=[x.to_dict() for x in solutions], conll=text_conll)
 
+    @staticmethod
+    def run_queries(urn: str, aqls: List[str], query_function: Callable[[str], object]) -> Dict[str, object]:
+        """ Runs multiple AQL queries on the same corpus in parallel and returns the results for each query. """
+        need_parse: bool = AnnotationService.needs_parse(aqls)
+        CorpusService.ensure_corpus(urn, need_parse)
+        # avoid running the same query twice
+        unique_aqls: List[str] = list(dict.fromkeys(aqls))
+        with ThreadPoolExecutor(max_workers=Config.FIND_BATCH_MAX_WORKERS) as executor:
+            try:
+                results: List[object] = list(executor.map(query_function, unique_aqls))
+            except NoSuchCorpus:
+                # the corpus may have been evicted in the meantime
+                CorpusService.get_graph(urn, need_parse)
+                results = list(executor.map(query_function, unique_aqls))
+        return dict(zip(unique_aqls, results))
+
+    @staticmethod
+    def stream_matches(urn: str, aql: str, offset: int = 0, limit: int = sys.maxsize) -> Iterator[List[str]]:
+        """ Finds matches for a given URN and AQL and yields the node IDs of each match, fetching them in chunks. """
+        disk_urn: str = AnnotationService.get_disk_urn(urn)
+        CorpusService.ensure_corpus(urn, AnnotationService.needs_parse([aql]))
+        end: int = offset + limit if limit != sys.maxsize else sys.maxsize
+        while offset < end:
+            chunk_size: int = min(Config.FIND_STREAM_CHUNK_SIZE, end - offset)
+            matches: List[List[str]] = CorpusService.find_node_id_groups(disk_urn, aql, offset, chunk_size)
+            yield from matches
+            if len(matches) < chunk_size:
+                return
+            offset += chunk_size
+
     @staticmethod
     def update_corpora():
         """Checks the remote repositories for new corpora to be included in our database."""
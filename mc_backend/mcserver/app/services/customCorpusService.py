@@ -91,15 +91,14 @@ class CustomCorpusService:
                                                                         end_parts, new_urn, current_idx, consider_start)
 
     @staticmethod
-    def get_custom_corpus_annotations(urn: str) -> List[TokenList]:
+    def get_custom_corpus_annotations(urn: str, need_parse: bool = True) -> List[TokenList]:
         """ Retrieves the annotated text for a custom non-PROIEL corpus, e.g. a textbook. """
         urn_split: List[str] = []
         if AnnotationService.has_urn_sentence_range(urn):
             urn_split = urn.split("@")
             urn = urn_split[0]
         text_list: List[Tuple[str, str]] = CustomCorpusService.get_custom_corpus_text(urn)
-        annotations_conll: str = AnnotationService.get_udpipe(" ".join(x[1] for x in text_list))
-        conll: List[TokenList] = AnnotationService.parse_conll_string(annotations_conll)
+        conll: List[TokenList] = AnnotationService.get_udpipe_by_unit(text_list, need_parse=need_parse)
         if len(urn_split):
             sentence_range: List[int] = list(map(lambda x: int(x), urn_split[1].split("-")))
             ids_to_delete: Set[int] = set()
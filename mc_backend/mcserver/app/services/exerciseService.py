@@ -36,7 +36,9 @@ class ExerciseService:
                     DatabaseService.commit()
                 # manually add text complexity measures for old exercises
                 elif not exercise.text_complexity:
-                    ar: AnnisResponse = CorpusService.get_corpus(exercise.urn, is_csm=is_csm)
+                    ar: AnnisResponse = CorpusService.get_corpus(
+                        exercise.urn, is_csm=is_csm, need_parse=AnnotationService.needs_parse(
+                            TextComplexityService.get_aqls(TextComplexityMeasure.all.name)))
                     tc: TextComplexity = TextComplexityService.text_complexity(
                         TextComplexityMeasure.all.name, exercise.urn, is_csm, ar.graph_data)
                     exercise.text_complexity = tc.all
@@ -0,0 +1,97 @@
+import os
+import time
+from typing import Dict, List, Set, Tuple
+from urllib.parse import unquote
+
+import rapidjson as json
+from flask import Flask
+
+from mcserver.app.models import LockingCorpusStorageManager
+from mcserver.app.services import AnnotationService, CustomCorpusService, FileService
+from mcserver.config import Config
+
+
+class GraphDatabaseService:
+    """Service for keeping the graph database within its disk budget.
+
+    Every citation range is imported as a corpus of its own, so the least recently used ones are evicted when the
+    graph database grows too large. Base corpora, e.g. the PROIEL treebanks, are pinned and never evicted."""
+
+    evictions: int = 0
+
+    @staticmethod
+    def evict_corpora() -> List[str]:
+        """ Deletes the least recently used corpora that are not pinned until the graph database fits its budget. """
+        corpora: Dict[str, Tuple[float, int]] = GraphDatabaseService.get_corpora()
+        pinned_corpora: Set[str] = GraphDatabaseService.get_pinned_corpora()
+        size: int = sum(x[1] for x in corpora.values())
+        evicted_corpora: List[str] = []
+        for corpus_name in sorted(corpora, key=lambda x: corpora[x][0]):
+            if size <= Config.GRAPH_DATABASE_MAX_SIZE:
+                break
+            if corpus_name in pinned_corpora:
+                continue
+            with LockingCorpusStorageManager.locks.write(corpus_name):
+                Config.CORPUS_STORAGE_MANAGER.delete_corpus(corpus_name)
+            AnnotationService.handle_corpus_update(corpus_name, is_deleted=True)
+            size -= corpora[corpus_name][1]
+            evicted_corpora.append(corpus_name)
+        GraphDatabaseService.evictions += len(evicted_corpora)
+        return evicted_corpora
+
+    @staticmethod
+    def get_corpora() -> Dict[str, Tuple[float, int]]:
+        """ Determines the last access time and the size on disk for every corpus in the graph database. """
+        corpora: Dict[str, Tuple[float, int]] = {}
+        if not os.path.exists(Config.GRAPH_DATABASE_DIR):
+            return corpora
+        for entry in os.scandir(Config.GRAPH_DATABASE_DIR):
+            if entry.is_dir():
+                # graphANNIS encodes corpus names for its directories
+                corpora[unquote(entry.name)] = (entry.stat().st_mtime,
+                                                GraphDatabaseService.get_directory_size(entry.path))
+        return corpora
+
+    @staticmethod
+    def get_directory_size(path: str) -> int:
+        """ Sums up the size of all the files in a directory and its subdirectories. """
+        size: int = 0
+        for root, dirs, files in os.walk(path):
+            for file_name in files:
+                try:
+                    size += os.path.getsize(os.path.join(root, file_name))
+                except FileNotFoundError:
+                    # graphANNIS may replace files while we are looking at them
+                    pass
+        return size
+
+    @staticmethod
+    def get_footprint() -> dict:
+        """ Provides statistics about the disk usage of the graph database, e.g. for monitoring. """
+        corpora: Dict[str, Tuple[float, int]] = GraphDatabaseService.get_corpora()
+        pinned_corpora: Set[str] = GraphDatabaseService.get_pinned_corpora()
+        pinned_sizes: List[int] = [v[1] for k, v in corpora.items() if k in pinned_corpora]
+        return dict(corpora=len(corpora), evictions=GraphDatabaseService.evictions,
+                    max_size=Config.GRAPH_DATABASE_MAX_SIZE, pinned_corpora=len(pinned_sizes),
+                    pinned_size=sum(pinned_sizes), size=sum(x[1] for x in corpora.values()))
+
+    @staticmethod
+    def get_pinned_corpora() -> Set[str]:
+        """ Collects the base corpora, which are never evicted because they are large and expensive to import. """
+        pinned_corpora: Set[str] = {AnnotationService.get_disk_urn(x.corpus.source_urn) for x in
+                                    CustomCorpusService.custom_corpora}
+        # everything that was imported in advance
+        if os.path.exists(Config.GRAPH_DATABASE_MANIFEST_PATH):
+            pinned_corpora.update(json.loads(FileService.get_file_content(Config.GRAPH_DATABASE_MANIFEST_PATH)))
+        return pinned_corpora
+
+    @staticmethod
+    def init_sweeper(app: Flask) -> None:
+        """ Regularly evicts corpora from the graph database if it grows too large. """
+        while True:
+            try:
+                GraphDatabaseService.evict_corpora()
+            except Exception:
+                # keep sweeping, otherwise the graph database would grow without limit from now on
+                app.logger.exception("Could not evict corpora from the graph database.")
+            time.sleep(Config.INTERVAL_GRAPH_DATABASE_SWEEP)
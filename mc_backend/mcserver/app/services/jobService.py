@@ -0,0 +1,144 @@
+import os
+import time
+import uuid
+from concurrent.futures.thread import ThreadPoolExecutor
+from threading import Lock, Thread, get_ident
+from typing import Callable, Set, Union
+
+import rapidjson as json
+from connexion.lifecycle import ConnexionResponse
+from flask import Flask, Response, current_app
+
+from mcserver.app.models import JobStatus
+from mcserver.app.services import FileService, NetworkService
+from mcserver.config import Config
+
+
+class JobService:
+    """Service for running slow requests in the background, so they do not occupy a web worker until they finish.
+
+    The state of every job is kept in a file of its own, so clients can poll it from any web worker. Jobs are lost if
+    the web worker that runs them stops, so every job records the owning process, and the owner regularly touches the
+    files of its unfinished jobs as a heartbeat."""
+
+    # unfinished jobs of this web worker
+    active_jobs: Set[str] = set()
+    executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=Config.JOB_MAX_WORKERS)
+    heartbeat: Thread = None
+    heartbeat_lock: Lock = Lock()
+
+    @staticmethod
+    def clean_jobs() -> None:
+        """ Deletes jobs that have been finished for a long time. """
+        for entry in os.scandir(Config.JOBS_DIRECTORY):
+            try:
+                if entry.name.endswith(".json") and \
+                        time.time() - entry.stat().st_mtime > Config.INTERVAL_JOB_DELETE:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                # another web worker has already deleted the job
+                pass
+
+    @staticmethod
+    def get_job(job_id: str) -> Union[dict, None]:
+        """ Loads the current state of a job, if it exists. Unfinished jobs whose web worker is gone have failed. """
+        try:
+            path: str = JobService.get_job_path(job_id)
+            job: dict = json.loads(FileService.get_file_content(path))
+            heartbeat_time: float = os.stat(path).st_mtime
+        except (FileNotFoundError, ValueError):
+            return None
+        if JobService.is_lost(job, heartbeat_time):
+            job.update(status=JobStatus.failed.name, status_code=500, result=dict(
+                title=Config.ERROR_TITLE_INTERNAL_SERVER_ERROR, detail=Config.ERROR_MESSAGE_JOB_INTERRUPTED))
+            JobService.save_job(job)
+        return job
+
+    @staticmethod
+    def get_job_path(job_id: str) -> str:
+        """ Determines the location of a job's state on disk. """
+        # only accept job IDs that we generated ourselves, so nobody can access other files
+        return os.path.join(Config.JOBS_DIRECTORY, f"{uuid.UUID(job_id)}.json")
+
+    @staticmethod
+    def init_heartbeat() -> None:
+        """ Regularly touches the files of this web worker's unfinished jobs, to show that they are still running. """
+        while True:
+            for job_id in list(JobService.active_jobs):
+                try:
+                    os.utime(JobService.get_job_path(job_id))
+                except FileNotFoundError:
+                    pass
+            time.sleep(Config.INTERVAL_JOB_HEARTBEAT)
+
+    @staticmethod
+    def is_lost(job: dict, heartbeat_time: float) -> bool:
+        """ Checks whether the web worker that owns an unfinished job is gone, e.g. after a restart or a timeout. """
+        if job["status"] not in [JobStatus.pending.name, JobStatus.running.name]:
+            return False
+        if time.time() - heartbeat_time > Config.JOB_HEARTBEAT_TIMEOUT:
+            return True
+        try:
+            # signal 0 only checks whether the process exists
+            os.kill(job["pid"], 0)
+        except ProcessLookupError:
+            return True
+        except (KeyError, PermissionError):
+            # jobs from older versions have no owner, and processes of other users cannot be signaled
+            pass
+        return False
+
+    @staticmethod
+    def run_job(app: Flask, job: dict, target: Callable[..., Union[Response, ConnexionResponse]], *args) -> None:
+        """ Executes a job in the background and saves its result, including errors. """
+        with app.app_context():
+            JobService.save_job(dict(job, status=JobStatus.running.name))
+            try:
+                response: Union[Response, ConnexionResponse] = target(*args)
+            except Exception as e:
+                app.logger.exception(f"Job {job['id']} failed.")
+                JobService.save_job(dict(job, status=JobStatus.failed.name, status_code=500, result=dict(
+                    title=Config.ERROR_TITLE_INTERNAL_SERVER_ERROR, detail=str(e))))
+                return
+            finally:
+                JobService.active_jobs.discard(job["id"])
+            if isinstance(response, ConnexionResponse):
+                # problems are created by connexion, so their body is already a dictionary
+                job.update(status_code=response.status_code, result=response.body)
+            else:
+                job.update(status_code=response.status_code, result=json.loads(response.get_data(as_text=True)))
+            job["status"] = (JobStatus.finished if job["status_code"] < 400 else JobStatus.failed).name
+            JobService.save_job(job)
+
+    @staticmethod
+    def save_job(job: dict) -> None:
+        """ Replaces the state of a job, so clients never see it only partially written. """
+        path: str = JobService.get_job_path(job["id"])
+        tmp_path: str = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+        with open(tmp_path, "w+") as f:
+            f.write(json.dumps(job))
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def submit(target: Callable[..., Union[Response, ConnexionResponse]], *args) -> Response:
+        """ Starts a job in the background and tells the client where to find its result. """
+        os.makedirs(Config.JOBS_DIRECTORY, exist_ok=True)
+        JobService.clean_jobs()
+        JobService.start_heartbeat()
+        job: dict = dict(id=str(uuid.uuid4()), status=JobStatus.pending.name, status_code=None, result=None,
+                         created_time=time.time(), pid=os.getpid())
+        JobService.save_job(job)
+        JobService.active_jobs.add(job["id"])
+        JobService.executor.submit(JobService.run_job, current_app._get_current_object(), job, target, *args)
+        response: Response = NetworkService.make_json_response(job)
+        response.status_code = 202
+        response.headers["Location"] = f"{Config.SERVER_URI_JOBS}/{job['id']}"
+        return response
+
+    @staticmethod
+    def start_heartbeat() -> None:
+        """ Starts the heartbeat for the jobs of this web worker, unless it is already running. """
+        with JobService.heartbeat_lock:
+            if JobService.heartbeat is None or not JobService.heartbeat.is_alive():
+                JobService.heartbeat = Thread(target=JobService.init_heartbeat, daemon=True)
+                JobService.heartbeat.start()
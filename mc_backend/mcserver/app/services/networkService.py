@@ -1,38 +1,228 @@
+import gzip
+import hashlib
 import json
 from datetime import datetime
-from typing import Dict
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Set
 
+import msgpack
 import rapidjson
+import requests
 
-from flask import Response
+from flask import Response, has_request_context, request
 from flask_restful.reqparse import RequestParser
 
 from mcserver import Config
-from mcserver.app.models import StaticExercise
+from mcserver.app.models import StaticExercise, HttpClient, MimeType, AnnisResponse, GraphData, GraphLink, GraphNode
 from mcserver.models_auto import Exercise
 from openapi.openapi_server.models import MatchingExercise
 
 
 class NetworkService:
     base_request_parser: RequestParser = RequestParser(bundle_errors=True)
+    # shared by all requests to the Corpus Storage Manager, so they can reuse existing connections
+    csm_client: HttpClient = HttpClient(
+        Config.CSM_CLIENT_POOL_SIZE, (Config.CSM_CLIENT_CONNECT_TIMEOUT, Config.CSM_CLIENT_READ_TIMEOUT),
+        Config.CSM_CLIENT_RETRIES, Config.CSM_CLIENT_BACKOFF_FACTOR, Config.CSM_CLIENT_FAILURE_THRESHOLD,
+        Config.CSM_CLIENT_RESET_TIMEOUT)
     exercises: Dict[str, StaticExercise] = {}
     exercises_last_update: datetime = datetime.fromtimestamp(0)
+    # lets the Corpus Storage Manager know that we prefer its compact binary format for large graph payloads
+    msgpack_headers: Dict[str, str] = dict(Accept=f"{MimeType.msgpack.value}, {MimeType.json.value};q=0.9")
+    table_column_nested: int = 2
+    table_column_plain: int = 0
+    table_column_strings: int = 1
+    # marks tables, which are encoded as lists, so they cannot be confused with any other data
+    table_marker: object = object()
+    table_marker_code: int = 1
+    # marks keys that are missing from some of the rows in a table, as opposed to keys whose value is None
+    table_missing: object = object()
+    table_missing_code: int = 0
 
     @staticmethod
-    def get_exercise_uri(exercise: Exercise):
-        return f"{Config.SERVER_URI_FILE}/{exercise.eid}"
-
-    @staticmethod
-    def make_json_response(response_input: object, indent: int = None) -> Response:
-        """Transforms the resulting objects to JSON so we can send them to the client."""
-        dump_result = rapidjson.dumps(response_input, indent=indent)
-        response: Response = Response(dump_result, mimetype="application/json")
+    def add_cors_headers(response: Response) -> Response:
+        """ Lets the frontend use the response, even though it is served from a different origin. """
         # prevent CORS (double check in addition to using the Flask-CORS module)
         response.headers.add('Access-Control-Allow-Origin', '*')
         # prevent CORB
         response.headers.add('Access-Control-Allow-Headers', "Content-Type")
         return response
 
+    @staticmethod
+    def decode_tables(value: Any, strings: List[str]) -> Any:
+        """ Restores the lists of dictionaries that were encoded as tables, see encode_tables. """
+        if isinstance(value, dict):
+            return {k: NetworkService.decode_tables(v, strings) for k, v in value.items()}
+        if not isinstance(value, list):
+            return value
+        if not value or value[0] is not NetworkService.table_marker:
+            return [NetworkService.decode_tables(x, strings) for x in value]
+        keys, kinds, has_missing, row_count, encoded_columns = value[1:]
+        if not keys:
+            return [{} for i in range(row_count)]
+        missing: object = NetworkService.table_missing
+        columns: List[list] = []
+        for column, kind in zip(encoded_columns, kinds):
+            if kind == NetworkService.table_column_strings:
+                column = [strings[x] if x.__class__ is int else x for x in column] \
+                    if None in column or missing in column else list(map(strings.__getitem__, column))
+            elif kind == NetworkService.table_column_nested:
+                column = [NetworkService.decode_tables(x, strings) for x in column]
+            columns.append(column)
+        if has_missing:
+            return [{k: v for k, v in zip(keys, row) if v is not missing} for row in zip(*columns)]
+        return [dict(zip(keys, row)) for row in zip(*columns)]
+
+    @staticmethod
+    def encode_tables(value: Any, strings: Dict[str, int]) -> Any:
+        """Encodes lists of dictionaries, e.g. the nodes and links of a graph, as tables: Every key is stored only
+        once and the values are stored column by column. Strings in the tables are replaced by their index in a shared
+        string table, because node IDs and annotations tend to repeat a lot. Each table is a list that starts with a
+        marker, so it cannot be confused with the actual data, and records its number of rows, which may not have any
+        columns at all."""
+        if isinstance(value, dict):
+            return {k: NetworkService.encode_tables(v, strings) for k, v in value.items()}
+        if not isinstance(value, list):
+            return value
+        if not value or not all(isinstance(x, dict) for x in value):
+            return [NetworkService.encode_tables(x, strings) for x in value]
+        keys: List[str] = list(dict.fromkeys(k for row in value for k in row))
+        has_missing: bool = any(len(row) != len(keys) for row in value)
+        columns: List[list] = []
+        kinds: List[int] = []
+        for key in keys:
+            column: list = [row.get(key, NetworkService.table_missing) for row in value] if has_missing else \
+                list(map(itemgetter(key), value))
+            types: Set[type] = set(map(type, column))
+            if str in types and types <= {str, type(None), object}:
+                kinds.append(NetworkService.table_column_strings)
+                column = [strings.setdefault(x, len(strings)) if x.__class__ is str else x for x in column]
+            elif types & {dict, list}:
+                kinds.append(NetworkService.table_column_nested)
+                column = [NetworkService.encode_tables(x, strings) for x in column]
+            else:
+                kinds.append(NetworkService.table_column_plain)
+            columns.append(column)
+        return [NetworkService.table_marker, keys, kinds, has_missing, len(value), columns]
+
+    @staticmethod
+    def get_exercise_uri(exercise: Exercise):
+        return f"{Config.SERVER_URI_FILE}/{exercise.eid}"
+
+    @staticmethod
+    def load_annis_response(value: dict) -> AnnisResponse:
+        """ Restores a response from the Corpus Storage Manager, building the graph directly instead of by
+        reflection. """
+        ar: AnnisResponse = AnnisResponse.from_dict({k: v for k, v in value.items() if k != "graph_data"})
+        gd: dict = value.get("graph_data")
+        if gd is not None:
+            ar.graph_data = GraphData(
+                directed=gd.get("directed"), graph=gd.get("graph"), links=[GraphLink(**x) for x in gd.get("links", [])],
+                multigraph=gd.get("multigraph"), nodes=[GraphNode(**x) for x in gd.get("nodes", [])])
+        return ar
+
+    @staticmethod
+    def load_response(response: requests.Response) -> Any:
+        """ Decodes the content of a response from the Corpus Storage Manager, depending on its format. """
+        if response.headers.get("Content-Type", "").startswith(MimeType.msgpack.value):
+            return NetworkService.unpack(response.content)
+        return json.loads(response.text)
+
+    @staticmethod
+    def make_etag(*parts: object) -> str:
+        """ Derives a strong entity tag from the content of a response or from the version of its resources. """
+        content: bytes = parts[0] if len(parts) == 1 and isinstance(parts[0], bytes) else \
+            "\0".join(str(x) for x in parts).encode("utf-8")
+        return hashlib.sha256(content).hexdigest()[:32]
+
+    @staticmethod
+    def make_json_response(response_input: object, indent: int = None, etag: str = None) -> Response:
+        """Transforms the resulting objects to JSON so we can send them to the client. Large responses are compressed
+        if the client accepts it. The entity tag is derived from the content, unless the caller knows the version of
+        the resources, see make_not_modified_response."""
+        dump_result: bytes = rapidjson.dumps(response_input, indent=indent).encode("utf-8")
+        if not has_request_context():
+            # background jobs have no client to negotiate with, so they keep the plain result
+            return NetworkService.add_cors_headers(Response(dump_result, mimetype=MimeType.json.value))
+        etag = etag or NetworkService.make_etag(dump_result)
+        response: Optional[Response] = NetworkService.make_not_modified_response(etag)
+        if response is not None:
+            return response
+        is_compressed: bool = len(dump_result) >= Config.COMPRESSION_MIN_SIZE and \
+            request.accept_encodings.best_match(["gzip"]) == "gzip"
+        response = Response(gzip.compress(dump_result, Config.COMPRESSION_LEVEL) if is_compressed else dump_result,
+                            mimetype=MimeType.json.value)
+        if is_compressed:
+            response.content_encoding = "gzip"
+        # every encoding is a representation of its own, so it needs a separate entity tag
+        response.set_etag(etag + ("-gzip" if is_compressed else ""))
+        response.vary.add("Accept-Encoding")
+        return NetworkService.add_cors_headers(response)
+
+    @staticmethod
+    def make_msgpack_response(response_input: object) -> Response:
+        """Transforms the resulting objects to a compact binary format, which is smaller and faster to decode than
+        JSON, especially for graphs."""
+        return NetworkService.add_cors_headers(
+            Response(NetworkService.pack(response_input), mimetype=MimeType.msgpack.value))
+
+    @staticmethod
+    def make_ndjson_response(response_input: Iterable[object]) -> Response:
+        """Streams the resulting objects to the client as newline-delimited JSON, one object per line."""
+        response: Response = Response((rapidjson.dumps(x) + "\n" for x in response_input),
+                                      mimetype="application/x-ndjson")
+        return NetworkService.add_cors_headers(response)
+
+    @staticmethod
+    def make_not_modified_response(etag: str) -> Optional[Response]:
+        """Tells the client that its copy of a resource is still up to date, if it sent a matching entity tag. Callers
+        that know the version of a resource can check this before doing any work. Only reading requests are
+        conditional, because other requests, e.g. creating an exercise, need to be processed anyway."""
+        if request.method not in ["GET", "HEAD"]:
+            return None
+        matching_etags: List[str] = [x for x in [etag, etag + "-gzip"] if request.if_none_match.contains_weak(x)]
+        if not matching_etags:
+            return None
+        response: Response = Response(status=304)
+        response.set_etag(matching_etags[0])
+        response.vary.add("Accept-Encoding")
+        return NetworkService.add_cors_headers(response)
+
+    @staticmethod
+    def make_response(response_input: object) -> Response:
+        """ Sends the resulting objects in the format that the client prefers, i.e. JSON or MessagePack. """
+        if request.accept_mimetypes.best_match([MimeType.json.value, MimeType.msgpack.value]) == \
+                MimeType.msgpack.value:
+            return NetworkService.make_msgpack_response(response_input)
+        return NetworkService.make_json_response(response_input)
+
+    @staticmethod
+    def pack(value: object) -> bytes:
+        """ Serializes objects to MessagePack, using tables for lists of dictionaries. """
+        strings: Dict[str, int] = {}
+        data: Any = NetworkService.encode_tables(value, strings)
+        return msgpack.packb(dict(data=data, strings=list(strings)), use_bin_type=True,
+                             default=NetworkService.pack_marker)
+
+    @staticmethod
+    def pack_marker(value: object) -> msgpack.ExtType:
+        """ Serializes the markers for tables and for missing keys in a table, which MessagePack does not know by
+        itself. """
+        if value is NetworkService.table_marker:
+            return msgpack.ExtType(NetworkService.table_marker_code, b"")
+        elif value is NetworkService.table_missing:
+            return msgpack.ExtType(NetworkService.table_missing_code, b"")
+        raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+    @staticmethod
+    def serialize_annis_response(ar: AnnisResponse) -> dict:
+        """ Serializes a response to plain values, handling its graph directly, see serialize_graph_data. """
+        ret_val: dict = AnnisResponse(
+            exercise_id=ar.exercise_id, exercise_type=ar.exercise_type, frequency_analysis=ar.frequency_analysis,
+            solutions=ar.solutions, text_complexity=ar.text_complexity, uri=ar.uri).to_dict()
+        ret_val["graph_data"] = None if ar.graph_data is None else NetworkService.serialize_graph_data(ar.graph_data)
+        return ret_val
+
     @staticmethod
     def serialize_exercise(exercise: MatchingExercise, compress: bool) -> dict:
         """ Serializes an exercise to JSON format. """
@@ -43,3 +233,23 @@ class NetworkService:
         ret_val["search_values"] = json.loads(exercise.search_values)
         ret_val["solutions"] = [] if compress else json.loads(exercise.solutions)
         return ret_val
+
+    @staticmethod
+    def serialize_graph_data(gd: GraphData) -> dict:
+        """ Serializes a graph to plain values, which is much faster than to_dict because it reads the attributes of
+        all the nodes and links at once instead of inspecting each of them. """
+        return dict(directed=gd.directed, graph=gd.graph,
+                    links=[dict(zip(GraphLink.fields, GraphLink.values(x))) for x in gd.links],
+                    multigraph=gd.multigraph,
+                    nodes=[dict(zip(GraphNode.fields, GraphNode.values(x))) for x in gd.nodes])
+
+    @staticmethod
+    def unpack(content: bytes) -> Any:
+        """ Deserializes objects from MessagePack, see pack. """
+        packed: dict = msgpack.unpackb(content, raw=False, ext_hook=NetworkService.unpack_marker)
+        return NetworkService.decode_tables(packed["data"], packed["strings"])
+
+    @staticmethod
+    def unpack_marker(code: int, data: bytes) -> object:
+        """ Restores the markers for tables and for missing keys in a table, see pack_marker. """
+        return NetworkService.table_marker if code == NetworkService.table_marker_code else NetworkService.table_missing
@@ -0,0 +1,141 @@
+import os
+import shutil
+from threading import Lock
+from typing import Dict, List, Tuple
+from urllib.parse import unquote
+
+import rapidjson as json
+from graphannis.cs import CorpusStorageManager
+from graphannis.errors import NoSuchCorpus, GraphANNISException
+from networkx import MultiDiGraph
+
+from mcserver.app.models import ReadReplicaCorpusStorageManager
+from mcserver.app.services import AnnotationService, FileService, NetworkService
+from mcserver.config import Config
+
+
+class ReplicaService:
+    """Service for sharing the graph database between a single writer process and multiple read replicas.
+
+    graphANNIS allows only one process to open a data directory, so every read replica links the corpora of the writer
+    into a directory of its own. Whenever the writer changes a corpus, it updates the replication file, which tells
+    the read replicas to reload their view of the graph database."""
+
+    generations: Dict[str, int] = {}
+    lock: Lock = Lock()
+    replication_signature: Tuple[int, int] = (0, 0)
+
+    @staticmethod
+    def get_graph(cts_urn: str, need_parse: bool = False) -> MultiDiGraph:
+        """ Retrieves a graph from the read replica, asking the writer to import it first if necessary. """
+        disk_urn: str = AnnotationService.get_disk_urn(cts_urn)
+        # graphANNIS remembers missing corpora, so do not look for them before they have been published
+        if disk_urn not in ReplicaService.generations or (need_parse and not AnnotationService.is_parsed(disk_urn)):
+            ReplicaService.request_import(cts_urn, need_parse)
+        try:
+            return Config.CORPUS_STORAGE_MANAGER.subcorpus_graph(disk_urn, [cts_urn + '/doc1'])
+        except (NoSuchCorpus, GraphANNISException):
+            return MultiDiGraph()
+
+    @staticmethod
+    def init_replica() -> None:
+        """ Opens the graph database for a new read replica. """
+        ReplicaService.generations = {}
+        ReplicaService.replication_signature = (0, 0)
+        ReplicaService.sync()
+        if not isinstance(Config.CORPUS_STORAGE_MANAGER, ReadReplicaCorpusStorageManager):
+            # the writer has not published any corpora yet
+            ReplicaService.open_replica([])
+
+    @staticmethod
+    def init_writer() -> None:
+        """ Publishes the corpora that are already in the graph database, so the read replicas can find them. """
+        generations: Dict[str, int] = ReplicaService.load_generations()
+        corpora: List[str] = [unquote(x) for x in Config.CORPUS_STORAGE_MANAGER.list()]
+        ReplicaService.save_generations({x: generations.get(x, 1) for x in corpora})
+
+    @staticmethod
+    def load_generations() -> Dict[str, int]:
+        """ Loads the number of changes for each corpus in the graph database, as published by the writer. """
+        if not os.path.exists(Config.GRAPH_DATABASE_REPLICATION_PATH):
+            return {}
+        return json.loads(FileService.get_file_content(Config.GRAPH_DATABASE_REPLICATION_PATH))
+
+    @staticmethod
+    def link_corpora(replica_dir: str) -> None:
+        """ Links all the corpora of the writer into the data directory of this read replica. """
+        shutil.rmtree(replica_dir, ignore_errors=True)
+        os.makedirs(replica_dir)
+        os.makedirs(Config.GRAPH_DATABASE_DIR, exist_ok=True)
+        for entry in os.scandir(Config.GRAPH_DATABASE_DIR):
+            if entry.is_dir():
+                os.symlink(entry.path, os.path.join(replica_dir, entry.name))
+
+    @staticmethod
+    def open_replica(corpora: List[str]) -> None:
+        """ (Re)opens the graph database of this read replica, which contains the given published corpora. """
+        replica_dir: str = os.path.join(Config.GRAPH_DATABASE_REPLICAS_DIR, str(os.getpid()))
+        cs: CorpusStorageManager = Config.CORPUS_STORAGE_MANAGER
+        if isinstance(cs, ReadReplicaCorpusStorageManager) and cs.db_dir == replica_dir:
+            # reopen the existing storage, because other threads may still be using it
+            cs.corpora = corpora
+            cs.reload(lambda: ReplicaService.link_corpora(replica_dir))
+            return
+        if cs is not None:
+            cs.__exit__(None, None, None)
+        ReplicaService.link_corpora(replica_dir)
+        Config.CORPUS_STORAGE_MANAGER = ReadReplicaCorpusStorageManager(replica_dir, corpora)
+
+    @staticmethod
+    def publish(corpus_name: str, is_deleted: bool = False) -> None:
+        """ Tells the read replicas that a corpus has changed. """
+        # changed corpora are completely written to disk before they are moved to the graph database, so there is no
+        # need to reload the graph database here, see LockingCorpusStorageManager.replace_corpus
+        with ReplicaService.lock:
+            generations: Dict[str, int] = ReplicaService.load_generations()
+            if is_deleted:
+                generations.pop(corpus_name, None)
+            else:
+                generations[corpus_name] = generations.get(corpus_name, 0) + 1
+            ReplicaService.save_generations(generations)
+
+    @staticmethod
+    def request_import(cts_urn: str, need_parse: bool = False) -> None:
+        """ Asks the writer process to import a corpus and reloads the read replica afterwards. """
+        # the writer does not send the graph back, because the read replica queries it on its own anyway
+        url: str = f"{Config.INTERNET_PROTOCOL}{Config.HOST_IP_CSM}:{Config.CORPUS_STORAGE_MANAGER_WRITER_PORT}" + \
+                   Config.SERVER_URI_CSM_IMPORT
+        NetworkService.csm_client.post(url, params=dict(urn=cts_urn, parse=str(need_parse).lower()))
+        ReplicaService.sync()
+
+    @staticmethod
+    def save_generations(generations: Dict[str, int]) -> None:
+        """ Replaces the replication file, so read replicas never see it only partially written. """
+        tmp_path: str = Config.GRAPH_DATABASE_REPLICATION_PATH + ".tmp"
+        with open(tmp_path, "w+") as f:
+            f.write(json.dumps(generations))
+        os.replace(tmp_path, Config.GRAPH_DATABASE_REPLICATION_PATH)
+
+    @staticmethod
+    def sync() -> None:
+        """ Reloads the read replica if the writer has changed the graph database since the last check. """
+        if not os.path.exists(Config.GRAPH_DATABASE_REPLICATION_PATH):
+            return
+        stat: os.stat_result = os.stat(Config.GRAPH_DATABASE_REPLICATION_PATH)
+        # the replication file is replaced on every change, so its inode changes even if its timestamp does not
+        signature: Tuple[int, int] = (stat.st_ino, stat.st_mtime_ns)
+        if signature == ReplicaService.replication_signature:
+            return
+        with ReplicaService.lock:
+            if signature == ReplicaService.replication_signature:
+                # another thread has already reloaded the read replica
+                return
+            generations: Dict[str, int] = ReplicaService.load_generations()
+            from mcserver.app.services import CorpusService
+            for disk_urn in set(ReplicaService.generations) | set(generations):
+                if generations.get(disk_urn) != ReplicaService.generations.get(disk_urn):
+                    CorpusService.graph_data_cache.invalidate(disk_urn)
+            # update the generations only afterwards, so nobody looks for new corpora before they have been linked
+            ReplicaService.open_replica(list(generations))
+            ReplicaService.generations = generations
+            ReplicaService.replication_signature = signature
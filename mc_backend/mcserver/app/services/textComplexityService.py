@@ -4,25 +4,33 @@ from typing import Dict, List, Set
 import requests
 from mcserver import Config
 from mcserver.app.models import GraphData, TextComplexity, TextComplexityMeasure, AnnisResponse
-from mcserver.app.services import TextService, AnnotationService, CorpusService
+from mcserver.app.services import TextService, AnnotationService, CorpusService, NetworkService
 from openapi.openapi_server.models import TextComplexityForm
 
 
 class TextComplexityService:
     """ Service for calculating text complexity. """
-    current_graph_data: GraphData
-
-    @staticmethod
-    def average_sentence_length(urn: str, is_csm: bool) -> float:
+    # AQL queries for the measures that need to search the corpus
+    aql_map: Dict[str, List[str]] = {
+        "n_abl_abs": ["tok ->dep[deprel=/(nsubj|nsubj:pass|csubj|csubj:pass)/] feats=/.*Abl.*/"],
+        "n_clause": ["deps"],
+        "n_gerund": ["feats=/.*VerbForm=Ger.*/"],
+        "n_inf": ['feats=/.*Inf.*/ ->dep[deprel=/(nsubj|nsubj:pass|csubj|csubj:pass)/] feats=/.*Acc.*/',
+                  'feats=/.*Acc.*/ ->dep[deprel=/(xcomp|ccomp)/] feats=/.*Inf.*/'],
+        "n_part": ["feats=/.*VerbForm=Part.*/"],
+        "n_subclause": ['tok ->dep[deprel=/(acl|advcl|ccomp|xcomp)/] upostag="VERB"']}
+
+    @staticmethod
+    def average_sentence_length(urn: str, is_csm: bool, gd: GraphData, counts: Dict[str, int]) -> float:
         """ Gives back the average sentence length. """
-        words: int = TextComplexityService.how_many_words(urn, is_csm)
-        sentences: int = TextComplexityService.how_many_sentences(urn, is_csm)
+        words: int = TextComplexityService.how_many_words(urn, is_csm, gd, counts)
+        sentences: int = TextComplexityService.how_many_sentences(urn, is_csm, gd, counts)
         return words / sentences
 
     @staticmethod
-    def average_word_length(urn: str, is_csm: bool) -> float:
+    def average_word_length(urn: str, is_csm: bool, gd: GraphData, counts: Dict[str, int]) -> float:
         """Gives back the mean number of characters for word."""
-        tok_lengths: List[int] = [len(x.annis_tok) for x in TextComplexityService.current_graph_data.nodes]
+        tok_lengths: List[int] = [len(x.annis_tok) for x in gd.nodes]
         return sum(tok_lengths) / len(tok_lengths)
 
     @staticmethod
@@ -60,6 +68,19 @@ class TextComplexityService:
         tc_measure_overall.append((tc.n_part / divisor) * 100)
         return round(sum(tc_measure_overall) / len(tc_measure_overall), 2)
 
+    @staticmethod
+    def count_matches(urn: str, measure: str, is_csm: bool, counts: Dict[str, int]) -> int:
+        """ Gives back the number of matches for all AQL queries of a measure, preferably from the batched counts. """
+        return sum(counts[aql] if aql in counts else CorpusService.count_matches(urn, aql, is_csm=is_csm)
+                   for aql in TextComplexityService.aql_map[measure])
+
+    @staticmethod
+    def get_aqls(measure: str) -> List[str]:
+        """ Collects the AQL queries that are needed to calculate a measure, or all of them. """
+        measures: List[str] = list(TextComplexityService.get_measure_map()) \
+            if measure == TextComplexityMeasure.all.name else [measure]
+        return [y for x in measures for y in TextComplexityService.aql_map.get(x, [])]
+
     @staticmethod
     def get_measure_map() -> Dict[str, callable]:
         """ Maps each measure to its corresponding calculation function. """
@@ -77,92 +98,77 @@ class TextComplexityService:
             "n_part": TextComplexityService.how_many_participles}
 
     @staticmethod
-    def get_types() -> Set[str]:
+    def get_types(gd: GraphData) -> Set[str]:
         """ Gives back the types in the text. """
-        return set(x.annis_tok for x in TextComplexityService.current_graph_data.nodes)
+        return set(x.annis_tok for x in gd.nodes)
 
     @staticmethod
-    def how_many_ablativi_absoluti(urn: str, is_csm: bool) -> int:
+    def how_many_ablativi_absoluti(urn: str, is_csm: bool, gd: GraphData, counts: Dict[str, int]) -> int:
         """ Gives back the number of ablativi absoluti in the text. """
-        aql: str = "tok ->dep[deprel=/(nsubj|nsubj:pass|csubj|csubj:pass)/] feats=/.*Abl.*/"
-        node_ids: List[str] = CorpusService.find_matches(urn, aql, is_csm=is_csm)
-        return round(len(node_ids) / 2)
+        return TextComplexityService.count_matches(urn, "n_abl_abs", is_csm, counts)
 
     @staticmethod
-    def how_many_gerunds(urn: str, is_csm: bool) -> int:
+    def how_many_gerunds(urn: str, is_csm: bool, gd: GraphData, counts: Dict[str, int]) -> int:
         """ Gives back the number of gerunds in the text. """
-        aql: str = "feats=/.*VerbForm=Ger.*/"
-        node_ids: List[str] = CorpusService.find_matches(urn, aql, is_csm=is_csm)
         # TODO: gerundivo
-        return len(node_ids)
+        return TextComplexityService.count_matches(urn, "n_gerund", is_csm, counts)
 
     @staticmethod
-    def how_many_infinitives(urn: str, is_csm: bool) -> int:
+    def how_many_infinitives(urn: str, is_csm: bool, gd: GraphData, counts: Dict[str, int]) -> int:
         """ Gives back the number of infinitives in the text. """
-        aql: str = 'feats=/.*Inf.*/ ->dep[deprel=/(nsubj|nsubj:pass|csubj|csubj:pass)/] feats=/.*Acc.*/'
-        node_ids: List[str] = CorpusService.find_matches(urn, aql, is_csm=is_csm)
-        aql = 'feats=/.*Acc.*/ ->dep[deprel=/(xcomp|ccomp)/] feats=/.*Inf.*/'
-        node_ids += CorpusService.find_matches(urn, aql, is_csm=is_csm)
-        return round(len(node_ids) / 2)
+        return TextComplexityService.count_matches(urn, "n_inf", is_csm, counts)
 
     @staticmethod
-    def how_many_main_clauses(urn: str, is_csm: bool) -> int:
+    def how_many_main_clauses(urn: str, is_csm: bool, gd: GraphData, counts: Dict[str, int]) -> int:
         """ Gives back how many clauses are in the text. """
         # TODO: ellipsis not counted
-        aql: str = "deps"
-        node_ids: List[str] = CorpusService.find_matches(urn, aql, is_csm=is_csm)
-        return len(node_ids)
+        return TextComplexityService.count_matches(urn, "n_clause", is_csm, counts)
 
     @staticmethod
-    def how_many_participles(urn: str, is_csm: bool) -> int:
+    def how_many_participles(urn: str, is_csm: bool, gd: GraphData, counts: Dict[str, int]) -> int:
         """Gives back how many participles are in the text"""
-        aql: str = "feats=/.*VerbForm=Part.*/"
-        node_ids: List[str] = CorpusService.find_matches(urn, aql, is_csm=is_csm)
-        return len(node_ids)
+        return TextComplexityService.count_matches(urn, "n_part", is_csm, counts)
 
     @staticmethod
-    def how_many_pos(urn: str, is_csm: bool) -> int:
+    def how_many_pos(urn: str, is_csm: bool, gd: GraphData, counts: Dict[str, int]) -> int:
         """ Gives back how many different parts of speech are in the text. """
-        pos_list: List[str] = [x.udep_upostag for x in TextComplexityService.current_graph_data.nodes]
+        pos_list: List[str] = [x.udep_upostag for x in gd.nodes]
         # TODO: visualize pos + pos density
         return len(set(pos_list))
 
     @staticmethod
-    def how_many_punctuation(urn: str, is_csm: bool) -> int:
+    def how_many_punctuation(urn: str, is_csm: bool, gd: GraphData, counts: Dict[str, int]) -> int:
         """ Gives back how many different parts of speech are in the text. """
-        return len([x for x in TextComplexityService.current_graph_data.nodes if x.udep_upostag == "PUNCT"])
+        return len([x for x in gd.nodes if x.udep_upostag == "PUNCT"])
 
     @staticmethod
-    def how_many_sentences(urn: str, is_csm: bool) -> int:
+    def how_many_sentences(urn: str, is_csm: bool, gd: GraphData, counts: Dict[str, int]) -> int:
         """Gives back the number of sentences in the text"""
-        sentences_ids: List[int] = [AnnotationService.get_sentence_id(node) for node in
-                                    TextComplexityService.current_graph_data.nodes]
+        sentences_ids: List[int] = [AnnotationService.get_sentence_id(node) for node in gd.nodes]
         return len(set(sentences_ids))
 
     @staticmethod
-    def how_many_sub_clauses(urn: str, is_csm: bool) -> int:
+    def how_many_sub_clauses(urn: str, is_csm: bool, gd: GraphData, counts: Dict[str, int]) -> int:
         """Gives back the number of subordinate clauses in the text. """
-        aql: str = 'tok ->dep[deprel=/(acl|advcl|ccomp|xcomp)/] upostag="VERB"'
-        node_ids: List[str] = CorpusService.find_matches(urn, aql, is_csm=is_csm)
         # TODO: degree of sub clauses; ellipsis not counted
-        return round(len(node_ids) / 2)
+        return TextComplexityService.count_matches(urn, "n_subclause", is_csm, counts)
 
     @staticmethod
-    def how_many_types(urn: str, is_csm: bool) -> int:
+    def how_many_types(urn: str, is_csm: bool, gd: GraphData, counts: Dict[str, int]) -> int:
         """ Gives back the numbers of types. """
-        types: Set[str] = TextComplexityService.get_types()
+        types: Set[str] = TextComplexityService.get_types(gd)
         return len(types)
 
     @staticmethod
-    def how_many_words(urn: str, is_csm: bool) -> int:
+    def how_many_words(urn: str, is_csm: bool, gd: GraphData, counts: Dict[str, int]) -> int:
         """ Gives back the number of words in the text. """
-        return len(TextComplexityService.current_graph_data.nodes)
+        return len(gd.nodes)
 
     @staticmethod
-    def lexical_density(urn: str, is_csm: bool) -> float:
+    def lexical_density(urn: str, is_csm: bool, gd: GraphData, counts: Dict[str, int]) -> float:
         """ Gives back the lexical density of the text. """
-        token_count: int = TextComplexityService.how_many_words(urn, is_csm)
-        types: Set[str] = TextComplexityService.get_types()
+        token_count: int = TextComplexityService.how_many_words(urn, is_csm, gd, counts)
+        types: Set[str] = TextComplexityService.get_types(gd)
         content_words: Set[str] = set()
         for word in types:
             if word not in TextService.stop_words_latin:
@@ -172,22 +178,26 @@ class TextComplexityService:
     @staticmethod
     def text_complexity(measure: str, urn: str, is_csm: bool, gd: GraphData) -> TextComplexity:
         """ Defines the text complexity according to the kind of measure requested. """
-        if is_csm:
+        if is_csm or Config.IS_CSM_IN_PROCESS:
             measure_map: Dict[str, callable] = TextComplexityService.get_measure_map()
-            TextComplexityService.current_graph_data = gd
+            # run all the necessary corpus searches at once instead of one after the other
+            aqls: List[str] = TextComplexityService.get_aqls(measure)
+            # requests may run concurrently, so the graph and counts are passed to each measure instead of being stored
+            counts: Dict[str, int] = CorpusService.count_matches_batch(urn, aqls, True) if aqls else {}
             tc: TextComplexity = TextComplexity()
             if measure == TextComplexityMeasure.all.name:
                 for key in measure_map:
-                    tc.__setattr__(key, round(measure_map[key](urn, is_csm), 2))
+                    tc.__setattr__(key, round(measure_map[key](urn, is_csm, gd, counts), 2))
                 tc.all = TextComplexityService.calculate_overall_complexity(tc)
             else:
-                tc.__setattr__(measure, round(measure_map[measure](urn, is_csm), 2))
+                tc.__setattr__(measure, round(measure_map[measure](urn, is_csm, gd, counts), 2))
             return tc
         else:
             url: str = f"{Config.INTERNET_PROTOCOL}{Config.HOST_IP_CSM}:" + \
                        f"{Config.CORPUS_STORAGE_MANAGER_PORT}{Config.SERVER_URI_TEXT_COMPLEXITY}"
             ar: AnnisResponse = AnnisResponse(graph_data=gd)
-            tcf: TextComplexityForm = TextComplexityForm(urn=urn, measure=TextComplexityMeasure.all.name,
-                                                         annis_response=json.dumps(ar.to_dict()))
-            response: requests.Response = requests.post(url, data=tcf.to_dict())
+            tcf: TextComplexityForm = TextComplexityForm(
+                urn=urn, measure=TextComplexityMeasure.all.name,
+                annis_response=json.dumps(NetworkService.serialize_annis_response(ar)))
+            response: requests.Response = NetworkService.csm_client.post(url, data=tcf.to_dict())
             return TextComplexity.from_dict(json.loads(response.text))
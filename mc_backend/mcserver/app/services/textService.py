@@ -10,7 +10,7 @@ import conllu
 import requests
 from conllu import TokenList
 
-from mcserver.app.models import Solution
+from mcserver.app.models import Solution, SolutionElement
 from mcserver.config import Config
 from mcserver.models_auto import Exercise
 
@@ -75,7 +75,7 @@ class TextService:
         solutions: List[Solution] = TextService.get_solutions_by_index(exercise, solution_indices)
         conll: List[TokenList] = conllu.parse(exercise.conll)
         for solution in solutions:
-            target_token: OrderedDict = TextService.get_token_by_salt_id(solution.target.salt_id, conll)
+            target_token: OrderedDict = TextService.get_token(solution.target, conll)
             target_token["form"] = "*{0}*".format(target_token["form"])
         text_with_gaps: str = TextService.strip_whitespace(" ".join([y["form"] for x in conll for y in x]))
         return text_with_gaps
@@ -89,13 +89,11 @@ class TextService:
         return [available_solutions[i] for i in solution_indices] if len(solution_indices) > 0 else []
 
     @staticmethod
-    def get_token_by_salt_id(salt_id: str, conll: List[TokenList]):
-        """Searches textual data for a specific token, given its SALT ID."""
-        key_parts: List[str] = salt_id.split("#")[-1].split("tok")
-        sentence_id: str = key_parts[0].replace("sent", "")
+    def get_token(solution_element: SolutionElement, conll: List[TokenList]) -> OrderedDict:
+        """Searches textual data for a specific token, given the IDs of its sentence and of itself."""
+        sentence_id: str = str(solution_element.sentence_id)
         target_sentence: TokenList = next(x for x in conll if x.metadata["sent_id"] == sentence_id)
-        token_id: str = key_parts[1]
-        return next(x for x in target_sentence if x["id"] == int(token_id))
+        return next(x for x in target_sentence if x["id"] == solution_element.token_id)
 
     @staticmethod
     def init_proper_nouns_list() -> None:
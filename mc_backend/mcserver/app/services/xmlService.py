@@ -96,7 +96,7 @@ class XMLservice:
         gap_counter: int = 0
         for solution in solutions:
             gap_counter += 1
-            target_token: OrderedDict = TextService.get_token_by_salt_id(solution.target.salt_id, conll)
+            target_token: OrderedDict = TextService.get_token(solution.target, conll)
             target_token["form"] = "[[{0}]]".format(gap_counter) if file_type == FileType.XML else "_" * max_gap_length
         return TextService.strip_whitespace(" ".join([y["form"] for x in conll for y in x]))
 
@@ -19,7 +19,10 @@ class Config(object):
     CURRENT_WORKING_DIRECTORY = os.getcwd()
     CURRENT_WORKING_DIRECTORY_PARENT = os.path.dirname(CURRENT_WORKING_DIRECTORY)
     CURRENT_WORKING_DIRECTORY_PARTS = os.path.split(CURRENT_WORKING_DIRECTORY)  # [::-1]
-    GRAPH_DATABASE_DIR = os.path.join(os.sep, "tmp", "graphannis-data")
+    GRAPH_DATABASE_ROOT = os.environ.get("GRAPH_DATABASE_ROOT", os.path.join(os.sep, "tmp", "graphannis-data"))
+    # increase this whenever the way corpora are imported changes, so outdated graph data is not used anymore
+    GRAPH_DATABASE_VERSION = 2
+    GRAPH_DATABASE_DIR = os.path.join(GRAPH_DATABASE_ROOT, f"v{GRAPH_DATABASE_VERSION}")
     CSM_DIRECTORY = os.path.join(CURRENT_WORKING_DIRECTORY, "csm")
     MC_SERVER_DIRECTORY = CURRENT_WORKING_DIRECTORY if \
         os.path.split(CURRENT_WORKING_DIRECTORY)[-1] == "mcserver" else os.path.join(CURRENT_WORKING_DIRECTORY,
@@ -36,20 +39,49 @@ class Config(object):
     TREEBANKS_PATH = os.path.join(ASSETS_DIRECTORY, "treebanks")
     TREEBANKS_PROIEL_PATH = os.path.join(TREEBANKS_PATH, "proiel")
 
+    ANNOTATION_DEPTH_PARSE = "parse"
+    ANNOTATION_DEPTH_TAG = "tag"
     API_SPEC_CSM_FILE_PATH = os.path.join(CSM_DIRECTORY, "csm_api.yaml")
     API_SPEC_MCSERVER_FILE_PATH = os.path.join(MC_SERVER_DIRECTORY, "mcserver_api.yaml")
     API_SPEC_MODELS_YAML_FILE_PATH = os.path.join(Path(MC_SERVER_DIRECTORY).parent, "openapi_models.yaml")
     AQL_CASE = "/.*Case=.*/"
     AQL_DEP = "->dep"
     AQL_DEPREL = "deprel"
+    # the corpus node of every imported text records whether it was fully parsed or only tagged
+    AQL_DEPTH = "mc:depth"
+    # every token records its sentence ID, its ID in the sentence and its position in the text, so they do not need to
+    # be extracted from node names or link orderings
+    AQL_SENTENCE_ID = "mc:sentence_id"
     AQL_TOK = "tok"
+    AQL_TOKEN_ID = "mc:token_id"
+    AQL_TOKEN_INDEX = "mc:token_index"
     CACHE_DIRECTORY = os.path.join(MC_SERVER_APP_DIRECTORY, "cache")
+    # gzip level for large responses; higher levels take much longer, but hardly make graphs any smaller
+    COMPRESSION_LEVEL = int(os.environ.get("COMPRESSION_LEVEL", 6))
+    # smaller responses are sent uncompressed, because compressing them is not worth the effort
+    COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1000))
     CONLLU2SVG_PATH_LINUX = os.path.join(ASSETS_DIRECTORY, "conllu2svg_linux64")
     CONLLU2SVG_PATH_OSX = os.path.join(ASSETS_DIRECTORY, "conllu2svg_osx")
     CORPUS_STORAGE_MANAGER: CorpusStorageManager = None
     CORPUS_STORAGE_MANAGER_PORT = 6555
+    # number of read-only CSM worker processes; if 0, a single process reads and writes the graph database
+    CORPUS_STORAGE_MANAGER_READ_REPLICAS = int(os.environ.get("CSM_READ_REPLICAS", 0))
+    # number of threads per CSM worker process, i.e. requests that are handled concurrently by each of them
+    CORPUS_STORAGE_MANAGER_THREADS = int(os.environ.get("CSM_THREADS", 1))
+    CORPUS_STORAGE_MANAGER_WRITER_PORT = 6556
     COVERAGE_CONFIGURATION_FILE_NAME = ".coveragerc"
     COVERAGE_ENVIRONMENT_VARIABLE = "COVERAGE_PROCESS_START"
+    # connections from the MC server to the CSM: retries use an exponential backoff, starting at this many seconds
+    CSM_CLIENT_BACKOFF_FACTOR = float(os.environ.get("CSM_CLIENT_BACKOFF_FACTOR", 0.5))
+    CSM_CLIENT_CONNECT_TIMEOUT = float(os.environ.get("CSM_CLIENT_CONNECT_TIMEOUT", 5))
+    # number of consecutive failures after which requests to the CSM fail immediately for a while
+    CSM_CLIENT_FAILURE_THRESHOLD = int(os.environ.get("CSM_CLIENT_FAILURE_THRESHOLD", 5))
+    # number of keep-alive connections per MC server worker process
+    CSM_CLIENT_POOL_SIZE = int(os.environ.get("CSM_CLIENT_POOL_SIZE", 10))
+    # annotating and searching large texts may take several minutes
+    CSM_CLIENT_READ_TIMEOUT = float(os.environ.get("CSM_CLIENT_READ_TIMEOUT", 600))
+    CSM_CLIENT_RESET_TIMEOUT = float(os.environ.get("CSM_CLIENT_RESET_TIMEOUT", 30))
+    CSM_CLIENT_RETRIES = int(os.environ.get("CSM_CLIENT_RETRIES", 3))
     CSRF_ENABLED = True
     CTS_API_BASE_URL = "https://cts.perseids.org/api/cts/"
     CUSTOM_CORPUS_CAES_GAL_FILE_PATH = os.path.join(TREEBANKS_PROIEL_PATH, "caes-gal.conllu")
@@ -79,6 +111,8 @@ class Config(object):
         "error (e.g., malformed request syntax, invalid request message framing, or deceptive request routing)."
     ERROR_MESSAGE_CORPUS_NOT_FOUND = "A corpus with the specified ID was not found!"
     ERROR_MESSAGE_EXERCISE_NOT_FOUND = "An exercise with the specified ID was not found!"
+    ERROR_MESSAGE_JOB_INTERRUPTED = "The job was interrupted, e.g. because the server was restarted."
+    ERROR_MESSAGE_JOB_NOT_FOUND = "A job with the specified ID was not found!"
     ERROR_MESSAGE_INTERNAL_SERVER_ERROR = \
         "The server encountered an unexpected condition that prevented it from fulfilling the request."
     ERROR_MESSAGE_SERVICE_UNAVAILABLE = \
@@ -93,12 +127,27 @@ class Config(object):
     ERROR_TITLE_SERVICE_UNAVAILABLE = "Service Unavailable"
     ERROR_TITLE_UNPROCESSABLE_ENTITY = "Unprocessable Entity"
     FAVICON_FILE_NAME = "favicon.ico"
+    # maximum number of AQL queries that are run in parallel when searching a corpus for multiple queries at once
+    FIND_BATCH_MAX_WORKERS = int(os.environ.get("FIND_BATCH_MAX_WORKERS", 4))
+    # number of matches that are fetched from graphANNIS at once when streaming search results
+    FIND_STREAM_CHUNK_SIZE = 1000
     FLASK_MIGRATE = "migrate"
+    # minimum number of seconds between two updates of the last access time of a corpus on disk
+    GRAPH_DATABASE_ACCESS_RESOLUTION = 60
+    GRAPH_DATABASE_MANIFEST_PATH = os.path.join(GRAPH_DATABASE_DIR, "manifest.json")
+    # disk budget (in bytes) for the graph database; the least recently used derived corpora are evicted to keep it
+    GRAPH_DATABASE_MAX_SIZE = int(os.environ.get("GRAPH_DATABASE_MAX_SIZE", 10 * 1000 ** 3))
+    GRAPH_DATABASE_REPLICAS_DIR = os.path.join(GRAPH_DATABASE_ROOT, "replicas")
+    # tells the read replicas which corpora exist and how often each of them has been changed by the writer
+    GRAPH_DATABASE_REPLICATION_PATH = os.path.join(GRAPH_DATABASE_DIR, "replication.json")
     GRAPHANNIS_DEPENDENCY_LINK = "dep"
     GRAPHANNIS_LOG_PATH = os.path.join(os.getcwd(), "graphannis.log")
+    # maximum number of nodes (summed up over all graphs) to be kept in the in-memory graph data cache of the CSM
+    GRAPH_DATA_CACHE_MAX_SIZE = int(os.environ.get("GRAPH_DATA_CACHE_MAX_SIZE", 200 * 1000))
     H5P_DIRECTORY = "/home/mc/h5p" if IS_DOCKER else os.path.join(MC_FRONTEND_DIRECTORY, "src", "assets", "h5p")
     # Windows: use 127.0.0.1 as host IP fallback
     HOST_IP_FALLBACK = "0.0.0.0"
+    HEADER_TOTAL_COUNT = "X-Total-Count"
     HOST_IP_CSM = DOCKER_SERVICE_NAME_CSM if IS_DOCKER else HOST_IP_FALLBACK
     HOST_IP_MCSERVER = DOCKER_SERVICE_NAME_MCSERVER if IS_DOCKER else HOST_IP_FALLBACK
     HOST_PORT = 5000
@@ -107,8 +156,20 @@ class Config(object):
     INTERVAL_CORPUS_UPDATE = 60 * 60 * 24
     INTERVAL_EXERCISE_DELETE = 60 * 60 * 24 * 30 * 12
     INTERVAL_FILE_DELETE = 60 * 60 * 24
+    INTERVAL_GRAPH_DATABASE_SWEEP = 60 * 10
+    INTERVAL_JOB_DELETE = 60 * 60 * 24
+    INTERVAL_JOB_HEARTBEAT = 10
     INTERVAL_STATIC_EXERCISES = 60 * 60 * 24
+    # lets the MC server open the graph database and search it directly, without running a separate CSM
+    IS_CSM_IN_PROCESS = os.environ.get("CSM_IN_PROCESS", "").lower() == "true"
+    # set for the worker processes that only read from the graph database, see CORPUS_STORAGE_MANAGER_READ_REPLICAS
+    IS_CSM_READ_REPLICA = False
+    IS_CSM_WRITER = os.environ.get("CSM_WRITER", False)
     IS_PRODUCTION = os.environ.get("FLASK_ENV_VARIABLE", "development") == "production"
+    # unfinished jobs without a heartbeat for this many seconds are considered lost, even if their process still exists
+    JOB_HEARTBEAT_TIMEOUT = 60 * 10
+    JOB_MAX_WORKERS = int(os.environ.get("JOB_MAX_WORKERS", 4))
+    JOBS_DIRECTORY = os.path.join(FILES_DIRECTORY, "jobs")
     LEARNING_ANALYTICS_DIRECTORY = os.path.join(FILES_DIRECTORY, "learning_analytics")
     LOG_PATH_CSM = f"{DOCKER_SERVICE_NAME_CSM}.log"
     LOG_PATH_MCSERVER = f"{DOCKER_SERVICE_NAME_MCSERVER}.log"
@@ -120,21 +181,33 @@ class Config(object):
     PLATFORM_MACOS = "darwin"
     PLATFORM_WINDOWS = "win32"
     PUBLIC_FRONTEND_URL = os.environ.get("PUBLIC_FRONTEND_URL", "http://localhost:8100/")
+    # comma-separated list of CTS URNs that should be imported into the graph database in advance
+    PRE_IMPORT_URNS = [x for x in os.environ.get("PRE_IMPORT_URNS", "").split(",") if x]
+    PRE_IMPORT_WORKERS = int(os.environ.get("PRE_IMPORT_WORKERS", os.cpu_count() or 1))
     REFF_CACHE_DIRECTORY = os.path.join(CACHE_DIRECTORY, "reff")
     SECRET_KEY = 'this-really-needs-to-be-changed'
+    # characters that end a sentence, possibly followed by quotation marks or brackets
+    SENTENCE_END_PUNCTUATION = ".!?"
+    SENTENCE_END_TRAILING_CHARACTERS = " \"'»”’)]"
     # BEGIN endpoints
     # use these endpoints to access the REST API by appending them to the host name (e.g. "http://127.0.0.1:5000")
+    SERVER_URI_ANNIS_COUNT_BATCH = SERVER_URI_BASE + "countBatch"
     SERVER_URI_ANNIS_FIND = SERVER_URI_BASE + "find"
+    SERVER_URI_ANNIS_FIND_BATCH = SERVER_URI_BASE + "findBatch"
     SERVER_URI_CORPORA = SERVER_URI_BASE + "corpora"
     SERVER_URI_CSM = "/"
+    SERVER_URI_CSM_IMPORT = SERVER_URI_BASE + "import"
     SERVER_URI_CSM_SUBGRAPH = SERVER_URI_CSM + "subgraph"
     SERVER_URI_EXERCISE = SERVER_URI_BASE + "exercise"
     SERVER_URI_EXERCISE_LIST = SERVER_URI_BASE + "exerciseList"
+    SERVER_URI_EXERCISE_PREVIEW = SERVER_URI_BASE + "exercisePreview"
     SERVER_URI_FAVICON = "/favicon.ico"
     SERVER_URI_FILE = SERVER_URI_BASE + "file"
     SERVER_URI_FREQUENCY = SERVER_URI_BASE + "frequency"
     SERVER_URI_H5P = SERVER_URI_BASE + "h5p"
+    SERVER_URI_JOBS = SERVER_URI_BASE + "jobs"
     SERVER_URI_KWIC = SERVER_URI_BASE + "kwic"
+    SERVER_URI_METRICS = SERVER_URI_BASE + "metrics"
     SERVER_URI_RAW_TEXT = SERVER_URI_BASE + "rawtext"
     SERVER_URI_STATIC_EXERCISES = SERVER_URI_BASE + "staticExercises"
     SERVER_URI_TEXT_COMPLEXITY = SERVER_URI_BASE + "textcomplexity"
@@ -155,10 +228,15 @@ class Config(object):
     TESTING = False
     TRAP_HTTP_EXCEPTIONS = True
     TREEBANKS_CACHE_DIRECTORY = os.path.join(CACHE_DIRECTORY, "treebanks")
+    UDPIPE_CACHE_DIRECTORY = os.path.join(CACHE_DIRECTORY, "udpipe")
+    UDPIPE_CACHE_MAX_SIZE = int(os.environ.get("UDPIPE_CACHE_MAX_SIZE", 1000 ** 3))
     UDPIPE_MODEL_PATH = os.path.join(ASSETS_DIRECTORY, "latin-ittb-ud-2.0-conll17-170315.udpipe")
+    UDPIPE_PARALLEL_MIN_LENGTH = int(os.environ.get("UDPIPE_PARALLEL_MIN_LENGTH", 20 * 1000))
     UDPIPE_PATH_LINUX = os.path.join(ASSETS_DIRECTORY, "udpipe_linux64")
     UDPIPE_PATH_OSX = os.path.join(ASSETS_DIRECTORY, "udpipe_osx")
     UDPIPE_PATH_WIN64 = os.path.join(ASSETS_DIRECTORY, "udpipe_win64.exe")
+    UDPIPE_POOL_SIZE = int(os.environ.get("UDPIPE_POOL_SIZE", 2))
+    UDPIPE_TIMEOUT = float(os.environ.get("UDPIPE_TIMEOUT", 60))
     VOCABULARY_AGLDT_FILE_NAME = "vocabulary_ancient_greek_latin_dependency_treebank.json"
     VOCABULARY_BWS_FILE_NAME = "vocabulary_bamberg_core.json"
     VOCABULARY_PROIEL_FILE_NAME = "vocabulary_proiel_treebank.json"
@@ -7,4 +7,5 @@ bind = "{0}:{1}".format(Config.HOST_IP_MCSERVER, Config.HOST_PORT)
 debug = False
 reload = True
 timeout = 3600
-workers = multiprocessing.cpu_count() * 2 + 1
+# only one process may write to the graph database, so the in-process mode needs a single worker
+workers = 1 if Config.IS_CSM_IN_PROCESS else multiprocessing.cpu_count() * 2 + 1
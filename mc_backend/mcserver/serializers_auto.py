@@ -0,0 +1,842 @@
+"""Autogenerated serializers for the OpenAPI models, see serializer_generator.py."""
+from openapi.openapi_server.models import AnnisResponse, Corpus, ExerciseBase, ExerciseExtension, ExerciseForm, ExerciseFormAllOf, FrequencyItem, GraphData, H5PForm, InlineObject, KwicForm, Link, MatchingExercise, MatchingExerciseAllOf, NodeMC, Sentence, Solution, SolutionElement, StaticExercise, TextComplexity, TextComplexityForm, TextComplexityFormExtension, VectorNetworkForm, VocabularyForm
+from openapi.openapi_server.util import _deserialize_primitive as deserialize_primitive
+
+
+def to_plain(value: object) -> object:
+    """Converts nested models to dictionaries, like the generic Model.to_dict."""
+    if isinstance(value, list):
+        return [x.to_dict() if hasattr(x, "to_dict") else x for x in value]
+    elif hasattr(value, "to_dict"):
+        return value.to_dict()
+    elif isinstance(value, dict):
+        return {k: v.to_dict() if hasattr(v, "to_dict") else v for k, v in value.items()}
+    return value
+
+
+def annis_response_from_dict(cls: type, dikt: dict) -> AnnisResponse:
+    instance: AnnisResponse = cls()
+    if dikt is None:
+        return instance
+    if 'exercise_id' in dikt:
+        value = dikt['exercise_id']
+        instance.exercise_id = None if value is None else str(value)
+    if 'exercise_type' in dikt:
+        value = dikt['exercise_type']
+        instance.exercise_type = None if value is None else str(value)
+    if 'frequency_analysis' in dikt:
+        value = dikt['frequency_analysis']
+        instance.frequency_analysis = None if value is None else [None if x0 is None else frequency_item_from_dict(FrequencyItem, x0) for x0 in value]
+    if 'graph_data' in dikt:
+        value = dikt['graph_data']
+        instance.graph_data = None if value is None else graph_data_from_dict(GraphData, value)
+    if 'solutions' in dikt:
+        value = dikt['solutions']
+        instance.solutions = None if value is None else [None if x0 is None else solution_from_dict(Solution, x0) for x0 in value]
+    if 'text_complexity' in dikt:
+        value = dikt['text_complexity']
+        instance.text_complexity = None if value is None else text_complexity_from_dict(TextComplexity, value)
+    if 'uri' in dikt:
+        value = dikt['uri']
+        instance.uri = None if value is None else str(value)
+    return instance
+
+
+def annis_response_to_dict(self: AnnisResponse) -> dict:
+    return {'exercise_id': self._exercise_id,
+            'exercise_type': self._exercise_type,
+            'frequency_analysis': to_plain(self._frequency_analysis),
+            'graph_data': to_plain(self._graph_data),
+            'solutions': to_plain(self._solutions),
+            'text_complexity': to_plain(self._text_complexity),
+            'uri': self._uri}
+
+
+def corpus_from_dict(cls: type, dikt: dict) -> Corpus:
+    instance: Corpus = cls()
+    if dikt is None:
+        return instance
+    if 'author' in dikt:
+        value = dikt['author']
+        instance.author = None if value is None else str(value)
+    if 'cid' in dikt:
+        value = dikt['cid']
+        instance.cid = None if value is None else deserialize_primitive(value, int)
+    if 'citation_level_1' in dikt:
+        value = dikt['citation_level_1']
+        instance.citation_level_1 = None if value is None else str(value)
+    if 'citation_level_2' in dikt:
+        value = dikt['citation_level_2']
+        instance.citation_level_2 = None if value is None else str(value)
+    if 'citation_level_3' in dikt:
+        value = dikt['citation_level_3']
+        instance.citation_level_3 = None if value is None else str(value)
+    if 'source_urn' in dikt:
+        value = dikt['source_urn']
+        instance.source_urn = None if value is None else str(value)
+    if 'title' in dikt:
+        value = dikt['title']
+        instance.title = None if value is None else str(value)
+    return instance
+
+
+def corpus_to_dict(self: Corpus) -> dict:
+    return {'author': self._author,
+            'cid': self._cid,
+            'citation_level_1': self._citation_level_1,
+            'citation_level_2': self._citation_level_2,
+            'citation_level_3': self._citation_level_3,
+            'source_urn': self._source_urn,
+            'title': self._title}
+
+
+def exercise_base_from_dict(cls: type, dikt: dict) -> ExerciseBase:
+    instance: ExerciseBase = cls()
+    if dikt is None:
+        return instance
+    if 'correct_feedback' in dikt:
+        value = dikt['correct_feedback']
+        instance.correct_feedback = None if value is None else str(value)
+    if 'general_feedback' in dikt:
+        value = dikt['general_feedback']
+        instance.general_feedback = None if value is None else str(value)
+    if 'incorrect_feedback' in dikt:
+        value = dikt['incorrect_feedback']
+        instance.incorrect_feedback = None if value is None else str(value)
+    if 'instructions' in dikt:
+        value = dikt['instructions']
+        instance.instructions = None if value is None else str(value)
+    if 'language' in dikt:
+        value = dikt['language']
+        instance.language = None if value is None else str(value)
+    if 'partially_correct_feedback' in dikt:
+        value = dikt['partially_correct_feedback']
+        instance.partially_correct_feedback = None if value is None else str(value)
+    if 'search_values' in dikt:
+        value = dikt['search_values']
+        instance.search_values = None if value is None else str(value)
+    if 'work_author' in dikt:
+        value = dikt['work_author']
+        instance.work_author = None if value is None else str(value)
+    if 'work_title' in dikt:
+        value = dikt['work_title']
+        instance.work_title = None if value is None else str(value)
+    return instance
+
+
+def exercise_base_to_dict(self: ExerciseBase) -> dict:
+    return {'correct_feedback': self._correct_feedback,
+            'general_feedback': self._general_feedback,
+            'incorrect_feedback': self._incorrect_feedback,
+            'instructions': self._instructions,
+            'language': self._language,
+            'partially_correct_feedback': self._partially_correct_feedback,
+            'search_values': self._search_values,
+            'work_author': self._work_author,
+            'work_title': self._work_title}
+
+
+def exercise_extension_from_dict(cls: type, dikt: dict) -> ExerciseExtension:
+    instance: ExerciseExtension = cls()
+    if dikt is None:
+        return instance
+    if 'conll' in dikt:
+        value = dikt['conll']
+        instance.conll = None if value is None else str(value)
+    if 'eid' in dikt:
+        value = dikt['eid']
+        instance.eid = None if value is None else str(value)
+    if 'exercise_type' in dikt:
+        value = dikt['exercise_type']
+        instance.exercise_type = None if value is None else str(value)
+    if 'last_access_time' in dikt:
+        value = dikt['last_access_time']
+        instance.last_access_time = None if value is None else deserialize_primitive(value, float)
+    if 'solutions' in dikt:
+        value = dikt['solutions']
+        instance.solutions = None if value is None else str(value)
+    if 'text_complexity' in dikt:
+        value = dikt['text_complexity']
+        instance.text_complexity = None if value is None else deserialize_primitive(value, float)
+    if 'urn' in dikt:
+        value = dikt['urn']
+        instance.urn = None if value is None else str(value)
+    return instance
+
+
+def exercise_extension_to_dict(self: ExerciseExtension) -> dict:
+    return {'conll': self._conll,
+            'eid': self._eid,
+            'exercise_type': self._exercise_type,
+            'last_access_time': self._last_access_time,
+            'solutions': self._solutions,
+            'text_complexity': self._text_complexity,
+            'urn': self._urn}
+
+
+def exercise_form_from_dict(cls: type, dikt: dict) -> ExerciseForm:
+    instance: ExerciseForm = cls()
+    if dikt is None:
+        return instance
+    if 'correct_feedback' in dikt:
+        value = dikt['correct_feedback']
+        instance.correct_feedback = None if value is None else str(value)
+    if 'general_feedback' in dikt:
+        value = dikt['general_feedback']
+        instance.general_feedback = None if value is None else str(value)
+    if 'incorrect_feedback' in dikt:
+        value = dikt['incorrect_feedback']
+        instance.incorrect_feedback = None if value is None else str(value)
+    if 'instructions' in dikt:
+        value = dikt['instructions']
+        instance.instructions = None if value is None else str(value)
+    if 'language' in dikt:
+        value = dikt['language']
+        instance.language = None if value is None else str(value)
+    if 'partially_correct_feedback' in dikt:
+        value = dikt['partially_correct_feedback']
+        instance.partially_correct_feedback = None if value is None else str(value)
+    if 'search_values' in dikt:
+        value = dikt['search_values']
+        instance.search_values = None if value is None else str(value)
+    if 'work_author' in dikt:
+        value = dikt['work_author']
+        instance.work_author = None if value is None else str(value)
+    if 'work_title' in dikt:
+        value = dikt['work_title']
+        instance.work_title = None if value is None else str(value)
+    if 'type' in dikt:
+        value = dikt['type']
+        instance.type = None if value is None else str(value)
+    if 'type_translation' in dikt:
+        value = dikt['type_translation']
+        instance.type_translation = None if value is None else str(value)
+    if 'urn' in dikt:
+        value = dikt['urn']
+        instance.urn = None if value is None else str(value)
+    return instance
+
+
+def exercise_form_to_dict(self: ExerciseForm) -> dict:
+    return {'correct_feedback': self._correct_feedback,
+            'general_feedback': self._general_feedback,
+            'incorrect_feedback': self._incorrect_feedback,
+            'instructions': self._instructions,
+            'language': self._language,
+            'partially_correct_feedback': self._partially_correct_feedback,
+            'search_values': self._search_values,
+            'work_author': self._work_author,
+            'work_title': self._work_title,
+            'type': self._type,
+            'type_translation': self._type_translation,
+            'urn': self._urn}
+
+
+def exercise_form_all_of_from_dict(cls: type, dikt: dict) -> ExerciseFormAllOf:
+    instance: ExerciseFormAllOf = cls()
+    if dikt is None:
+        return instance
+    if 'type' in dikt:
+        value = dikt['type']
+        instance.type = None if value is None else str(value)
+    if 'type_translation' in dikt:
+        value = dikt['type_translation']
+        instance.type_translation = None if value is None else str(value)
+    if 'urn' in dikt:
+        value = dikt['urn']
+        instance.urn = None if value is None else str(value)
+    return instance
+
+
+def exercise_form_all_of_to_dict(self: ExerciseFormAllOf) -> dict:
+    return {'type': self._type,
+            'type_translation': self._type_translation,
+            'urn': self._urn}
+
+
+def frequency_item_from_dict(cls: type, dikt: dict) -> FrequencyItem:
+    instance: FrequencyItem = cls()
+    if dikt is None:
+        return instance
+    if 'count' in dikt:
+        value = dikt['count']
+        instance.count = None if value is None else deserialize_primitive(value, int)
+    if 'phenomena' in dikt:
+        value = dikt['phenomena']
+        instance.phenomena = None if value is None else [x0 for x0 in value]
+    if 'values' in dikt:
+        value = dikt['values']
+        instance.values = None if value is None else [None if x0 is None else str(x0) for x0 in value]
+    return instance
+
+
+def frequency_item_to_dict(self: FrequencyItem) -> dict:
+    return {'count': self._count,
+            'phenomena': to_plain(self._phenomena),
+            'values': to_plain(self._values)}
+
+
+def graph_data_from_dict(cls: type, dikt: dict) -> GraphData:
+    instance: GraphData = cls()
+    if dikt is None:
+        return instance
+    if 'directed' in dikt:
+        value = dikt['directed']
+        instance.directed = None if value is None else deserialize_primitive(value, bool)
+    if 'graph' in dikt:
+        value = dikt['graph']
+        instance.graph = value
+    if 'links' in dikt:
+        value = dikt['links']
+        instance.links = None if value is None else [None if x0 is None else link_from_dict(Link, x0) for x0 in value]
+    if 'multigraph' in dikt:
+        value = dikt['multigraph']
+        instance.multigraph = None if value is None else deserialize_primitive(value, bool)
+    if 'nodes' in dikt:
+        value = dikt['nodes']
+        instance.nodes = None if value is None else [None if x0 is None else node_mc_from_dict(NodeMC, x0) for x0 in value]
+    return instance
+
+
+def graph_data_to_dict(self: GraphData) -> dict:
+    return {'directed': self._directed,
+            'graph': to_plain(self._graph),
+            'links': to_plain(self._links),
+            'multigraph': self._multigraph,
+            'nodes': to_plain(self._nodes)}
+
+
+def h5_p_form_from_dict(cls: type, dikt: dict) -> H5PForm:
+    instance: H5PForm = cls()
+    if dikt is None:
+        return instance
+    if 'eid' in dikt:
+        value = dikt['eid']
+        instance.eid = None if value is None else str(value)
+    if 'exercise_type_path' in dikt:
+        value = dikt['exercise_type_path']
+        instance.exercise_type_path = value
+    if 'lang' in dikt:
+        value = dikt['lang']
+        instance.lang = None if value is None else str(value)
+    if 'solution_indices' in dikt:
+        value = dikt['solution_indices']
+        instance.solution_indices = None if value is None else [None if x0 is None else deserialize_primitive(x0, int) for x0 in value]
+    return instance
+
+
+def h5_p_form_to_dict(self: H5PForm) -> dict:
+    return {'eid': self._eid,
+            'exercise_type_path': to_plain(self._exercise_type_path),
+            'lang': self._lang,
+            'solution_indices': to_plain(self._solution_indices)}
+
+
+def inline_object_from_dict(cls: type, dikt: dict) -> InlineObject:
+    instance: InlineObject = cls()
+    if dikt is None:
+        return instance
+    if 'file_type' in dikt:
+        value = dikt['file_type']
+        instance.file_type = value
+    if 'html_content' in dikt:
+        value = dikt['html_content']
+        instance.html_content = None if value is None else str(value)
+    if 'learning_result' in dikt:
+        value = dikt['learning_result']
+        instance.learning_result = None if value is None else str(value)
+    if 'urn' in dikt:
+        value = dikt['urn']
+        instance.urn = None if value is None else str(value)
+    return instance
+
+
+def inline_object_to_dict(self: InlineObject) -> dict:
+    return {'file_type': to_plain(self._file_type),
+            'html_content': self._html_content,
+            'learning_result': self._learning_result,
+            'urn': self._urn}
+
+
+def kwic_form_from_dict(cls: type, dikt: dict) -> KwicForm:
+    instance: KwicForm = cls()
+    if dikt is None:
+        return instance
+    if 'search_values' in dikt:
+        value = dikt['search_values']
+        instance.search_values = None if value is None else str(value)
+    if 'urn' in dikt:
+        value = dikt['urn']
+        instance.urn = None if value is None else str(value)
+    if 'ctx_left' in dikt:
+        value = dikt['ctx_left']
+        instance.ctx_left = None if value is None else deserialize_primitive(value, int)
+    if 'ctx_right' in dikt:
+        value = dikt['ctx_right']
+        instance.ctx_right = None if value is None else deserialize_primitive(value, int)
+    return instance
+
+
+def kwic_form_to_dict(self: KwicForm) -> dict:
+    return {'search_values': self._search_values,
+            'urn': self._urn,
+            'ctx_left': self._ctx_left,
+            'ctx_right': self._ctx_right}
+
+
+def link_from_dict(cls: type, dikt: dict) -> Link:
+    instance: Link = cls()
+    if dikt is None:
+        return instance
+    if 'annis_component_name' in dikt:
+        value = dikt['annis_component_name']
+        instance.annis_component_name = None if value is None else str(value)
+    if 'annis_component_type' in dikt:
+        value = dikt['annis_component_type']
+        instance.annis_component_type = None if value is None else str(value)
+    if 'source' in dikt:
+        value = dikt['source']
+        instance.source = None if value is None else str(value)
+    if 'target' in dikt:
+        value = dikt['target']
+        instance.target = None if value is None else str(value)
+    if 'udep_deprel' in dikt:
+        value = dikt['udep_deprel']
+        instance.udep_deprel = None if value is None else str(value)
+    return instance
+
+
+def link_to_dict(self: Link) -> dict:
+    return {'annis_component_name': self._annis_component_name,
+            'annis_component_type': self._annis_component_type,
+            'source': self._source,
+            'target': self._target,
+            'udep_deprel': self._udep_deprel}
+
+
+def matching_exercise_from_dict(cls: type, dikt: dict) -> MatchingExercise:
+    instance: MatchingExercise = cls()
+    if dikt is None:
+        return instance
+    if 'correct_feedback' in dikt:
+        value = dikt['correct_feedback']
+        instance.correct_feedback = None if value is None else str(value)
+    if 'general_feedback' in dikt:
+        value = dikt['general_feedback']
+        instance.general_feedback = None if value is None else str(value)
+    if 'incorrect_feedback' in dikt:
+        value = dikt['incorrect_feedback']
+        instance.incorrect_feedback = None if value is None else str(value)
+    if 'instructions' in dikt:
+        value = dikt['instructions']
+        instance.instructions = None if value is None else str(value)
+    if 'language' in dikt:
+        value = dikt['language']
+        instance.language = None if value is None else str(value)
+    if 'partially_correct_feedback' in dikt:
+        value = dikt['partially_correct_feedback']
+        instance.partially_correct_feedback = None if value is None else str(value)
+    if 'search_values' in dikt:
+        value = dikt['search_values']
+        instance.search_values = None if value is None else str(value)
+    if 'work_author' in dikt:
+        value = dikt['work_author']
+        instance.work_author = None if value is None else str(value)
+    if 'work_title' in dikt:
+        value = dikt['work_title']
+        instance.work_title = None if value is None else str(value)
+    if 'conll' in dikt:
+        value = dikt['conll']
+        instance.conll = None if value is None else str(value)
+    if 'eid' in dikt:
+        value = dikt['eid']
+        instance.eid = None if value is None else str(value)
+    if 'exercise_type' in dikt:
+        value = dikt['exercise_type']
+        instance.exercise_type = None if value is None else str(value)
+    if 'last_access_time' in dikt:
+        value = dikt['last_access_time']
+        instance.last_access_time = None if value is None else deserialize_primitive(value, float)
+    if 'solutions' in dikt:
+        value = dikt['solutions']
+        instance.solutions = None if value is None else str(value)
+    if 'text_complexity' in dikt:
+        value = dikt['text_complexity']
+        instance.text_complexity = None if value is None else deserialize_primitive(value, float)
+    if 'urn' in dikt:
+        value = dikt['urn']
+        instance.urn = None if value is None else str(value)
+    if 'exercise_type_translation' in dikt:
+        value = dikt['exercise_type_translation']
+        instance.exercise_type_translation = None if value is None else str(value)
+    if 'matching_degree' in dikt:
+        value = dikt['matching_degree']
+        instance.matching_degree = None if value is None else deserialize_primitive(value, float)
+    return instance
+
+
+def matching_exercise_to_dict(self: MatchingExercise) -> dict:
+    return {'correct_feedback': self._correct_feedback,
+            'general_feedback': self._general_feedback,
+            'incorrect_feedback': self._incorrect_feedback,
+            'instructions': self._instructions,
+            'language': self._language,
+            'partially_correct_feedback': self._partially_correct_feedback,
+            'search_values': self._search_values,
+            'work_author': self._work_author,
+            'work_title': self._work_title,
+            'conll': self._conll,
+            'eid': self._eid,
+            'exercise_type': self._exercise_type,
+            'last_access_time': self._last_access_time,
+            'solutions': self._solutions,
+            'text_complexity': self._text_complexity,
+            'urn': self._urn,
+            'exercise_type_translation': self._exercise_type_translation,
+            'matching_degree': self._matching_degree}
+
+
+def matching_exercise_all_of_from_dict(cls: type, dikt: dict) -> MatchingExerciseAllOf:
+    instance: MatchingExerciseAllOf = cls()
+    if dikt is None:
+        return instance
+    if 'exercise_type_translation' in dikt:
+        value = dikt['exercise_type_translation']
+        instance.exercise_type_translation = None if value is None else str(value)
+    if 'matching_degree' in dikt:
+        value = dikt['matching_degree']
+        instance.matching_degree = None if value is None else deserialize_primitive(value, float)
+    return instance
+
+
+def matching_exercise_all_of_to_dict(self: MatchingExerciseAllOf) -> dict:
+    return {'exercise_type_translation': self._exercise_type_translation,
+            'matching_degree': self._matching_degree}
+
+
+def node_mc_from_dict(cls: type, dikt: dict) -> NodeMC:
+    instance: NodeMC = cls()
+    if dikt is None:
+        return instance
+    if 'annis_node_name' in dikt:
+        value = dikt['annis_node_name']
+        instance.annis_node_name = None if value is None else str(value)
+    if 'annis_node_type' in dikt:
+        value = dikt['annis_node_type']
+        instance.annis_node_type = None if value is None else str(value)
+    if 'annis_tok' in dikt:
+        value = dikt['annis_tok']
+        instance.annis_tok = None if value is None else str(value)
+    if 'annis_type' in dikt:
+        value = dikt['annis_type']
+        instance.annis_type = None if value is None else str(value)
+    if 'id' in dikt:
+        value = dikt['id']
+        instance.id = None if value is None else str(value)
+    if 'is_oov' in dikt:
+        value = dikt['is_oov']
+        instance.is_oov = None if value is None else deserialize_primitive(value, bool)
+    if 'udep_lemma' in dikt:
+        value = dikt['udep_lemma']
+        instance.udep_lemma = None if value is None else str(value)
+    if 'udep_upostag' in dikt:
+        value = dikt['udep_upostag']
+        instance.udep_upostag = None if value is None else str(value)
+    if 'udep_xpostag' in dikt:
+        value = dikt['udep_xpostag']
+        instance.udep_xpostag = None if value is None else str(value)
+    if 'udep_feats' in dikt:
+        value = dikt['udep_feats']
+        instance.udep_feats = None if value is None else str(value)
+    if 'solution' in dikt:
+        value = dikt['solution']
+        instance.solution = None if value is None else str(value)
+    if 'sentence_id' in dikt:
+        value = dikt['sentence_id']
+        instance.sentence_id = None if value is None else deserialize_primitive(value, int)
+    if 'token_id' in dikt:
+        value = dikt['token_id']
+        instance.token_id = None if value is None else deserialize_primitive(value, int)
+    if 'token_index' in dikt:
+        value = dikt['token_index']
+        instance.token_index = None if value is None else deserialize_primitive(value, int)
+    return instance
+
+
+def node_mc_to_dict(self: NodeMC) -> dict:
+    return {'annis_node_name': self._annis_node_name,
+            'annis_node_type': self._annis_node_type,
+            'annis_tok': self._annis_tok,
+            'annis_type': self._annis_type,
+            'id': self._id,
+            'is_oov': self._is_oov,
+            'udep_lemma': self._udep_lemma,
+            'udep_upostag': self._udep_upostag,
+            'udep_xpostag': self._udep_xpostag,
+            'udep_feats': self._udep_feats,
+            'solution': self._solution,
+            'sentence_id': self._sentence_id,
+            'token_id': self._token_id,
+            'token_index': self._token_index}
+
+
+def sentence_from_dict(cls: type, dikt: dict) -> Sentence:
+    instance: Sentence = cls()
+    if dikt is None:
+        return instance
+    if 'id' in dikt:
+        value = dikt['id']
+        instance.id = None if value is None else deserialize_primitive(value, int)
+    if 'matching_degree' in dikt:
+        value = dikt['matching_degree']
+        instance.matching_degree = None if value is None else deserialize_primitive(value, float)
+    return instance
+
+
+def sentence_to_dict(self: Sentence) -> dict:
+    return {'id': self._id,
+            'matching_degree': self._matching_degree}
+
+
+def solution_from_dict(cls: type, dikt: dict) -> Solution:
+    instance: Solution = cls()
+    if dikt is None:
+        return instance
+    if 'target' in dikt:
+        value = dikt['target']
+        instance.target = None if value is None else solution_element_from_dict(SolutionElement, value)
+    if 'value' in dikt:
+        value = dikt['value']
+        instance.value = None if value is None else solution_element_from_dict(SolutionElement, value)
+    return instance
+
+
+def solution_to_dict(self: Solution) -> dict:
+    return {'target': to_plain(self._target),
+            'value': to_plain(self._value)}
+
+
+def solution_element_from_dict(cls: type, dikt: dict) -> SolutionElement:
+    instance: SolutionElement = cls()
+    if dikt is None:
+        return instance
+    if 'content' in dikt:
+        value = dikt['content']
+        instance.content = None if value is None else str(value)
+    if 'salt_id' in dikt:
+        value = dikt['salt_id']
+        instance.salt_id = None if value is None else str(value)
+    if 'sentence_id' in dikt:
+        value = dikt['sentence_id']
+        instance.sentence_id = None if value is None else deserialize_primitive(value, int)
+    if 'token_id' in dikt:
+        value = dikt['token_id']
+        instance.token_id = None if value is None else deserialize_primitive(value, int)
+    return instance
+
+
+def solution_element_to_dict(self: SolutionElement) -> dict:
+    return {'content': self._content,
+            'salt_id': self._salt_id,
+            'sentence_id': self._sentence_id,
+            'token_id': self._token_id}
+
+
+def static_exercise_from_dict(cls: type, dikt: dict) -> StaticExercise:
+    instance: StaticExercise = cls()
+    if dikt is None:
+        return instance
+    if 'solutions' in dikt:
+        value = dikt['solutions']
+        instance.solutions = None if value is None else [None if x0 is None else [None if x1 is None else str(x1) for x1 in x0] for x0 in value]
+    if 'urn' in dikt:
+        value = dikt['urn']
+        instance.urn = None if value is None else str(value)
+    return instance
+
+
+def static_exercise_to_dict(self: StaticExercise) -> dict:
+    return {'solutions': to_plain(self._solutions),
+            'urn': self._urn}
+
+
+def text_complexity_from_dict(cls: type, dikt: dict) -> TextComplexity:
+    instance: TextComplexity = cls()
+    if dikt is None:
+        return instance
+    if 'all' in dikt:
+        value = dikt['all']
+        instance.all = None if value is None else deserialize_primitive(value, float)
+    if 'avg_w_len' in dikt:
+        value = dikt['avg_w_len']
+        instance.avg_w_len = None if value is None else deserialize_primitive(value, float)
+    if 'avg_w_per_sent' in dikt:
+        value = dikt['avg_w_per_sent']
+        instance.avg_w_per_sent = None if value is None else deserialize_primitive(value, float)
+    if 'lex_den' in dikt:
+        value = dikt['lex_den']
+        instance.lex_den = None if value is None else deserialize_primitive(value, float)
+    if 'n_abl_abs' in dikt:
+        value = dikt['n_abl_abs']
+        instance.n_abl_abs = None if value is None else deserialize_primitive(value, int)
+    if 'n_clause' in dikt:
+        value = dikt['n_clause']
+        instance.n_clause = None if value is None else deserialize_primitive(value, int)
+    if 'n_gerund' in dikt:
+        value = dikt['n_gerund']
+        instance.n_gerund = None if value is None else deserialize_primitive(value, int)
+    if 'n_inf' in dikt:
+        value = dikt['n_inf']
+        instance.n_inf = None if value is None else deserialize_primitive(value, int)
+    if 'n_part' in dikt:
+        value = dikt['n_part']
+        instance.n_part = None if value is None else deserialize_primitive(value, int)
+    if 'n_punct' in dikt:
+        value = dikt['n_punct']
+        instance.n_punct = None if value is None else deserialize_primitive(value, int)
+    if 'n_sent' in dikt:
+        value = dikt['n_sent']
+        instance.n_sent = None if value is None else deserialize_primitive(value, int)
+    if 'n_subclause' in dikt:
+        value = dikt['n_subclause']
+        instance.n_subclause = None if value is None else deserialize_primitive(value, int)
+    if 'n_types' in dikt:
+        value = dikt['n_types']
+        instance.n_types = None if value is None else deserialize_primitive(value, int)
+    if 'n_w' in dikt:
+        value = dikt['n_w']
+        instance.n_w = None if value is None else deserialize_primitive(value, int)
+    if 'pos' in dikt:
+        value = dikt['pos']
+        instance.pos = None if value is None else deserialize_primitive(value, int)
+    return instance
+
+
+def text_complexity_to_dict(self: TextComplexity) -> dict:
+    return {'all': self._all,
+            'avg_w_len': self._avg_w_len,
+            'avg_w_per_sent': self._avg_w_per_sent,
+            'lex_den': self._lex_den,
+            'n_abl_abs': self._n_abl_abs,
+            'n_clause': self._n_clause,
+            'n_gerund': self._n_gerund,
+            'n_inf': self._n_inf,
+            'n_part': self._n_part,
+            'n_punct': self._n_punct,
+            'n_sent': self._n_sent,
+            'n_subclause': self._n_subclause,
+            'n_types': self._n_types,
+            'n_w': self._n_w,
+            'pos': self._pos}
+
+
+def text_complexity_form_from_dict(cls: type, dikt: dict) -> TextComplexityForm:
+    instance: TextComplexityForm = cls()
+    if dikt is None:
+        return instance
+    if 'measure' in dikt:
+        value = dikt['measure']
+        instance.measure = None if value is None else str(value)
+    if 'urn' in dikt:
+        value = dikt['urn']
+        instance.urn = None if value is None else str(value)
+    if 'annis_response' in dikt:
+        value = dikt['annis_response']
+        instance.annis_response = None if value is None else str(value)
+    return instance
+
+
+def text_complexity_form_to_dict(self: TextComplexityForm) -> dict:
+    return {'measure': self._measure,
+            'urn': self._urn,
+            'annis_response': self._annis_response}
+
+
+def text_complexity_form_extension_from_dict(cls: type, dikt: dict) -> TextComplexityFormExtension:
+    instance: TextComplexityFormExtension = cls()
+    if dikt is None:
+        return instance
+    if 'measure' in dikt:
+        value = dikt['measure']
+        instance.measure = None if value is None else str(value)
+    if 'urn' in dikt:
+        value = dikt['urn']
+        instance.urn = None if value is None else str(value)
+    if 'annis_response' in dikt:
+        value = dikt['annis_response']
+        instance.annis_response = None if value is None else str(value)
+    return instance
+
+
+def text_complexity_form_extension_to_dict(self: TextComplexityFormExtension) -> dict:
+    return {'measure': self._measure,
+            'urn': self._urn,
+            'annis_response': self._annis_response}
+
+
+def vector_network_form_from_dict(cls: type, dikt: dict) -> VectorNetworkForm:
+    instance: VectorNetworkForm = cls()
+    if dikt is None:
+        return instance
+    if 'search_regex' in dikt:
+        value = dikt['search_regex']
+        instance.search_regex = None if value is None else str(value)
+    if 'nearest_neighbor_count' in dikt:
+        value = dikt['nearest_neighbor_count']
+        instance.nearest_neighbor_count = None if value is None else deserialize_primitive(value, int)
+    return instance
+
+
+def vector_network_form_to_dict(self: VectorNetworkForm) -> dict:
+    return {'search_regex': self._search_regex,
+            'nearest_neighbor_count': self._nearest_neighbor_count}
+
+
+def vocabulary_form_from_dict(cls: type, dikt: dict) -> VocabularyForm:
+    instance: VocabularyForm = cls()
+    if dikt is None:
+        return instance
+    if 'frequency_upper_bound' in dikt:
+        value = dikt['frequency_upper_bound']
+        instance.frequency_upper_bound = None if value is None else deserialize_primitive(value, int)
+    if 'query_urn' in dikt:
+        value = dikt['query_urn']
+        instance.query_urn = None if value is None else str(value)
+    if 'vocabulary' in dikt:
+        value = dikt['vocabulary']
+        instance.vocabulary = value
+    return instance
+
+
+def vocabulary_form_to_dict(self: VocabularyForm) -> dict:
+    return {'frequency_upper_bound': self._frequency_upper_bound,
+            'query_urn': self._query_urn,
+            'vocabulary': to_plain(self._vocabulary)}
+
+
+serializers: dict = {
+    AnnisResponse: (annis_response_from_dict, annis_response_to_dict),
+    Corpus: (corpus_from_dict, corpus_to_dict),
+    ExerciseBase: (exercise_base_from_dict, exercise_base_to_dict),
+    ExerciseExtension: (exercise_extension_from_dict, exercise_extension_to_dict),
+    ExerciseForm: (exercise_form_from_dict, exercise_form_to_dict),
+    ExerciseFormAllOf: (exercise_form_all_of_from_dict, exercise_form_all_of_to_dict),
+    FrequencyItem: (frequency_item_from_dict, frequency_item_to_dict),
+    GraphData: (graph_data_from_dict, graph_data_to_dict),
+    H5PForm: (h5_p_form_from_dict, h5_p_form_to_dict),
+    InlineObject: (inline_object_from_dict, inline_object_to_dict),
+    KwicForm: (kwic_form_from_dict, kwic_form_to_dict),
+    Link: (link_from_dict, link_to_dict),
+    MatchingExercise: (matching_exercise_from_dict, matching_exercise_to_dict),
+    MatchingExerciseAllOf: (matching_exercise_all_of_from_dict, matching_exercise_all_of_to_dict),
+    NodeMC: (node_mc_from_dict, node_mc_to_dict),
+    Sentence: (sentence_from_dict, sentence_to_dict),
+    Solution: (solution_from_dict, solution_to_dict),
+    SolutionElement: (solution_element_from_dict, solution_element_to_dict),
+    StaticExercise: (static_exercise_from_dict, static_exercise_to_dict),
+    TextComplexity: (text_complexity_from_dict, text_complexity_to_dict),
+    TextComplexityForm: (text_complexity_form_from_dict, text_complexity_form_to_dict),
+    TextComplexityFormExtension: (text_complexity_form_extension_from_dict, text_complexity_form_extension_to_dict),
+    VectorNetworkForm: (vector_network_form_from_dict, vector_network_form_to_dict),
+    VocabularyForm: (vocabulary_form_from_dict, vocabulary_form_to_dict),
+}
@@ -15,7 +15,7 @@ class NodeMC(Model):
     Do not edit the class manually.
     """
 
-    def __init__(self, annis_node_name=None, annis_node_type=None, annis_tok=None, annis_type=None, id=None, is_oov=None, udep_lemma=None, udep_upostag=None, udep_xpostag=None, udep_feats=None, solution=None):  # noqa: E501
+    def __init__(self, annis_node_name=None, annis_node_type=None, annis_tok=None, annis_type=None, id=None, is_oov=None, udep_lemma=None, udep_upostag=None, udep_xpostag=None, udep_feats=None, solution=None, sentence_id=None, token_id=None, token_index=None):  # noqa: E501
         """NodeMC - a model defined in OpenAPI
 
         :param annis_node_name: The annis_node_name of this NodeMC.  # noqa: E501
@@ -40,6 +40,12 @@ class NodeMC(Model):
         :type udep_feats: str
         :param solution: The solution of this NodeMC.  # noqa: E501
         :type solution: str
+        :param sentence_id: The sentence_id of this NodeMC.  # noqa: E501
+        :type sentence_id: int
+        :param token_id: The token_id of this NodeMC.  # noqa: E501
+        :type token_id: int
+        :param token_index: The token_index of this NodeMC.  # noqa: E501
+        :type token_index: int
         """
         self.openapi_types = {
             'annis_node_name': str,
@@ -52,7 +58,10 @@ class NodeMC(Model):
             'udep_upostag': str,
             'udep_xpostag': str,
             'udep_feats': str,
-            'solution': str
+            'solution': str,
+            'sentence_id': int,
+            'token_id': int,
+            'token_index': int
         }
 
         self.attribute_map = {
@@ -66,7 +75,10 @@ class NodeMC(Model):
             'udep_upostag': 'udep_upostag',
             'udep_xpostag': 'udep_xpostag',
             'udep_feats': 'udep_feats',
-            'solution': 'solution'
+            'solution': 'solution',
+            'sentence_id': 'sentence_id',
+            'token_id': 'token_id',
+            'token_index': 'token_index'
         }
 
         self._annis_node_name = annis_node_name
@@ -80,6 +92,9 @@ class NodeMC(Model):
         self._udep_xpostag = udep_xpostag
         self._udep_feats = udep_feats
         self._solution = solution
+        self._sentence_id = sentence_id
+        self._token_id = token_id
+        self._token_index = token_index
 
     @classmethod
     def from_dict(cls, dikt) -> 'NodeMC':
@@ -344,3 +359,72 @@ class NodeMC(Model):
         """
 
         self._solution = solution
+
+    @property
+    def sentence_id(self):
+        """Gets the sentence_id of this NodeMC.
+
+        Identifier of the sentence in the corpus, as recorded when the text was imported.  # noqa: E501
+
+        :return: The sentence_id of this NodeMC.
+        :rtype: int
+        """
+        return self._sentence_id
+
+    @sentence_id.setter
+    def sentence_id(self, sentence_id):
+        """Sets the sentence_id of this NodeMC.
+
+        Identifier of the sentence in the corpus, as recorded when the text was imported.  # noqa: E501
+
+        :param sentence_id: The sentence_id of this NodeMC.
+        :type sentence_id: int
+        """
+
+        self._sentence_id = sentence_id
+
+    @property
+    def token_id(self):
+        """Gets the token_id of this NodeMC.
+
+        Identifier of the token in its sentence, as recorded when the text was imported.  # noqa: E501
+
+        :return: The token_id of this NodeMC.
+        :rtype: int
+        """
+        return self._token_id
+
+    @token_id.setter
+    def token_id(self, token_id):
+        """Sets the token_id of this NodeMC.
+
+        Identifier of the token in its sentence, as recorded when the text was imported.  # noqa: E501
+
+        :param token_id: The token_id of this NodeMC.
+        :type token_id: int
+        """
+
+        self._token_id = token_id
+
+    @property
+    def token_index(self):
+        """Gets the token_index of this NodeMC.
+
+        Position of the token in the whole text, starting at 0.  # noqa: E501
+
+        :return: The token_index of this NodeMC.
+        :rtype: int
+        """
+        return self._token_index
+
+    @token_index.setter
+    def token_index(self, token_index):
+        """Sets the token_index of this NodeMC.
+
+        Position of the token in the whole text, starting at 0.  # noqa: E501
+
+        :param token_index: The token_index of this NodeMC.
+        :type token_index: int
+        """
+
+        self._token_index = token_index
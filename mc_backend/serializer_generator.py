@@ -0,0 +1,95 @@
+"""The models from OpenAPI Generator serialize and deserialize themselves by reflection, i.e. they look up the type of
+every attribute whenever they are converted. This script generates specialized functions for each model instead, which
+mcserver/app/models.py installs in place of the generic ones. Run it whenever the models change."""
+import inspect
+import os
+from typing import List
+
+from openapi.openapi_server import typing_utils
+from openapi.openapi_server.models.base_model_ import Model
+import openapi.openapi_server.models
+
+header: str = '''"""Autogenerated serializers for the OpenAPI models, see serializer_generator.py."""
+from openapi.openapi_server.models import {0}
+from openapi.openapi_server.util import _deserialize_primitive as deserialize_primitive
+
+
+def to_plain(value: object) -> object:
+    """Converts nested models to dictionaries, like the generic Model.to_dict."""
+    if isinstance(value, list):
+        return [x.to_dict() if hasattr(x, "to_dict") else x for x in value]
+    elif hasattr(value, "to_dict"):
+        return value.to_dict()
+    elif isinstance(value, dict):
+        return {{k: v.to_dict() if hasattr(v, "to_dict") else v for k, v in value.items()}}
+    return value'''
+output_path: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcserver", "serializers_auto.py")
+primitive_types: List[type] = [bool, float, int, str]
+
+
+def get_function_name(model: type) -> str:
+    """Derives a function prefix from the module of a model, e.g. annis_response for AnnisResponse."""
+    return model.__module__.split(".")[-1]
+
+
+def make_from_dict(model: type) -> List[str]:
+    """Generates a function that deserializes a dictionary to a model."""
+    instance: Model = model()
+    lines: List[str] = [
+        "", "", f"def {get_function_name(model)}_from_dict(cls: type, dikt: dict) -> {model.__name__}:",
+        f"    instance: {model.__name__} = cls()", "    if dikt is None:", "        return instance"]
+    for attribute, attribute_type in instance.openapi_types.items():
+        key: str = instance.attribute_map[attribute]
+        lines += [f"    if {key!r} in dikt:", f"        value = dikt[{key!r}]",
+                  f"        instance.{attribute} = {make_value('value', attribute_type, 0)}"]
+    return lines + ["    return instance"]
+
+
+def make_deserialization(name: str, value_type: type, depth: int) -> str:
+    """Generates an expression that deserializes a value of the given type, which is not None."""
+    if value_type is str:
+        return f"str({name})"
+    elif value_type in primitive_types:
+        return f"deserialize_primitive({name}, {value_type.__name__})"
+    elif value_type is object:
+        return name
+    elif typing_utils.is_generic(value_type):
+        item_name: str = f"x{depth}"
+        if typing_utils.is_list(value_type):
+            return f"[{make_value(item_name, value_type.__args__[0], depth + 1)} for {item_name} in {name}]"
+        key_name: str = f"k{depth}"
+        return f"{{{key_name}: {make_value(item_name, value_type.__args__[1], depth + 1)} " \
+               f"for {key_name}, {item_name} in {name}.items()}}"
+    elif not value_type().openapi_types:
+        # enumerations keep their raw value
+        return name
+    return f"{get_function_name(value_type)}_from_dict({value_type.__name__}, {name})"
+
+
+def make_to_dict(model: type) -> List[str]:
+    """Generates a function that serializes a model to a dictionary."""
+    instance: Model = model()
+    values: List[str] = [f"{attribute!r}: self._{attribute}" if attribute_type in primitive_types else
+                         f"{attribute!r}: to_plain(self._{attribute})"
+                         for attribute, attribute_type in instance.openapi_types.items()]
+    return ["", "", f"def {get_function_name(model)}_to_dict(self: {model.__name__}) -> dict:",
+            "    return {" + ",\n            ".join(values) + "}"]
+
+
+def make_value(name: str, value_type: type, depth: int) -> str:
+    """Generates an expression that deserializes a value of the given type, or None."""
+    expression: str = make_deserialization(name, value_type, depth)
+    return expression if expression == name else f"None if {name} is None else {expression}"
+
+
+models: List[type] = [x for _, x in inspect.getmembers(openapi.openapi_server.models, inspect.isclass)
+                      if issubclass(x, Model) and x is not Model and x().openapi_types]
+content: List[str] = [header.format(", ".join(x.__name__ for x in models))]
+for model in models:
+    content += make_from_dict(model) + make_to_dict(model)
+content += ["", "", "serializers: dict = {"]
+content += [f"    {x.__name__}: ({get_function_name(x)}_from_dict, {get_function_name(x)}_to_dict)," for x in models]
+content += ["}", ""]
+with open(output_path, "w+") as f:
+    f.write("\n".join(content))
+print(f"Generated serializers for {len(models)} models.")
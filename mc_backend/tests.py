@@ -1,15 +1,18 @@
 """Unit tests for testing the application functionality."""
 import copy
+import gzip
 import ntpath
 import os
 import uuid
 from collections import OrderedDict
-from threading import Thread
+from concurrent.futures.thread import ThreadPoolExecutor
+from threading import Event, Thread
 from unittest.mock import patch, MagicMock, mock_open
 from zipfile import ZipFile
 
 import rapidjson as json
 import re
+import requests
 import shutil
 import string
 import sys
@@ -19,13 +22,18 @@ from multiprocessing import Process
 from unittest import TestLoader
 from datetime import datetime
 from typing import Dict, List, Tuple, Type, Any
+from urllib.parse import unquote
 
+from click.testing import Result
 from conllu import TokenList
 from flask import Flask
+from flask.testing import FlaskCliRunner
 from gensim.models import Word2Vec
+from graphannis.cs import CorpusStorageManager
+from graphannis.errors import GraphANNISException, NoSuchCorpus
 from lxml import etree
 from networkx import MultiDiGraph, Graph
-from requests import HTTPError
+from requests import HTTPError, RequestException
 from sqlalchemy.exc import OperationalError, InvalidRequestError
 from sqlalchemy.orm import session
 from werkzeug.wrappers import Response
@@ -38,14 +46,18 @@ from mcserver.app.api.exerciseAPI import map_exercise_data_to_database
 from mcserver.app.models import ResourceType, FileType, ExerciseType, ExerciseData, \
     NodeMC, LinkMC, GraphData, Phenomenon, CustomCorpus, AnnisResponse, Solution, DownloadableFile, Language, \
     VocabularyCorpus, TextComplexityMeasure, CitationLevel, FrequencyItem, TextComplexity, Dependency, PartOfSpeech, \
-    Choice, XapiStatement, ExerciseMC, CorpusMC, make_solution_element_from_salt_id, Sentence
+    Choice, XapiStatement, ExerciseMC, CorpusMC, make_solution_element_from_salt_id, Sentence, GraphDataCache, \
+    UdPipeCache, UdPipePool, JobStatus, HttpClient, MimeType, SingleFlight, GraphNode, StaticExercise
 from mcserver.app.services import AnnotationService, CorpusService, FileService, CustomCorpusService, DatabaseService, \
-    XMLservice, TextService, FrequencyService, ExerciseService
+    XMLservice, TextService, FrequencyService, ExerciseService, ReplicaService, GraphDatabaseService, NetworkService, \
+    TextComplexityService, JobService
 from mcserver.config import TestingConfig, Config
 from mcserver.models_auto import Corpus, Exercise, UpdateInfo, LearningResult
 from mocks import Mocks, MockResponse, MockW2V, MockQuery, TestHelper
 from openapi.openapi_server.models import VocabularyForm, VocabularyMC, TextComplexityForm, ExerciseForm, KwicForm, \
     VectorNetworkForm, MatchingExercise, ExerciseTypePath, H5PForm
+from openapi.openapi_server.models.base_model_ import Model
+from openapi.openapi_server.util import deserialize_model
 
 
 class McTestCase(unittest.TestCase):
@@ -188,17 +200,41 @@ class McTestCase(unittest.TestCase):
         db.session.add(Mocks.exercise)
         DatabaseService.commit()
         ar: AnnisResponse = AnnisResponse(solutions=[], graph_data=GraphData(links=[], nodes=[]))
-        with patch.object(CorpusService, "get_corpus", side_effect=[ar, Mocks.annis_response]):
+        with patch.object(CorpusService, "get_corpus",
+                          side_effect=[ar, Mocks.annis_response, Mocks.annis_response]) as mock_get_corpus:
             response = Mocks.app_dict[self.class_name].client.get(Config.SERVER_URI_EXERCISE,
                                                                   query_string=dict(eid=Mocks.exercise.eid))
             self.assertEqual(response.status_code, 404)
             Mocks.exercise.urn = old_urn
             DatabaseService.commit()
-            response = Mocks.app_dict[self.class_name].client.get(Config.SERVER_URI_EXERCISE,
-                                                                  query_string=dict(eid=Mocks.exercise.eid))
-            graph_dict: dict = json.loads(response.get_data(as_text=True))
+            response = Mocks.app_dict[self.class_name].client.get(
+                Config.SERVER_URI_EXERCISE, query_string=dict(eid=Mocks.exercise.eid),
+                headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(response.content_encoding, "gzip")
+            graph_dict: dict = json.loads(gzip.decompress(response.get_data()))
             ar: AnnisResponse = AnnisResponse.from_dict(graph_dict)
             self.assertEqual(len(ar.graph_data.nodes), 52)
+            # the text is always shown with dependencies, so its annotation depth cannot change the response
+            self.assertTrue(mock_get_corpus.call_args.kwargs["need_parse"])
+            # repeat views do not need to load the corpus again
+            etag: str = response.headers["ETag"]
+            response = Mocks.app_dict[self.class_name].client.get(
+                Config.SERVER_URI_EXERCISE, query_string=dict(eid=Mocks.exercise.eid),
+                headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(mock_get_corpus.call_count, 2)
+            # the text changes when it is imported from a different source
+            with patch.object(Config, "GRAPH_DATABASE_VERSION", Config.GRAPH_DATABASE_VERSION + 1):
+                response = Mocks.app_dict[self.class_name].client.get(
+                    Config.SERVER_URI_EXERCISE, query_string=dict(eid=Mocks.exercise.eid),
+                    headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 200)
+            # only reading requests are conditional
+            with Mocks.app_dict[self.class_name].app.test_request_context(
+                    method="POST", headers={"If-None-Match": etag}):
+                self.assertIsNone(NetworkService.make_not_modified_response(etag))
+            # the exercise still counts as recently used
+            self.assertGreater(Mocks.exercise.last_access_time, 1)
             db.session.query(Exercise).delete()
             session.make_transient(Mocks.exercise)
 
@@ -221,7 +257,7 @@ class McTestCase(unittest.TestCase):
         DatabaseService.commit()
         ef: ExerciseForm = ExerciseForm(urn=Mocks.exercise.urn, type=ExerciseType.matching.value,
                                         search_values=Mocks.exercise.search_values, instructions='abc')
-        with patch.object(mcserver.app.api.exerciseAPI.requests, "post", side_effect=post_response):
+        with patch.object(NetworkService.csm_client, "post", side_effect=post_response):
             response: Response = Mocks.app_dict[self.class_name].client.post(
                 Config.SERVER_URI_EXERCISE, headers=Mocks.headers_form_data, data=ef.to_dict())
             ar: AnnisResponse = AnnisResponse.from_dict(json.loads(response.get_data(as_text=True)))
@@ -262,6 +298,22 @@ class McTestCase(unittest.TestCase):
         db.session.query(UpdateInfo).delete()
         session.make_transient(Mocks.exercise)
 
+    def test_api_exercise_preview_get(self):
+        """ Counts the solutions for a new exercise without creating it. """
+        args: dict = dict(urn=Mocks.urn_custom, search_values='["upostag=noun"]',
+                          exercise_type=ExerciseType.markWords.value)
+        aql: str = AnnotationService.map_search_values_to_aql(["upostag=noun"], ExerciseType.markWords)[0]
+        with patch.object(NetworkService.csm_client, "post",
+                          return_value=MockResponse(json.dumps({aql: 3}))):
+            response: Response = Mocks.app_dict[self.class_name].client.get(
+                TestingConfig.SERVER_URI_EXERCISE_PREVIEW, query_string=args)
+            self.assertEqual(json.loads(response.get_data()), dict(solution_count=3))
+        for key, value in [("search_values", "['upostag=noun']"), ("search_values", '["unknown=noun"]'),
+                           ("exercise_type", "unknown"), ("urn", "not a URN")]:
+            response = Mocks.app_dict[self.class_name].client.get(TestingConfig.SERVER_URI_EXERCISE_PREVIEW,
+                                                                   query_string=dict(args, **{key: value}))
+            self.assertEqual(response.status_code, 400)
+
     def test_api_file_get(self):
         """Gets an existing exercise"""
         ui_file: UpdateInfo = UpdateInfo.from_dict(resource_type=ResourceType.file_api_clean.name,
@@ -311,7 +363,7 @@ class McTestCase(unittest.TestCase):
 
     def test_api_frequency_get(self):
         """ Requests a frequency analysis for a given URN. """
-        with patch.object(mcserver.app.services.corpusService.requests, "get", return_value=MockResponse(
+        with patch.object(NetworkService.csm_client, "get", return_value=MockResponse(
                 json.dumps([FrequencyItem(values=[], phenomena=[], count=0).to_dict()]))):
             response: Response = Mocks.app_dict[self.class_name].client.get(TestingConfig.SERVER_URI_FREQUENCY,
                                                                             query_string=dict(urn=Mocks.urn_custom))
@@ -362,6 +414,42 @@ class McTestCase(unittest.TestCase):
             self.assertEqual(response.status_code, 422)
         db.session.query(Exercise).delete()
 
+    @patch.object(NetworkService.csm_client, "post", side_effect=mocked_requests_post)
+    def test_api_job_get(self, mock_post_tcs: MagicMock):
+        """ Runs a slow request in the background and provides its result as soon as it is finished. """
+        with patch.object(NetworkService.csm_client, "get",
+                          return_value=MockResponse(json.dumps(Mocks.annis_response.to_dict()))):
+            response: Response = Mocks.app_dict[self.class_name].client.get(
+                TestingConfig.SERVER_URI_RAW_TEXT, query_string=dict(urn=Mocks.urn_custom, asynchronous=True))
+            self.assertEqual(response.status_code, 202)
+            job: dict = json.loads(response.get_data(as_text=True))
+            job_uri: str = f"{TestingConfig.SERVER_URI_JOBS}/{job['id']}"
+            self.assertTrue(response.headers["Location"].endswith(job_uri))
+            for i in range(100):
+                if job["status"] not in [JobStatus.pending.name, JobStatus.running.name]:
+                    break
+                time.sleep(0.05)
+                job = json.loads(Mocks.app_dict[self.class_name].client.get(job_uri).get_data(as_text=True))
+        self.assertEqual(job["status"], JobStatus.finished.name)
+        self.assertEqual(job["status_code"], 200)
+        self.assertEqual(len(AnnisResponse.from_dict(job["result"]).graph_data.nodes), 52)
+        for job_id in [str(uuid.uuid4()), "config"]:
+            response = Mocks.app_dict[self.class_name].client.get(f"{TestingConfig.SERVER_URI_JOBS}/{job_id}")
+            self.assertEqual(response.status_code, 404)
+        # jobs fail if their web worker is gone or stops sending a heartbeat
+        process: Process = Process(target=time.sleep, args=(0,))
+        process.start()
+        process.join()
+        for pid, heartbeat_time in [(process.pid, time.time()), (os.getpid(), 0)]:
+            job = dict(job, status=JobStatus.running.name, status_code=None, result=None, pid=pid)
+            JobService.save_job(job)
+            os.utime(JobService.get_job_path(job["id"]), (heartbeat_time, heartbeat_time))
+            job = json.loads(Mocks.app_dict[self.class_name].client.get(job_uri).get_data(as_text=True))
+            self.assertEqual(job["status"], JobStatus.failed.name)
+            self.assertEqual(JobService.get_job(job["id"])["status"], JobStatus.failed.name)
+        JobService.save_job(dict(job, status=JobStatus.running.name))
+        self.assertEqual(JobService.get_job(job["id"])["status"], JobStatus.running.name)
+
     def test_api_kwic_post(self):
         """ Posts an AQL query to create a KWIC visualization in SVG format. """
         ed1: ExerciseData = ExerciseService.map_graph_data_to_exercise(
@@ -376,20 +464,26 @@ class McTestCase(unittest.TestCase):
         mr: MockResponse = MockResponse(json.dumps([ed1.serialize(), ed2.serialize()]))
         kf: KwicForm = KwicForm(ctx_left=5, ctx_right=5, search_values=Mocks.exercise.search_values,
                                 urn=Mocks.urn_custom)
-        with patch.object(mcserver.app.services.corpusService.requests, "post", return_value=mr):
+        with patch.object(NetworkService.csm_client, "post", return_value=mr):
             response: Response = Mocks.app_dict[self.class_name].client.post(
                 TestingConfig.SERVER_URI_KWIC, headers=Mocks.headers_form_data, data=kf.to_dict())
             self.assertTrue(response.data.startswith(Mocks.kwic_svg))
 
+    def test_api_metrics_get(self):
+        """ Retrieves runtime metrics of the MC server. """
+        response: Response = Mocks.app_dict[self.class_name].client.get(TestingConfig.SERVER_URI_METRICS)
+        metrics: dict = json.loads(response.get_data(as_text=True))
+        self.assertEqual(metrics["csm_client"]["pool_size"], Config.CSM_CLIENT_POOL_SIZE)
+
     def test_api_not_found(self):
         """Checks the 404 response in case of an invalid API query URL."""
         response: Response = Mocks.app_dict[self.class_name].client.get("/")
         self.assertEqual(response.status_code, 404)
 
-    @patch('mcserver.app.services.textComplexityService.requests.post', side_effect=mocked_requests_post)
+    @patch.object(NetworkService.csm_client, "post", side_effect=mocked_requests_post)
     def test_api_raw_text_get(self, mock_post_tcs: MagicMock):
         """ Retrieves the raw text for a given URN. """
-        with patch.object(mcserver.app.services.corpusService.requests, "get") as mock_get_cs:
+        with patch.object(NetworkService.csm_client, "get") as mock_get_cs:
             mock_get_cs.return_value = MockResponse(
                 json.dumps(AnnisResponse(graph_data=GraphData(links=[], nodes=[]), solutions=[]).to_dict()))
             response: Response = Mocks.app_dict[self.class_name].client.get(
@@ -400,6 +494,8 @@ class McTestCase(unittest.TestCase):
                                                                   query_string=dict(urn=Mocks.urn_custom))
             ar: AnnisResponse = AnnisResponse.from_dict(json.loads(response.get_data(as_text=True)))
             self.assertEqual(len(ar.graph_data.nodes), 52)
+            # the text complexity searches for dependencies, so the text should be parsed right away
+            self.assertEqual(mock_get_cs.call_args[1]["params"]["parse"], "true")
             ar_copy: AnnisResponse = AnnisResponse.from_dict(Mocks.annis_response.to_dict())
             ar_copy.graph_data.nodes = []
             mock_get_cs.return_value = MockResponse(json.dumps(ar_copy.to_dict()))
@@ -446,16 +542,16 @@ class McTestCase(unittest.TestCase):
                 response = Mocks.app_dict[self.class_name].client.get(TestingConfig.SERVER_URI_STATIC_EXERCISES)
                 self.assertEqual(mock_udpipe.call_count, 1)
 
-    @patch('mcserver.app.services.corpusService.requests.get', side_effect=mocked_requests_get)
+    @patch.object(NetworkService.csm_client, "get", side_effect=mocked_requests_get)
     def test_api_subgraph_get(self, mock_get: MagicMock):
         """ Retrieves subgraph data for a given URN. """
         ar: AnnisResponse = CorpusService.get_subgraph(Mocks.urn_custom, 'tok="quarum"', 0, 0, False)
         self.assertEqual(len(ar.solutions), 3)
 
-    @patch('mcserver.app.services.textComplexityService.requests.post', side_effect=mocked_requests_post)
+    @patch.object(NetworkService.csm_client, "post", side_effect=mocked_requests_post)
     def test_api_text_complexity_get(self, mock_post: MagicMock):
         """ Calculates text complexity measures for a given URN. """
-        with patch.object(mcserver.app.services.corpusService.requests, "get",
+        with patch.object(NetworkService.csm_client, "get",
                           return_value=MockResponse(json.dumps(Mocks.graph_data.to_dict()))):
             args: dict = dict(urn=Mocks.urn_custom, measure=TextComplexityMeasure.all.name)
             response: Response = Mocks.app_dict[self.class_name].client.get(TestingConfig.SERVER_URI_TEXT_COMPLEXITY,
@@ -510,7 +606,7 @@ class McTestCase(unittest.TestCase):
 
     def test_api_vocabulary_get(self):
         """ Retrieves sentence ID and matching degree for each sentence in the query text. """
-        with patch.object(mcserver.app.services.corpusService.requests, "get",
+        with patch.object(NetworkService.csm_client, "get",
                           return_value=MockResponse(json.dumps(Mocks.annis_response.to_dict()))):
             args: dict = dict(query_urn=Mocks.urn_custom, show_oov=True, vocabulary=VocabularyCorpus.agldt.name,
                               frequency_upper_bound=6000)
@@ -519,10 +615,10 @@ class McTestCase(unittest.TestCase):
             sentences: List[Sentence] = [Sentence.from_dict(x) for x in json.loads(response.get_data(as_text=True))]
             self.assertEqual(sentences[0].matching_degree, 90.9090909090909)
 
-    @patch('mcserver.app.services.textComplexityService.requests.post', side_effect=mocked_requests_post)
+    @patch.object(NetworkService.csm_client, "post", side_effect=mocked_requests_post)
     def test_api_vocabulary_post(self, mock_post: MagicMock):
         """ Indicates for each token of a corpus whether it is covered by a reference vocabulary. """
-        with patch.object(mcserver.app.services.corpusService.requests, "get",
+        with patch.object(NetworkService.csm_client, "get",
                           return_value=MockResponse(json.dumps(Mocks.annis_response.to_dict()))):
             vf: VocabularyForm = VocabularyForm(frequency_upper_bound=500, query_urn=Mocks.urn_custom,
                                                 vocabulary=VocabularyMC.AGLDT)
@@ -599,7 +695,7 @@ class McTestCase(unittest.TestCase):
         self.assertFalse(csm_process.is_alive())
         db.session.query(UpdateInfo).delete()
 
-    @patch('mcserver.app.services.textComplexityService.requests.post', side_effect=mocked_requests_post)
+    @patch.object(NetworkService.csm_client, "post", side_effect=mocked_requests_post)
     def test_map_exercise_data_to_database(self, mock_post: MagicMock):
         """Maps exercise data to the database and saves it for later access."""
         ui_exercises: UpdateInfo = UpdateInfo.from_dict(resource_type=ResourceType.exercise_list.name,
@@ -674,20 +770,47 @@ class CsmTestCase(unittest.TestCase):
             Config.SERVER_URI_ANNIS_FIND, query_string=dict(urn=Mocks.urn_custom, aql="tok"))
         matches: List[str] = json.loads(response.get_data())
         self.assertEqual(len(matches), 6)
+        response = Mocks.app_dict[self.class_name].client.get(
+            Config.SERVER_URI_ANNIS_FIND, query_string=dict(urn=Mocks.urn_custom, aql="tok", offset=2, limit=3))
+        self.assertEqual(len(json.loads(response.get_data())), 3)
+        self.assertEqual(response.headers[Config.HEADER_TOTAL_COUNT], "6")
+        with patch.object(Config, "FIND_STREAM_CHUNK_SIZE", 2):
+            response = Mocks.app_dict[self.class_name].client.get(
+                Config.SERVER_URI_ANNIS_FIND, query_string=dict(urn=Mocks.urn_custom, aql="tok", offset=1, stream=True))
+            lines: List[str] = response.get_data(as_text=True).splitlines()
+            self.assertEqual(response.mimetype, "application/x-ndjson")
+            self.assertEqual(len(lines), 5)
+            self.assertEqual(len(json.loads(lines[0])), 1)
+        mdg: MultiDiGraph = CorpusService.get_graph(Mocks.urn_custom)
         solutions: List[Solution] = CorpusService.get_matches(Mocks.urn_custom, ['tok ->dep tok'],
-                                                              [Phenomenon.DEPENDENCY])
+                                                              [Phenomenon.DEPENDENCY], mdg)
         self.assertEqual(len(solutions), 5)
         solutions = CorpusService.get_matches(Mocks.urn_custom, ['upostag="VERB" ->dep tok'],
-                                              [Phenomenon.UPOSTAG, Phenomenon.DEPENDENCY])
+                                              [Phenomenon.UPOSTAG, Phenomenon.DEPENDENCY], mdg)
         self.assertEqual(len(solutions), 5)
         solutions = CorpusService.get_matches(Mocks.urn_custom, ['tok ->dep tok ->dep tok'],
-                                              [Phenomenon.DEPENDENCY, Phenomenon.UPOSTAG])
+                                              [Phenomenon.DEPENDENCY, Phenomenon.UPOSTAG], mdg)
         self.assertEqual(len(solutions), 3)
+        self.assertEqual(solutions[0].target, make_solution_element_from_salt_id(solutions[0].target.salt_id))
+        # the graph already knows the sentence and token IDs, so the node IDs do not need to be parsed
+        with patch.object(mcserver.app.services.corpusService, "make_solution_element_from_salt_id") as salt_id_mock:
+            CorpusService.get_matches(Mocks.urn_custom, ['tok ->dep tok'], [Phenomenon.DEPENDENCY], mdg)
+            salt_id_mock.assert_not_called()
+
+    def test_api_count_batch_post(self):
+        """ Requests the number of matches for multiple AQL queries on a given URN. """
+        aqls: List[str] = ["tok", 'upostag="VERB"']
+        urn: str = Mocks.urn_custom[:-6] + "3.1.1"
+        response: Response = Mocks.app_dict[self.class_name].client.post(
+            TestingConfig.SERVER_URI_ANNIS_COUNT_BATCH, json=dict(urn=urn, aqls=aqls))
+        counts_by_aql: Dict[str, int] = json.loads(response.get_data(as_text=True))
+        self.assertEqual(counts_by_aql[aqls[0]], 56)
+        self.assertEqual(counts_by_aql[aqls[1]], len(CorpusService.find_matches(urn, aqls[1], True)))
 
     def test_api_csm_get(self):
         """Gets the raw text for a specific URN."""
         ret_vals: List[AnnisResponse] = [
-            AnnisResponse(graph_data=GraphData(links=[], nodes=[])), Mocks.annis_response]
+            AnnisResponse(graph_data=GraphData(links=[], nodes=[])), Mocks.annis_response, Mocks.annis_response]
         with patch.object(CorpusService, "get_corpus", side_effect=ret_vals):
             response: Response = Mocks.app_dict[self.class_name].client.get(TestingConfig.SERVER_URI_CSM,
                                                                             query_string=dict(urn=Mocks.urn[:5]))
@@ -700,6 +823,22 @@ class CsmTestCase(unittest.TestCase):
             received_text: str = re.sub('[ ]([{0}])'.format(string.punctuation), r'\1', text_raw)
             expected_text: str = "Pars est prima prudentiae ipsam cui praecepturus es aestimare personam."
             self.assertIn(expected_text, received_text)
+            response = Mocks.app_dict[self.class_name].client.get(
+                TestingConfig.SERVER_URI_CSM, query_string=dict(urn=Mocks.urn_custom),
+                headers=NetworkService.msgpack_headers)
+            self.assertEqual(response.mimetype, MimeType.msgpack.value)
+            mr: MockResponse = MockResponse("", content=response.get_data(),
+                                            headers={"Content-Type": response.content_type})
+            self.assertEqual(NetworkService.load_response(mr), Mocks.annis_response.to_dict())
+
+    def test_api_find_batch_post(self):
+        """ Requests matches for multiple AQL queries on a given URN. """
+        aqls: List[str] = ["tok", 'upostag="VERB"']
+        response: Response = Mocks.app_dict[self.class_name].client.post(
+            TestingConfig.SERVER_URI_ANNIS_FIND_BATCH, json=dict(urn=Mocks.urn_custom[:-6] + "3.1.1", aqls=aqls))
+        node_ids_by_aql: Dict[str, List[str]] = json.loads(response.get_data(as_text=True))
+        self.assertEqual(list(node_ids_by_aql), aqls)
+        self.assertEqual(len(node_ids_by_aql[aqls[0]]), 56)
 
     def test_api_frequency_get(self):
         """ Requests a frequency analysis for a given URN. """
@@ -714,6 +853,34 @@ class CsmTestCase(unittest.TestCase):
             self.assertEqual(fa[0].values, expected_fa[0].values)
             self.assertEqual(fa[1].values[0], None)
 
+    def test_api_import_post(self):
+        """ Imports a text into the graph database without sending it back. """
+        with patch.object(CorpusService, "ensure_corpus") as mock_ensure_corpus:
+            response: Response = Mocks.app_dict[self.class_name].client.post(
+                TestingConfig.SERVER_URI_CSM_IMPORT, query_string=dict(urn=Mocks.urn_custom, parse="true"))
+            self.assertEqual(response.status_code, 204)
+            mock_ensure_corpus.assert_called_once_with(Mocks.urn_custom, True)
+
+    def test_api_metrics_get(self):
+        """ Retrieves runtime metrics of the Corpus Storage Manager. """
+        disk_urn: str = AnnotationService.get_disk_urn(Mocks.urn_custom)
+        AnnotationService.map_conll_to_graph(corpus_name=Mocks.urn_custom, conll=Mocks.annotations,
+                                             cs=Config.CORPUS_STORAGE_MANAGER, file_name=disk_urn)
+        CorpusService.graph_data_cache.clear()
+        for i in range(2):
+            ar: AnnisResponse = CorpusService.get_corpus(Mocks.urn_custom, True)
+            self.assertEqual(len(ar.graph_data.nodes), 6)
+        response: Response = Mocks.app_dict[self.class_name].client.get(TestingConfig.SERVER_URI_METRICS)
+        metrics: dict = json.loads(response.get_data(as_text=True))
+        self.assertEqual(metrics["graph_data_cache"]["hits"], 1)
+        self.assertEqual(metrics["graph_data_cache"]["misses"], 1)
+        self.assertEqual(metrics["graph_data_cache"]["size"], 6)
+        self.assertGreater(metrics["graph_database"]["size"], 0)
+        # importing the corpus again invalidates the cached graph data
+        AnnotationService.map_conll_to_graph(corpus_name=Mocks.urn_custom, conll=Mocks.annotations,
+                                             cs=Config.CORPUS_STORAGE_MANAGER, file_name=disk_urn)
+        self.assertEqual(CorpusService.graph_data_cache.serialize()["entries"], 0)
+
     def test_api_subgraph_get(self):
         """ Retrieves subgraph data for a given URN. """
         args: dict = dict(urn=Mocks.urn_custom, aqls=['tok="Galli"'], ctx_left="0", ctx_right="0")
@@ -744,6 +911,13 @@ class CsmTestCase(unittest.TestCase):
             TestingConfig.SERVER_URI_TEXT_COMPLEXITY, data=tcf.to_dict())
         tc = TextComplexity.from_dict(json.loads(response.get_data(as_text=True)))
         self.assertEqual(tc.n_w, 6)
+        # concurrent requests must not see each other's graphs
+        graphs: List[GraphData] = [GraphData(links=[], nodes=[GraphNode(id=str(j)) for j in range(i)])
+                                   for i in range(1, 9)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            word_counts: List[int] = list(executor.map(
+                lambda x: TextComplexityService.text_complexity("n_w", Mocks.urn_custom, True, x).n_w, graphs))
+        self.assertEqual(word_counts, list(range(1, 9)))
 
     @patch('mcserver.app.services.corpusService.CorpusService.update_corpora')
     def test_check_corpus_list_age(self, mock_update: MagicMock):
@@ -775,15 +949,72 @@ class CsmTestCase(unittest.TestCase):
         # Response: Bad Request
         self.assertEqual(third_response.status_code, 400)
 
+    def test_evict_corpora(self):
+        """Evicts the least recently used corpora if the graph database exceeds its disk budget."""
+        pinned_urn: str = CustomCorpusService.custom_corpora[4].corpus.source_urn
+        urns: List[str] = [pinned_urn, Mocks.urn_custom[:-1] + "2", Mocks.urn_custom]
+        access_times: Dict[str, int] = {}
+        for i, urn in enumerate(urns):
+            disk_urn: str = AnnotationService.get_disk_urn(urn)
+            AnnotationService.map_conll_to_graph(corpus_name=urn, conll=Mocks.annotations,
+                                                 cs=Config.CORPUS_STORAGE_MANAGER, file_name=disk_urn)
+            access_times[disk_urn] = i * 1000
+        # graphANNIS writes the corpora to disk in the background, so wait for it to finish before measuring
+        Config.CORPUS_STORAGE_MANAGER.reload()
+        for entry in os.scandir(Config.GRAPH_DATABASE_DIR):
+            if unquote(entry.name) in access_times:
+                os.utime(entry.path, (access_times[unquote(entry.name)], access_times[unquote(entry.name)]))
+        size: int = GraphDatabaseService.get_footprint()["size"]
+        with patch.object(Config, "GRAPH_DATABASE_MAX_SIZE", size - 1):
+            evicted_corpora: List[str] = GraphDatabaseService.evict_corpora()
+        self.assertEqual(evicted_corpora, [AnnotationService.get_disk_urn(urns[1])])
+        corpora: Dict[str, Tuple[float, int]] = GraphDatabaseService.get_corpora()
+        self.assertIn(AnnotationService.get_disk_urn(pinned_urn), corpora)
+        disk_urn = AnnotationService.get_disk_urn(Mocks.urn_custom)
+        with patch.object(Config, "GRAPH_DATABASE_ACCESS_RESOLUTION", 0):
+            Config.CORPUS_STORAGE_MANAGER.count(disk_urn, "tok")
+        self.assertGreater(GraphDatabaseService.get_corpora()[disk_urn][0], corpora[disk_urn][0])
+        # unexpected errors, e.g. from reading a manifest that is being written, must not stop the sweeper
+        app: Flask = Mocks.app_dict[self.class_name].app
+        with patch.object(GraphDatabaseService, "evict_corpora", side_effect=ValueError) as evict_mock:
+            with patch.object(mcserver.app.services.graphDatabaseService.time, "sleep", side_effect=[None, SystemExit]):
+                with patch.object(app.logger, "exception") as exception_mock:
+                    with self.assertRaises(SystemExit):
+                        GraphDatabaseService.init_sweeper(app)
+                    self.assertEqual(exception_mock.call_count, 2)
+        self.assertEqual(evict_mock.call_count, 2)
+
     def test_find_matches(self):
         """ Finds matches for a given URN and AQL and returns the corresponding node IDs. """
         matches: List[str] = CorpusService.find_matches(Mocks.urn_custom[:-6] + "3.1.1", "tok", True)
         self.assertEqual(len(matches), 56)
         expected_matches: List[str] = ["a", "b"]
-        with patch.object(mcserver.app.services.corpusService.requests, "get",
+        with patch.object(NetworkService.csm_client, "get",
                           return_value=MockResponse(json.dumps(expected_matches))):
             matches: List[str] = CorpusService.find_matches(Mocks.urn, "")
             self.assertEqual(matches, expected_matches)
+        with patch.object(NetworkService.csm_client, "get", return_value=MockResponse(
+                "[]", headers={Config.HEADER_TOTAL_COUNT: "2"})):
+            self.assertEqual(CorpusService.count_matches(Mocks.urn, "tok"), 2)
+        # the corpus may be evicted after it was checked
+        with patch.object(CorpusService, "ensure_corpus"):
+            with patch.object(CorpusService, "find_node_ids", side_effect=[NoSuchCorpus(""), expected_matches]):
+                with patch.object(CorpusService, "get_graph") as get_graph_mock:
+                    self.assertEqual(CorpusService.find_matches(Mocks.urn, "tok", True), expected_matches)
+                    get_graph_mock.assert_called_once_with(Mocks.urn, False)
+
+    def test_find_matches_batch(self):
+        """ Finds matches for multiple AQL queries on the same URN. """
+        urn: str = Mocks.urn_custom[:-6] + "3.1.1"
+        aqls: List[str] = ["tok", 'upostag="VERB"', "tok"]
+        node_ids_by_aql: Dict[str, List[str]] = CorpusService.find_matches_batch(urn, aqls, True)
+        self.assertEqual(len(node_ids_by_aql), 2)
+        self.assertEqual(node_ids_by_aql['upostag="VERB"'], CorpusService.find_matches(urn, 'upostag="VERB"', True))
+        expected_matches: Dict[str, List[str]] = dict(tok=["a", "b"])
+        with patch.object(NetworkService.csm_client, "post",
+                          return_value=MockResponse(json.dumps(expected_matches))):
+            node_ids_by_aql = CorpusService.find_matches_batch(Mocks.urn, ["tok"])
+            self.assertEqual(node_ids_by_aql, expected_matches)
 
     def test_full_init(self):
         """ Fully initializes the application, including logging."""
@@ -798,15 +1029,25 @@ class CsmTestCase(unittest.TestCase):
     def test_get_annotations_from_string(self):
         """ Gets annotation data from a given string, be it a CoNLL string or a corpus URN. """
         conll: List[TokenList]
-        with patch.object(AnnotationService, "get_udpipe", return_value=Mocks.udpipe_string):
+        with patch.object(AnnotationService, "get_udpipe", return_value=Mocks.udpipe_string) as mock_udpipe:
             with patch.object(CorpusService, "load_text_list", return_value=Mocks.text_list):
                 with patch.object(CorpusService, "get_raw_text", return_value=Mocks.raw_text):
                     conll = CorpusService.get_annotations_from_string(Mocks.urn)
                     self.assertEqual(len(conll[0]), 4)
                 mdg: MultiDiGraph = CorpusService.get_graph(Mocks.urn)
                 self.assertEqual(len(mdg.nodes), 7)
-                mdg = CorpusService.get_graph(f"{Mocks.urn}@1-1")
-                self.assertEqual(len(mdg.nodes), 7)
+                udpipe_call_count: int = mock_udpipe.call_count
+                # the annotations are exported from the existing graph instead of parsing the text again
+                conll = CorpusService.get_annotations_from_string(Mocks.urn)
+                self.assertEqual(mock_udpipe.call_count, udpipe_call_count)
+                expected_conll: List[TokenList] = AnnotationService.parse_conll_string(Mocks.udpipe_string)
+                for key in ["form", "lemma", "upostag", "feats", "head", Config.AQL_DEPREL, "deps"]:
+                    self.assertEqual([x[key] for x in conll[1]], [x[key] for x in expected_conll[1]])
+                mdg_range: MultiDiGraph = CorpusService.get_graph(f"{Mocks.urn}@1-1")
+                self.assertEqual(len(mdg_range.nodes), 4)
+                self.assertEqual(mock_udpipe.call_count, udpipe_call_count)
+                node_id: str = next(iter(mdg_range.nodes))
+                self.assertEqual(mdg_range.nodes[node_id], mdg.nodes[node_id])
         with patch.object(CustomCorpusService, "get_treebank_annotations", return_value=Mocks.annotations):
             conll = CorpusService.get_annotations_from_string(Mocks.urn_custom)
             self.assertEqual(len(conll[0]), 6)
@@ -817,7 +1058,7 @@ class CsmTestCase(unittest.TestCase):
 
     def test_get_frequency_analysis(self):
         """ Gets a frequency analysis by calling the CSM. """
-        with patch.object(mcserver.app.services.corpusService.requests, "get", return_value=MockResponse(
+        with patch.object(NetworkService.csm_client, "get", return_value=MockResponse(
                 json.dumps([FrequencyItem(values=[], phenomena=[], count=0).to_dict()]))):
             fa: List[FrequencyItem] = CorpusService.get_frequency_analysis(urn=Mocks.urn_custom, is_csm=False)
             self.assertEqual(len(fa), 1)
@@ -833,6 +1074,43 @@ class CsmTestCase(unittest.TestCase):
             mdg: MultiDiGraph = CorpusService.get_graph(Mocks.urn)
             self.assertEqual(mdg, expected_mdg)
 
+    def test_get_graph_annotation_depth(self):
+        """ Parses new graphs for dependencies only if necessary and upgrades them as soon as they are needed. """
+        self.assertTrue(AnnotationService.needs_parse(['tok ->dep[deprel="obj"] tok']))
+        self.assertTrue(AnnotationService.needs_parse(["deps"]))
+        self.assertFalse(AnnotationService.needs_parse(['upostag="VERB"', 'feats=/.*Case=Dep.*/']))
+        disk_urn: str = AnnotationService.get_disk_urn(Mocks.urn)
+        Config.CORPUS_STORAGE_MANAGER.delete_corpus(disk_urn)
+        with patch.object(CorpusService, "get_graph_annotations", return_value=Mocks.annotations) as mock_annotations:
+            CorpusService.get_graph(Mocks.urn)
+            self.assertFalse(mock_annotations.call_args.kwargs["need_parse"])
+            self.assertFalse(AnnotationService.is_parsed(disk_urn))
+            self.assertEqual(CorpusService.count_matches(Mocks.urn, "tok", is_csm=True), 6)
+            self.assertEqual(mock_annotations.call_count, 1)
+            CorpusService.count_matches(Mocks.urn, "tok ->dep tok", is_csm=True)
+            self.assertTrue(mock_annotations.call_args.kwargs["need_parse"])
+            self.assertTrue(AnnotationService.is_parsed(disk_urn))
+            CorpusService.get_graph(Mocks.urn, need_parse=True)
+            self.assertEqual(mock_annotations.call_count, 2)
+        Config.CORPUS_STORAGE_MANAGER.delete_corpus(disk_urn)
+
+    def test_import_corpora(self):
+        """ Imports corpora into the graph database in advance, skipping those that are up to date. """
+        disk_urn: str = AnnotationService.get_disk_urn(Mocks.urn_custom)
+        Config.CORPUS_STORAGE_MANAGER.delete_corpus(disk_urn)
+        with patch.object(CustomCorpusService, "get_treebank_annotations", return_value=Mocks.annotations):
+            imported_urns: List[str] = CorpusService.import_corpora([Mocks.urn_custom, Mocks.urn_custom], 1)
+            self.assertEqual(imported_urns, [Mocks.urn_custom])
+            self.assertIn(disk_urn, Config.CORPUS_STORAGE_MANAGER.list())
+            manifest: Dict[str, dict] = json.loads(FileService.get_file_content(Config.GRAPH_DATABASE_MANIFEST_PATH))
+            self.assertEqual(manifest[disk_urn]["source"]["version"], Config.GRAPH_DATABASE_VERSION)
+            self.assertEqual(CorpusService.import_corpora([Mocks.urn_custom], 1), [])
+            runner: FlaskCliRunner = Mocks.app_dict[self.class_name].app.test_cli_runner()
+            with patch.object(CustomCorpusService, "custom_corpora", []):
+                result: Result = runner.invoke(args=["import-corpora", "--workers", "1"])
+                self.assertIn("Imported 0 of 0 corpora", result.output)
+        os.remove(Config.GRAPH_DATABASE_MANIFEST_PATH)
+
     def test_init_updater(self):
         """Initializes the corpus list updater."""
         with patch.object(CorpusService, 'check_corpus_list_age', side_effect=OperationalError("", [], "")):
@@ -858,6 +1136,9 @@ class CsmTestCase(unittest.TestCase):
                                                          search_phenomena=[Phenomenon.UPOSTAG])
         gd: GraphData = AnnotationService.map_graph_data(result["graph_data_raw"])
         self.assertEqual(len(gd.nodes), len(Mocks.nodes))
+        self.assertEqual([x.token_index for x in gd.nodes], list(range(len(gd.nodes))))
+        self.assertEqual(AnnotationService.get_sentence_id(gd.nodes[0]),
+                         AnnotationService.get_sentence_id_from_node_id(gd.nodes[0].id))
         urn_parts: List[str] = Mocks.urn_custom.split(":")
         base_urn: str = Mocks.urn_custom.replace(":" + urn_parts[-1], "")
         target_corpus: CustomCorpus = next(
@@ -866,6 +1147,81 @@ class CsmTestCase(unittest.TestCase):
         text_parts_list: List[Tuple[str, str]] = CorpusService.load_text_list(Mocks.urn_custom)
         self.assertEqual(len(text_parts_list), 1)
 
+    def test_read_replica(self):
+        """Serves queries from a read replica that follows the changes of the writer process."""
+        disk_urn: str = AnnotationService.get_disk_urn(Mocks.urn_custom)
+        with patch.object(Config, "CORPUS_STORAGE_MANAGER_READ_REPLICAS", 1):
+            AnnotationService.map_conll_to_graph(corpus_name=Mocks.urn_custom, conll=Mocks.annotations,
+                                                 cs=Config.CORPUS_STORAGE_MANAGER, file_name=disk_urn)
+            writer: CorpusStorageManager = Config.CORPUS_STORAGE_MANAGER
+            Config.CORPUS_STORAGE_MANAGER = None
+            with patch.object(Config, "IS_CSM_READ_REPLICA", True):
+                ReplicaService.init_replica()
+                self.assertIn(disk_urn, Config.CORPUS_STORAGE_MANAGER.list())
+                self.assertEqual(CorpusService.count_matches(Mocks.urn_custom, "tok", is_csm=True), 6)
+                reader: CorpusStorageManager = Config.CORPUS_STORAGE_MANAGER
+                Config.CORPUS_STORAGE_MANAGER = writer
+                annotations: List[TokenList] = copy.deepcopy(Mocks.annotations)
+                annotations[0].tokens[0]["form"] = "replica"
+                AnnotationService.map_conll_to_graph(corpus_name=Mocks.urn_custom, conll=annotations,
+                                                     cs=Config.CORPUS_STORAGE_MANAGER, file_name=disk_urn)
+                writer = Config.CORPUS_STORAGE_MANAGER
+                Config.CORPUS_STORAGE_MANAGER = reader
+                ReplicaService.sync()
+                self.assertEqual(CorpusService.count_matches(Mocks.urn_custom, 'tok="replica"', is_csm=True), 1)
+                # missing corpora are imported by the writer, which does not send them back
+                with patch.object(NetworkService.csm_client, "post") as mock_post:
+                    mdg: MultiDiGraph = CorpusService.get_graph(Mocks.urn_custom + ".1")
+                    self.assertTrue(mock_post.call_args.args[0].endswith(Config.SERVER_URI_CSM_IMPORT))
+                    self.assertEqual(len(mdg.nodes), 0)
+            Config.CORPUS_STORAGE_MANAGER.__exit__(None, None, None)
+            Config.CORPUS_STORAGE_MANAGER = writer
+        shutil.rmtree(Config.GRAPH_DATABASE_REPLICAS_DIR)
+
+    def test_publish(self):
+        """Publishes changed corpora without reloading the graph database of the writer."""
+        generations: Dict[str, int] = ReplicaService.load_generations()
+        with patch.object(Config.CORPUS_STORAGE_MANAGER, "reload") as mock_reload:
+            ReplicaService.publish("corpus1")
+            ReplicaService.publish("corpus1")
+            self.assertEqual(ReplicaService.load_generations()["corpus1"], 2)
+            ReplicaService.publish("corpus1", is_deleted=True)
+            self.assertNotIn("corpus1", ReplicaService.load_generations())
+            self.assertEqual(mock_reload.call_count, 0)
+        ReplicaService.save_generations(generations)
+
+    def test_replace_corpus(self):
+        """Replaces a corpus while it is being queried, so the queries always find either the old or the new one."""
+        disk_urn: str = AnnotationService.get_disk_urn(Mocks.urn_custom)
+        AnnotationService.map_conll_to_graph(corpus_name=Mocks.urn_custom, conll=Mocks.annotations,
+                                             cs=Config.CORPUS_STORAGE_MANAGER, file_name=disk_urn)
+        is_done: Event = Event()
+        results: List[Any] = []
+
+        def query_corpus():
+            while not is_done.is_set():
+                try:
+                    results.append(Config.CORPUS_STORAGE_MANAGER.count(disk_urn, "tok"))
+                except Exception as e:
+                    results.append(e)
+
+        t: Thread = Thread(target=query_corpus)
+        t.start()
+        for i in range(10):
+            AnnotationService.map_conll_to_graph(corpus_name=Mocks.urn_custom, conll=Mocks.annotations,
+                                                 cs=Config.CORPUS_STORAGE_MANAGER, file_name=disk_urn)
+        is_done.set()
+        t.join()
+        self.assertTrue(results)
+        self.assertEqual(set(results), {6})
+        # if the update fails, the previous version of the corpus is kept
+        with patch.object(CorpusStorageManager, "apply_update", side_effect=GraphANNISException("error")):
+            with self.assertRaises(GraphANNISException):
+                AnnotationService.map_conll_to_graph(corpus_name=Mocks.urn_custom, conll=Mocks.annotations[:1],
+                                                     cs=Config.CORPUS_STORAGE_MANAGER, file_name=disk_urn)
+        self.assertEqual(Config.CORPUS_STORAGE_MANAGER.count(disk_urn, "tok"), 6)
+        self.assertFalse([x for x in os.listdir(Config.GRAPH_DATABASE_ROOT) if x.startswith("staging-")])
+
     def test_run_app(self):
         """ Creates a new app and runs it. """
         with patch.object(csm, "get_app") as mock_get_app:
@@ -958,13 +1314,29 @@ class CommonTestCase(unittest.TestCase):
         ar: AnnisResponse = CorpusService.get_corpus("", True)
         self.assertEqual(len(ar.graph_data.nodes), 0)
 
+    def test_get_corpus_in_process(self):
+        """ Loads the text for a standard corpus directly from the graph database, without asking the CSM. """
+        gd: GraphData = Mocks.annis_response.graph_data
+        with patch.object(Config, "IS_CSM_IN_PROCESS", True):
+            with patch.object(CorpusService.graph_data_cache, "get", return_value=gd):
+                with patch.object(NetworkService.csm_client, "get") as mock_get:
+                    ar: AnnisResponse = CorpusService.get_corpus(Mocks.urn_custom, is_csm=False)
+                    mock_get.assert_not_called()
+        self.assertEqual(ar.graph_data, gd)
+        # the cached graph must not change if the caller modifies the result
+        ar.graph_data.nodes[0].is_oov = True
+        self.assertIsNot(ar.graph_data.nodes[0], gd.nodes[0])
+        self.assertFalse(gd.nodes[0].is_oov)
+
     def test_get_custom_corpus_annotations(self):
         """ Retrieves the annotated text for a custom non-PROIEL corpus, e.g. a textbook. """
-        mock_conll: List[TokenList] = Mocks.annotations + [TokenList([], metadata=OrderedDict([("sent_id", "3")]))]
+        mock_conll: List[TokenList] = copy.deepcopy(Mocks.annotations) + [
+            TokenList([], metadata=OrderedDict([("sent_id", "3")]))]
         with patch.object(CustomCorpusService, "get_custom_corpus_text", return_value=Mocks.text_list):
             with patch.object(AnnotationService, "get_udpipe", return_value=Mocks.udpipe_string):
                 with patch.object(AnnotationService, "parse_conll_string", return_value=mock_conll):
-                    conll: List[TokenList] = CustomCorpusService.get_custom_corpus_annotations(Mocks.urn + "@1-2")
+                    # the sentences are numbered consecutively, even if the units are annotated separately
+                    conll: List[TokenList] = CustomCorpusService.get_custom_corpus_annotations(Mocks.urn + "@1-1")
                     self.assertEqual(len(conll), 1)
 
     def test_get_custom_corpus_reff(self):
@@ -1044,6 +1416,90 @@ class CommonTestCase(unittest.TestCase):
         conll = AnnotationService.get_udpipe(text)
         self.assertIn(Mocks.udpipe_string, conll)
 
+    def test_get_udpipe_by_unit(self):
+        """ Annotates a text unit by unit, so overlapping citation ranges reuse the cached annotations. """
+        directory: str = os.path.join(Config.TMP_DIRECTORY, "udpipe")
+        shutil.rmtree(directory, ignore_errors=True)
+        text_list: List[Tuple[str, str]] = [(f"{Mocks.urn[:-5]}1.1.{i + 1}", x) for i, x in enumerate(
+            ["Caesar fortis est.", "Galli", "moriuntur.", "Gallia est omnis divisa."])]
+        with patch.object(AnnotationService, "udpipe_cache", UdPipeCache(directory, Config.UDPIPE_CACHE_MAX_SIZE)):
+            with patch.object(AnnotationService.udpipe_pool, "process",
+                              return_value=Mocks.udpipe_string) as mock_process:
+                conll: List[TokenList] = AnnotationService.get_udpipe_by_unit(text_list[:3])
+                self.assertEqual([x.metadata["sent_id"] for x in conll], ["1", "2", "3", "4"])
+                # sentences may span multiple units, so these are annotated together
+                self.assertEqual([x.args[0] for x in mock_process.call_args_list],
+                                 ["Caesar fortis est.", "Galli moriuntur."])
+                conll = AnnotationService.get_udpipe_by_unit(text_list[1:])
+                self.assertEqual(len(conll), 4)
+                self.assertEqual(mock_process.call_args.args[0], text_list[3][1])
+                self.assertEqual(mock_process.call_count, 3)
+        shutil.rmtree(directory)
+
+    def test_get_udpipe_by_unit_parallel(self):
+        """ Annotates long texts in multiple processes, with the same result as a serial annotation. """
+        directory: str = os.path.join(Config.TMP_DIRECTORY, "udpipe")
+        text_list: List[Tuple[str, str]] = [(f"{Mocks.urn[:-5]}1.1.{i + 1}", Mocks.raw_text) for i in range(4)]
+        conll_serial: List[TokenList] = []
+        with patch.object(mcserver.app.models, "Model"):
+            with patch.object(mcserver.app.models, "Pipeline") as mock_pipeline:
+                mock_pipeline.return_value.process.return_value = Mocks.udpipe_string
+                for workers in [1, 2]:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    cache: UdPipeCache = UdPipeCache(directory, Config.UDPIPE_CACHE_MAX_SIZE)
+                    with patch.object(AnnotationService, "udpipe_cache", cache):
+                        with patch.object(AnnotationService, "udpipe_pool", UdPipePool("model.udpipe", 1, 1)):
+                            with patch.object(Config, "UDPIPE_PARALLEL_MIN_LENGTH", 0):
+                                conll: List[TokenList] = AnnotationService.get_udpipe_by_unit(text_list, workers)
+                    self.assertEqual(len(conll), 8)
+                    if workers == 1:
+                        conll_serial = conll
+                        self.assertEqual(cache.serialize()["misses"], 1)
+                    else:
+                        # the annotation was done by other processes
+                        self.assertEqual(cache.serialize()["misses"], 0)
+                        self.assertEqual([x.serialize() for x in conll], [x.serialize() for x in conll_serial])
+        shutil.rmtree(directory)
+
+    def test_graph_data_cache(self):
+        """ Caches graph data in memory and evicts the least recently used graphs if it grows too large. """
+        cache: GraphDataCache = GraphDataCache(max_size=len(Mocks.graph_data.nodes) * 2)
+        cache.put("a", Mocks.graph_data)
+        cache.put("b", Mocks.graph_data)
+        self.assertIs(cache.get("a"), Mocks.graph_data)
+        cache.put("c", Mocks.graph_data)
+        self.assertIsNone(cache.get("b"))
+        self.assertIs(cache.get("c"), Mocks.graph_data)
+        cache.put("d", GraphData(nodes=Mocks.graph_data.nodes * 3, links=[]))
+        self.assertIsNone(cache.get("d"))
+        cache.invalidate("a")
+        self.assertEqual(cache.serialize(), dict(entries=1, hits=2, max_size=cache.max_size, misses=2,
+                                                 size=len(Mocks.graph_data.nodes)))
+
+    def test_http_client(self):
+        """ Shares connections to another service and stops sending requests while the service keeps failing. """
+        client: HttpClient = HttpClient(pool_size=2, timeout=(1, 1), retries=0, backoff_factor=0, failure_threshold=2,
+                                        reset_timeout=60)
+        session: requests.Session = client.get_session()
+        self.assertIs(client.get_session(), session)
+        url: str = f"http://{Config.HOST_IP_CSM}{Config.SERVER_URI_ANNIS_FIND}"
+        with patch.object(session, "request", side_effect=RequestException) as mock_request:
+            for i in range(3):
+                with self.assertRaises(RequestException):
+                    client.get(url)
+            # the circuit breaker rejects the last request without sending it
+            self.assertEqual(mock_request.call_count, 2)
+        metrics: dict = client.serialize()
+        self.assertTrue(metrics["is_open"])
+        self.assertEqual(metrics["rejections"], 1)
+        self.assertEqual(metrics["endpoints"][Config.SERVER_URI_ANNIS_FIND]["errors"], 2)
+        client.reset_timeout = 0
+        with patch.object(session, "request", return_value=MagicMock(status_code=200)):
+            self.assertEqual(client.post(url).status_code, 200)
+        metrics = client.serialize()
+        self.assertFalse(metrics["is_open"])
+        self.assertEqual(metrics["endpoints"][Config.SERVER_URI_ANNIS_FIND]["calls"], 3)
+
     def test_init_custom_corpus(self):
         """Adds custom corpora to the corpus list, e.g. the PROIEL corpora."""
         with patch.object(CustomCorpusService, "get_treebank_annotations", return_value=Mocks.annotations):
@@ -1183,6 +1639,16 @@ class CommonTestCase(unittest.TestCase):
         session.make_transient(Mocks.corpora[0])
         session.make_transient(Mocks.exercise)
 
+    def test_pack(self):
+        """ Serializes graph data to MessagePack and back. """
+        graph_data_raw: dict = dict(directed=True, nodes=[dict(id="a", tok="Caesar"), dict(id="b", tok=None)], links=[
+            dict(source="a", target="b", key=0), dict(source="b", target="a", key=0, deprel="nsubj")], graph={})
+        self.assertEqual(NetworkService.unpack(NetworkService.pack(graph_data_raw)), graph_data_raw)
+        self.assertEqual(NetworkService.unpack(NetworkService.pack([[], {}])), [[], {}])
+        # rows without any columns and data that looks like a table must survive as well
+        for value in [[{}, {}], [dict(x={"$keys": [], "$columns": []})], {"$keys": ["a"]}]:
+            self.assertEqual(NetworkService.unpack(NetworkService.pack(value)), value)
+
     def test_query(self) -> None:
         """Executes a query on the database and rolls back the session if errors occur."""
 
@@ -1193,11 +1659,70 @@ class CommonTestCase(unittest.TestCase):
             db_mock.session.query.side_effect = raise_error
             self.assertEqual(DatabaseService.query(Corpus), None)
 
+    def test_serialize_annis_response(self):
+        """ Serializes graph data directly and restores it in the slotted graph model. """
+        ar_dict: dict = NetworkService.serialize_annis_response(Mocks.annis_response)
+        self.assertEqual(ar_dict, Mocks.annis_response.to_dict())
+        ar: AnnisResponse = NetworkService.load_annis_response(ar_dict)
+        self.assertIsInstance(ar.graph_data.nodes[0], GraphNode)
+        self.assertEqual(ar.graph_data.links, Mocks.annis_response.graph_data.links)
+        node: GraphNode = copy.copy(ar.graph_data.nodes[0])
+        node.is_oov = True
+        self.assertNotEqual(node, ar.graph_data.nodes[0])
+        self.assertEqual(NetworkService.serialize_annis_response(ar), ar_dict)
+
+    def test_serializers(self):
+        """ Converts models with the generated serializers, just like the generic ones. """
+        ar_dict: dict = Model.to_dict(Mocks.annis_response)
+        self.assertEqual(Mocks.annis_response.to_dict(), ar_dict)
+        self.assertEqual(AnnisResponse.from_dict(ar_dict), deserialize_model(ar_dict, AnnisResponse))
+        self.assertIsInstance(GraphNode.from_dict(ar_dict["graph_data"]["nodes"][0]), GraphNode)
+        static_exercise: dict = dict(solutions=[["a", None]], urn=None)
+        self.assertEqual(StaticExercise.from_dict(static_exercise).to_dict(), static_exercise)
+        self.assertEqual(Sentence.from_dict(dict(id="1")).id, 1)
+        self.assertEqual(Sentence.from_dict(None), Sentence())
+
+    def test_single_flight(self):
+        """ Runs concurrent calls with the same key only once and lets them share the result. """
+        sf: SingleFlight = SingleFlight()
+        started: Event = Event()
+        release: Event = Event()
+        calls: List[int] = []
+
+        def build() -> List[int]:
+            calls.append(len(calls))
+            started.set()
+            release.wait(5)
+            return calls
+
+        results: List[List[int]] = []
+        threads: List[Thread] = [Thread(target=lambda: results.append(sf.do("urn", build))) for _ in range(3)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        while sf.serialize()["coalesced"] < 2:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(calls, [0])
+        self.assertTrue(all(x is calls for x in results))
+        self.assertEqual(sf.serialize(), dict(coalesced=2, in_flight=0))
+        # errors are shared as well, but later calls start over
+        with self.assertRaises(ValueError):
+            sf.do("urn", lambda: int("x"))
+        self.assertEqual(sf.do("urn", build), [0, 1])
+
     def test_sort_nodes(self):
         """Sorts the nodes according to the ordering links, i.e. by their tokens' occurrence in the text."""
         old_graph_data: GraphData = GraphData(nodes=[], links=[])
         new_graph_data: GraphData = AnnotationService.sort_nodes(old_graph_data)
         self.assertIs(old_graph_data, new_graph_data)
+        # newer imports record the position of each token, so the ordering links are not needed
+        nodes: List[GraphNode] = [GraphNode(id=f"sent1tok{i + 1}", token_index=i) for i in range(3)]
+        new_graph_data = AnnotationService.sort_nodes(GraphData(nodes=nodes[::-1], links=[]))
+        self.assertEqual(new_graph_data.nodes, nodes)
 
     def test_strip_name_spaces(self):
         """Removes all namespaces from an XML document for easier parsing, e.g. with XPath."""
@@ -1217,6 +1742,54 @@ class CommonTestCase(unittest.TestCase):
         self.assertIsInstance(t, Thread)
         self.assertTrue(t.is_alive())
 
+    def test_udpipe_cache(self):
+        """ Caches UDPipe annotations on disk and evicts the least recently used ones if the cache grows too large. """
+        directory: str = os.path.join(Config.TMP_DIRECTORY, "udpipe")
+        shutil.rmtree(directory, ignore_errors=True)
+        cache: UdPipeCache = UdPipeCache(directory, len(Mocks.udpipe_string) * 2)
+        with patch.object(AnnotationService, "udpipe_cache", cache):
+            with patch.object(AnnotationService.udpipe_pool, "process",
+                              return_value=Mocks.udpipe_string) as mock_process:
+                for i in range(2):
+                    self.assertEqual(AnnotationService.get_udpipe(Mocks.raw_text), Mocks.udpipe_string)
+                self.assertEqual(mock_process.call_count, 1)
+                AnnotationService.get_udpipe(Mocks.raw_text, need_parse=False)
+                self.assertEqual(mock_process.call_count, 2)
+                AnnotationService.get_udpipe(Mocks.raw_text)
+                # the least recently used annotation is evicted to make room for a new one
+                AnnotationService.get_udpipe(Mocks.raw_text + Mocks.raw_text)
+                self.assertEqual(len(os.listdir(directory)), 2)
+                AnnotationService.get_udpipe(Mocks.raw_text, need_parse=False)
+                self.assertEqual(mock_process.call_count, 4)
+        self.assertEqual(cache.serialize(), dict(hits=2, max_size=cache.max_size, misses=4, size=cache.max_size))
+        shutil.rmtree(directory)
+
+    def test_udpipe_pool(self):
+        """ Loads the UDPipe model once and lends its pipelines to one caller at a time. """
+        pool: UdPipePool = UdPipePool("model.udpipe", 1, 0.1)
+        with patch.object(mcserver.app.models, "Model") as mock_model:
+            with patch.object(mcserver.app.models, "Pipeline") as mock_pipeline:
+                mock_pipeline.return_value.process.return_value = Mocks.udpipe_string
+                self.assertEqual(pool.process("Caesar fortis est. Galli moriuntur."), Mocks.udpipe_string)
+                self.assertEqual(pool.process("Galli moriuntur.", need_parse=False), Mocks.udpipe_string)
+                self.assertEqual(mock_model.load.call_count, 1)
+                self.assertEqual(mock_pipeline.call_count, 1)
+                mock_pipeline.return_value.setParser.assert_called_with(mock_pipeline.NONE)
+                pipeline: MagicMock = pool.acquire()
+                self.assertRaises(TimeoutError, pool.process, "Galli moriuntur.")
+                pool.pipelines.put(pipeline)
+            mock_model.load.return_value = None
+            self.assertRaises(FileNotFoundError, UdPipePool("model.udpipe", 1, 0.1).process, "")
+        # without the UDPipe binding, the bundled binary is used instead
+        with patch.object(mcserver.app.models, "Pipeline", None):
+            with patch.object(mcserver.app.models.subprocess, "run") as mock_run:
+                mock_run.return_value.stdout = Mocks.udpipe_string.encode("utf-8")
+                self.assertEqual(pool.process("Galli moriuntur.", need_parse=False), Mocks.udpipe_string)
+                args: List[str] = mock_run.call_args.args[0]
+                self.assertIn(args[0], [Config.UDPIPE_PATH_LINUX, Config.UDPIPE_PATH_OSX, Config.UDPIPE_PATH_WIN64])
+                self.assertNotIn("--parse", args)
+                self.assertEqual(args[-1], "model.udpipe")
+
     def test_update_exercises(self):
         """Deletes old exercises."""
         exercises: List[Exercise] = [
@@ -1226,7 +1799,7 @@ class CommonTestCase(unittest.TestCase):
         db.session.add_all(exercises)
         DatabaseService.commit()
 
-        with patch.object(mcserver.app.services.textComplexityService.requests, "post",
+        with patch.object(NetworkService.csm_client, "post",
                           return_value=MockResponse(Mocks.text_complexity_json_string)):
             with patch.object(CorpusService, "get_corpus", return_value=Mocks.annis_response):
                 ExerciseService.update_exercises(False)